@@ -0,0 +1,97 @@
+# src/app/cache.py
+"""
+行程內共用的 LRU 快取（以位元組預算控制容量）：
+- 超過 max_bytes 時依最久未使用（LRU）淘汰
+- 計數器：hits / misses / evictions，供 /api/v1/metrics 輸出
+- thread-safe（FastAPI worker thread、排程與 runner 共用同一個實例）
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+def sizeof(value: Any) -> int:
+    """估算快取值佔用的位元組（pandas/numpy 取資料本體大小）"""
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(sizeof(v) for v in value.values())
+    return int(sys.getsizeof(value))
+
+
+class ByteLRUCache:
+    def __init__(self, max_bytes: int, *, sizer: Callable[[Any], int] = sizeof) -> None:
+        self.max_bytes = int(max_bytes)
+        self._sizer = sizer
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """回傳 (found, value)；命中時移到 LRU 尾端"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, item[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None) -> None:
+        size = int(nbytes) if nbytes is not None else self._sizer(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            # 單筆就超過預算：不收（避免把整個快取洗掉）
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, size)
+            self._bytes += size
+            self._evict_locked()
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict_locked()
+
+    def clear(self, *, reset_stats: bool = False) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            if reset_stats:
+                self.hits = self.misses = self.evictions = 0
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self.max_bytes and self._data:
+            _, (_, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
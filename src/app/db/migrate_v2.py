@@ -27,12 +27,13 @@ def init_db() -> None:
 
 def patch_db_in_place() -> None:
     """
-    不重建 DB 的情況下，安全補 alerts 欄位（attempts/last_error/last_sent_ts）。
-    可在手動維運時呼叫。
+    不重建 DB 的情況下，安全補 alerts 欄位（attempts/last_error/last_sent_ts）
+    與 scan_jobs 的背景執行欄位。可在手動維運時呼叫。
     """
     con = sqlite3.connect(DB_PATH)
     con.row_factory = sqlite3.Row
     _safe_add_columns_alerts(con)
+    _safe_add_columns_scan_jobs(con)
     con.close()
 
 def _safe_add_columns_alerts(conn: sqlite3.Connection) -> None:
@@ -72,6 +73,47 @@ def _safe_add_columns_alerts(conn: sqlite3.Connection) -> None:
 
     conn.commit()
 
+# scan_jobs 背景執行欄位（同 migrations/V3__scan_job_progress.sql）
+_SCAN_JOB_COLUMNS = {
+    "status": "TEXT NOT NULL DEFAULT 'pending'",
+    "payload": "TEXT",
+    "symbols_total": "INTEGER NOT NULL DEFAULT 0",
+    "symbols_done": "INTEGER NOT NULL DEFAULT 0",
+    "started_at": "TEXT",
+    "finished_at": "TEXT",
+    "updated_at": "TEXT",
+    "error": "TEXT",
+}
+
+def _safe_add_columns_scan_jobs(conn: sqlite3.Connection) -> None:
+    """
+    安全補 scan_jobs 的狀態 / 進度欄位；加欄位前建立的 job 沒有 payload，
+    無法由 worker 補跑 → 標成 failed（避免永遠停在 pending）。
+    """
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cols = {r["name"] for r in cur.execute("PRAGMA table_info(scan_jobs)").fetchall()}
+    if not cols:
+        return
+
+    for name, decl in _SCAN_JOB_COLUMNS.items():
+        try:
+            if name not in cols:
+                cur.execute(f"ALTER TABLE scan_jobs ADD COLUMN {name} {decl}")
+        except Exception:
+            pass
+
+    try:
+        cur.execute(
+            "UPDATE scan_jobs SET status='failed', error='submitted before background execution; resubmit' "
+            "WHERE payload IS NULL AND status='pending'"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs(status, created_at)")
+    except Exception:
+        pass
+
+    conn.commit()
+
 if __name__ == "__main__":
     # 與你現有流程相容：python -m src.app.db.migrate_v2
     init_db()
\ No newline at end of file
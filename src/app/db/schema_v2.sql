@@ -138,12 +138,21 @@ CREATE TABLE IF NOT EXISTS watchlist_items (
     FOREIGN KEY(watchlist_id) REFERENCES watchlist(id) ON DELETE CASCADE
 );
 
--- idempotency for /scan ----------------------------------------------------
+-- idempotency for /scan ＋ 背景執行進度（scheduler/scan_worker.py）---------------
 CREATE TABLE IF NOT EXISTS scan_jobs (
     key TEXT PRIMARY KEY,
     job_id TEXT NOT NULL,
-    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    status TEXT NOT NULL DEFAULT 'pending',     -- pending|running|done|failed
+    payload TEXT,                               -- JSON：submit 時的 body
+    symbols_total INTEGER NOT NULL DEFAULT 0,
+    symbols_done INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT,
+    finished_at TEXT,
+    updated_at TEXT,                            -- worker 心跳（每批更新）
+    error TEXT
 );
+CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs(status, created_at);
 
 -- 兼容舊遺留
 DROP TABLE IF EXISTS lists;
\ No newline at end of file
@@ -0,0 +1,201 @@
+# src/app/domain/strategies/compiler.py
+"""
+策略編譯器：把驗證過的 Strategy.conditions 轉成向量化的布林評估器。
+- 比較（> < >= <= == !=）→ NumPy 陣列運算；任一側為 NaN 一律 False
+- cross_up / cross_down → 與前一根（shift 1）比較
+- logic AND / OR → 對所有條件 mask 做 reduce
+- evaluate(df | {欄: ndarray} | pyarrow.Table) 對單檔整段歷史；evaluate_panel(panel) 對整個 universe（rows=日期, cols=股票）一次算完
+- 運算元經 planner 展開成去重後的 DAG；evaluate_many 讓多個策略共用同一次計算
+- get_compiled(strategy_id, updated_at, payload) 以 (id, updated_at) 快取編譯結果，scan / backtest 共用
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.indicators import kernels, registry
+from . import lookback
+from .planner import NodeKey, Plan, PlanBuilder
+from .validation import Condition, Strategy
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+Panel = Mapping[str, np.ndarray]
+
+
+# ------------------------------------------------------------
+# 條件 → mask
+# ------------------------------------------------------------
+_CMP = {
+    ">": np.greater,
+    "<": np.less,
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def _valid(x: Union[float, np.ndarray]) -> Union[bool, np.ndarray]:
+    return ~np.isnan(x)
+
+
+def compare(op: str, left: Union[float, np.ndarray], right: Union[float, np.ndarray]) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        if op in _CMP:
+            return _CMP[op](left, right) & _valid(left) & _valid(right)
+        l = np.broadcast_to(left, np.broadcast_shapes(np.shape(left), np.shape(right)))
+        r = np.broadcast_to(right, l.shape)
+        diff = l - r
+        out = np.zeros(diff.shape, dtype=bool)
+        if diff.shape[0] < 2:
+            return out
+        now, prev = diff[1:], diff[:-1]
+        ok = _valid(now) & _valid(prev)
+        if op == "cross_up":
+            out[1:] = ok & (now > 0) & (prev <= 0)
+        elif op == "cross_down":
+            out[1:] = ok & (now < 0) & (prev >= 0)
+        else:
+            raise ValueError(f"unsupported op: {op}")
+        return out
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    op: str
+    left: NodeKey
+    right: NodeKey
+
+    def mask(self, values: Mapping[NodeKey, Any]) -> np.ndarray:
+        return compare(self.op, values[self.left], values[self.right])
+
+
+@dataclass(frozen=True)
+class CompiledStrategy:
+    name: str
+    version: str
+    logic: str
+    conditions: Tuple[CompiledCondition, ...]
+    plan: Plan
+    strategy: Strategy
+
+    @property
+    def warmup(self) -> int:
+        """所有條件中最大的 warm-up（含 cross 前一根）"""
+        return lookback.required_warmup(self.strategy)
+
+    def required_bars(self, *, tail: int = 1, settle: int = lookback.SETTLE) -> int:
+        """評估最後 tail 根所需讀取的 bar 數（見 lookback.required_bars）"""
+        return lookback.required_bars(self.strategy, tail=tail, settle=settle)
+
+    def reduce(self, values: Mapping[NodeKey, Any], shape: Tuple[int, ...]) -> np.ndarray:
+        masks = [np.broadcast_to(c.mask(values), shape) for c in self.conditions]
+        op = np.logical_and if self.logic == "AND" else np.logical_or
+        return op.reduce(masks)
+
+    def evaluate_panel(self, panel: Panel) -> np.ndarray:
+        """整個 universe 一次評估：回傳 (rows, cols) 布林陣列"""
+        arrays = _as_panel(panel)
+        return self.reduce(self.plan.execute(arrays), arrays["close"].shape)
+
+    def evaluate(self, data: Any) -> np.ndarray:
+        """
+        單檔整段歷史：回傳長度 = len(data) 的布林陣列。
+        data 可為 DataFrame、{欄: ndarray} 或 pyarrow.Table（duckdb_io output="numpy"/"arrow"）
+        """
+        return self.evaluate_panel(registry.column_arrays(data))[:, 0]
+
+    def condition_masks(self, data: Any) -> np.ndarray:
+        """單檔：各條件自己的布林序列，shape = (len(conditions), len(data))；scan 以最後一根算成立比例"""
+        arrays = _as_panel(registry.column_arrays(data))
+        values = self.plan.execute(arrays)
+        shape = arrays["close"].shape
+        return np.stack([np.broadcast_to(c.mask(values), shape)[:, 0] for c in self.conditions])
+
+
+def _as_panel(panel: Panel) -> Dict[str, np.ndarray]:
+    return {c: kernels.as_2d(panel[c]) for c in OHLCV}
+
+
+def compile_strategy(strategy: Union[Strategy, Mapping[str, Any]]) -> CompiledStrategy:
+    if not isinstance(strategy, Strategy):
+        strategy = Strategy.parse_obj(strategy)
+    builder = PlanBuilder()
+    compiled: List[CompiledCondition] = []
+    for cond in strategy.conditions:
+        assert isinstance(cond, Condition)
+        compiled.append(
+            CompiledCondition(op=cond.op, left=builder.operand(cond.left), right=builder.operand(cond.right))
+        )
+    return CompiledStrategy(
+        name=strategy.name,
+        version=strategy.version,
+        logic=strategy.logic,
+        conditions=tuple(compiled),
+        plan=builder.build(),
+        strategy=strategy,
+    )
+
+
+def evaluate_many(strategies: Sequence[CompiledStrategy], panel: Panel) -> List[np.ndarray]:
+    """多個策略合併成一張 DAG，共同的節點只算一次；回傳順序與輸入相同"""
+    if not strategies:
+        return []
+    arrays = _as_panel(panel)
+    plan = strategies[0].plan.merge(*(s.plan for s in strategies[1:]))
+    values = plan.execute(arrays)
+    return [s.reduce(values, arrays["close"].shape) for s in strategies]
+
+
+# ------------------------------------------------------------
+# 編譯快取：(strategy_id, updated_at) → CompiledStrategy
+# ------------------------------------------------------------
+_MAX_COMPILED = 256
+_COMPILED: "OrderedDict[Tuple[Any, Any], CompiledStrategy]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def get_compiled(
+    strategy_id: Any,
+    updated_at: Any,
+    payload: Union[Strategy, Mapping[str, Any], str],
+) -> CompiledStrategy:
+    """策略未更新（updated_at 相同）時直接重用已編譯的評估器"""
+    key = (strategy_id, updated_at)
+    with _LOCK:
+        hit = _COMPILED.get(key)
+        if hit is not None:
+            _COMPILED.move_to_end(key)
+            return hit
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    compiled = compile_strategy(payload)
+    with _LOCK:
+        # 同一 id 的舊版本直接丟棄
+        for k in [k for k in _COMPILED if k[0] == strategy_id]:
+            del _COMPILED[k]
+        _COMPILED[key] = compiled
+        while len(_COMPILED) > _MAX_COMPILED:
+            _COMPILED.popitem(last=False)
+    return compiled
+
+
+def compiled_for_id(strategy_id: int) -> Optional[CompiledStrategy]:
+    """由 strategies 表讀 payload/updated_at 後取得（快取的）編譯結果"""
+    from app.repositories import strategies as repo
+
+    row = repo.get_by_id(strategy_id)
+    if not row or not row.get("payload"):
+        return None
+    return get_compiled(strategy_id, row.get("updated_at"), row["payload"])
+
+
+def clear_compiled() -> None:
+    with _LOCK:
+        _COMPILED.clear()
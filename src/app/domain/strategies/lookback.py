@@ -0,0 +1,50 @@
+# src/app/domain/strategies/lookback.py
+"""
+策略所需歷史長度（warm-up lookback）：
+- 每個指標在 indicators/__init__.py 註冊的 meta["warmup"](params)，例如 MACD = max(fast, slow) + signal
+- 遞迴型指標（meta["recursive"]：EMA/RSI/MACD）理論上依賴全部歷史；
+  settle 倍數讓初值影響衰減到可忽略，預設 SETTLE（3）；settle=1 即只取 warmup 本身
+- 有 cross_up/cross_down 時需多看前一根（shift 1）
+- tail：最後要產出幾根有效訊號（掃描只看最後一根 = 1）
+scan 路徑據此只讀最後 N 根 bar（duckdb_io.read_ohlcv(last_n=...)）而非整檔歷史。
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from app.indicators import registry
+from .validation import IndicatorRefOperand, Strategy
+
+CROSS_OPS = ("cross_up", "cross_down")
+# 遞迴型指標 warm-up 的預設倍數（scan_runner 的 SCAN_SETTLE 亦以此為預設）
+SETTLE = 3
+
+
+def operand_warmup(op, *, settle: int = SETTLE) -> int:
+    if not isinstance(op, IndicatorRefOperand):
+        return 0
+    meta = registry.get(op.indicator).get("meta", {})
+    warmup = meta.get("warmup")
+    bars = int(warmup(op.params)) if callable(warmup) else 0
+    if meta.get("recursive"):
+        bars *= max(int(settle), 1)
+    return bars
+
+
+def required_warmup(strategies: Iterable[Strategy] | Strategy, *, settle: int = SETTLE) -> int:
+    """所有條件中最大的 warm-up（含 cross 的前一根）"""
+    if isinstance(strategies, Strategy):
+        strategies = [strategies]
+    need = 0
+    for st in strategies:
+        for cond in st.conditions:
+            bars = max(operand_warmup(cond.left, settle=settle), operand_warmup(cond.right, settle=settle))
+            if cond.op in CROSS_OPS:
+                bars += 1
+            need = max(need, bars)
+    return need
+
+
+def required_bars(strategies: Iterable[Strategy] | Strategy, *, tail: int = 1, settle: int = SETTLE) -> int:
+    """讀取時要抓的 bar 數：warm-up + 要產出的訊號根數"""
+    return required_warmup(strategies, settle=settle) + max(int(tail), 1)
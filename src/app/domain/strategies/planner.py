@@ -0,0 +1,286 @@
+# src/app/domain/strategies/planner.py
+"""
+指標 DAG 規劃器（common-subexpression elimination）：
+- 把一或多個策略的所有運算元展開成「原語節點」：
+    src（open/high/low/close/volume/hlc3）、sma（rolling mean）、rstd（rolling std）、
+    rmax/rmin（滑動極值）、ema（遞迴 EMA/RMA）、seeded（帶初值遞迴，KD 用）、diff1、mask（warm-up）與少量組合節點（sub/axpy/bias/rsi…）
+- 節點以內容定址（op, inputs, consts）→ 相同計算只會出現一次：
+    BOLL/BIAS/MA 共用同一個 sma(close, w)；MACD 的兩條 EMA 與 EMA 指標共用；
+    多個條件、多個策略引用同一個指標也只算一次
+- Plan.execute(panel) 依拓撲順序每個節點算一次（panel 模式 → 一次涵蓋整個 universe）
+- Plan.stats 回報 requested / unique / removed，用來量測實際省下多少計算：只計運算節點，
+  src / const（讀欄位、常數）重複引用不算省下的計算，另以 leaves 回報
+未展開的指標（無對應 expander）以單一不透明節點呼叫 registry.calc_panel，仍可去重。
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.indicators import kernels as K
+from app.indicators import registry
+from app.indicators.builtin import kd as _kd
+from app.indicators.cache import canonical_params
+from .validation import IndicatorRefOperand, NumberOperand, SeriesRefOperand, Strategy
+
+NodeKey = Tuple[Any, ...]  # (op, inputs, consts)
+Panel = Mapping[str, np.ndarray]
+# 讀欄位／常數：不是計算，重複引用不列入 requested / removed
+LEAF_OPS = ("src", "const")
+
+
+@dataclass(frozen=True)
+class Node:
+    op: str
+    inputs: Tuple[NodeKey, ...]
+    consts: Tuple[Any, ...]
+
+    @property
+    def key(self) -> NodeKey:
+        return (self.op, self.inputs, self.consts)
+
+
+# ------------------------------------------------------------
+# 原語運算（皆為欄向量化，沿 axis=0）
+# ------------------------------------------------------------
+def _op_src(panel: Panel, name: str) -> np.ndarray:
+    if name == "hlc3":
+        return (panel["high"] + panel["low"] + panel["close"]) / 3.0
+    return panel[name]
+
+
+def _op_rsi(ag: np.ndarray, al: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = ag / np.where(al == 0, np.nan, al)
+        out = 100 - (100 / (1 + rs))
+    out[np.isnan(out)] = 50
+    return out
+
+
+def _op_bias(x: np.ndarray, ma: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (x - ma) / ma * 100
+
+
+def _op_mask(x: np.ndarray, base: np.ndarray, n: int) -> np.ndarray:
+    return K.mask_head(x.copy(), n, K.first_valid(base))
+
+
+def _op_calc(src: np.ndarray, panel: Panel, name: str, params_json: str, field: Optional[str]) -> np.ndarray:
+    inputs = dict(panel)
+    inputs["close"] = src
+    return registry.calc_panel(name, inputs, json.loads(params_json), field=field)
+
+
+# op → fn(*input_arrays, *consts)；"src"/"calc" 需要 panel，另行處理
+OPS: Dict[str, Callable[..., Any]] = {
+    "const": lambda v: v,
+    "sma": lambda x, w: K.rolling_mean(x, w),
+    "rstd": lambda x, w: K.rolling_std(x, w, ddof=0),
+    "rmax": lambda x, w: K.rolling_max(x, w),
+    "rmin": lambda x, w: K.rolling_min(x, w),
+    "ema": lambda x, alpha: K.ewm_mean(x, alpha),
+    "seeded": lambda x, alpha, seed: K.ewm_seeded(x, alpha, seed),
+    "diff1": lambda x: K.shift_diff(x),
+    "pos": lambda x: np.maximum(x, 0.0),
+    "neg": lambda x: -np.minimum(x, 0.0),
+    "sub": lambda a, b: a - b,
+    "axpy": lambda a, b, k: a + k * b,
+    "mask": _op_mask,
+    "rsi": _op_rsi,
+    "bias": _op_bias,
+    "rsv": _kd.rsv,
+}
+
+
+# ------------------------------------------------------------
+# Plan / Builder
+# ------------------------------------------------------------
+@dataclass
+class Plan:
+    nodes: Dict[NodeKey, Node]
+    requested: int = 0  # 運算節點的引用次數（不含 LEAF_OPS）
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        leaves = sum(1 for k in self.nodes if k[0] in LEAF_OPS)
+        unique = len(self.nodes) - leaves
+        return {"requested": self.requested, "unique": unique, "removed": self.requested - unique, "leaves": leaves}
+
+    def merge(self, *others: "Plan") -> "Plan":
+        nodes = dict(self.nodes)
+        requested = self.requested
+        for p in others:
+            for k, n in p.nodes.items():
+                nodes.setdefault(k, n)
+            requested += p.requested
+        return Plan(nodes=nodes, requested=requested)
+
+    def execute(self, panel: Panel, *, only: Optional[Iterable[NodeKey]] = None) -> Dict[NodeKey, Any]:
+        """
+        依拓撲順序計算節點（每個節點一次）。
+        only 指定時只計算其祖先閉包（多策略共用 Plan 時只算需要的部分）。
+        """
+        keys = self._closure(only) if only is not None else list(self.nodes)
+        values: Dict[NodeKey, Any] = {}
+        for key in keys:
+            node = self.nodes[key]
+            if node.op == "src":
+                values[key] = _op_src(panel, *node.consts)
+            elif node.op == "calc":
+                values[key] = _op_calc(values[node.inputs[0]], panel, *node.consts)
+            else:
+                values[key] = OPS[node.op](*(values[i] for i in node.inputs), *node.consts)
+        return values
+
+    def _closure(self, roots: Iterable[NodeKey]) -> List[NodeKey]:
+        need: set = set()
+        stack = list(roots)
+        while stack:
+            k = stack.pop()
+            if k in need:
+                continue
+            need.add(k)
+            stack.extend(self.nodes[k].inputs)
+        return [k for k in self.nodes if k in need]
+
+
+class PlanBuilder:
+    def __init__(self) -> None:
+        self.nodes: Dict[NodeKey, Node] = {}
+        self.requested = 0
+
+    def node(self, op: str, inputs: Iterable[NodeKey] = (), consts: Iterable[Any] = ()) -> NodeKey:
+        n = Node(op=op, inputs=tuple(inputs), consts=tuple(consts))
+        if op not in LEAF_OPS:
+            self.requested += 1
+        self.nodes.setdefault(n.key, n)  # 子節點一定先建立 → dict 順序即拓撲順序
+        return n.key
+
+    def source(self, name: str) -> NodeKey:
+        return self.node("src", consts=("hlc3" if name == "typical" else name,))
+
+    def operand(self, op: Any) -> NodeKey:
+        if isinstance(op, NumberOperand):
+            return self.node("const", consts=(float(op.value),))
+        if isinstance(op, SeriesRefOperand):
+            return self.source(op.series)
+        if isinstance(op, IndicatorRefOperand):
+            return self.indicator(op.indicator, op.params, source=op.source, field=op.field)
+        raise TypeError(f"unsupported operand: {type(op).__name__}")
+
+    def indicator(self, name: str, params: Dict[str, Any], *, source: Optional[str] = "close", field: Optional[str] = None) -> NodeKey:
+        key = (name or "").lower()
+        meta = registry.get(key).get("meta", {})
+        fields = meta.get("fields")
+        field = field or meta.get("default_field") or (fields[0] if fields else None)
+        expander = EXPANDERS.get(key)
+        if expander is None:
+            return self.node("calc", [self.source(source or "close")], (key, canonical_params(params), field))
+        return expander(self, params or {}, source or "close", field)
+
+    def build(self) -> Plan:
+        return Plan(nodes=dict(self.nodes), requested=self.requested)
+
+
+# ------------------------------------------------------------
+# 內建指標 → 原語展開（數值與 builtin/*.compute_panel 相同）
+# ------------------------------------------------------------
+def _ema_masked(b: PlanBuilder, x: NodeKey, span: int, base: NodeKey) -> NodeKey:
+    raw = b.node("ema", [x], (2.0 / (span + 1),))
+    return b.node("mask", [raw, base], (max(span - 1, 0),))
+
+
+def _x_ma(b: PlanBuilder, p, source, field):
+    return b.node("sma", [b.source(source)], (int(p["window"]),))
+
+
+def _x_ema(b: PlanBuilder, p, source, field):
+    src = b.source(source)
+    return _ema_masked(b, src, int(p["window"]), src)
+
+
+def _x_rsi(b: PlanBuilder, p, source, field):
+    period = int(p["period"])
+    src = b.source(source)
+    d = b.node("diff1", [src])
+    ag = b.node("ema", [b.node("pos", [d])], (1.0 / period,))
+    al = b.node("ema", [b.node("neg", [d])], (1.0 / period,))
+    return b.node("mask", [b.node("rsi", [ag, al]), src], (max(period, 1),))
+
+
+def _x_macd(b: PlanBuilder, p, source, field):
+    fast, slow, signal = int(p["fast"]), int(p["slow"]), int(p["signal"])
+    src = b.source(source)
+    macd = b.node("sub", [_ema_masked(b, src, fast, src), _ema_masked(b, src, slow, src)])
+    if field == "macd":
+        return macd
+    sig = _ema_masked(b, macd, signal, src)
+    if field == "signal":
+        return sig
+    return b.node("sub", [macd, sig])
+
+
+def _x_boll(b: PlanBuilder, p, source, field):
+    w, mult = int(p["window"]), float(p["mult"])
+    src = b.source(source)
+    m = b.node("sma", [src], (w,))
+    if field == "middle":
+        return m
+    sd = b.node("rstd", [src], (w,))
+    return b.node("axpy", [m, sd], (mult if field == "upper" else -mult,))
+
+
+def _x_bias(b: PlanBuilder, p, source, field):
+    src = b.source(source)
+    return b.node("bias", [src, b.node("sma", [src], (int(p["window"]),))])
+
+
+def _x_volume(b: PlanBuilder, p, source, field):
+    vol = b.source("volume")
+    w = p.get("window")
+    return vol if w is None else b.node("sma", [vol], (int(w),))
+
+
+def _x_diff(b: PlanBuilder, p, source, field):
+    allowed = {"open", "high", "low", "close", "volume"}
+    if p.get("left") not in allowed or p.get("right") not in allowed:
+        raise ValueError("DIFF.left/right must be one of open/high/low/close/volume")
+    return b.node("sub", [b.source(p["left"]), b.source(p["right"])])
+
+
+def _x_kd(b: PlanBuilder, p, source, field):
+    n = int(p["k_period"])
+    hh = b.node("rmax", [b.source("high")], (n,))
+    ll = b.node("rmin", [b.source("low")], (n,))
+    rsv = b.node("rsv", [b.source("close"), hh, ll])
+    k = b.node("seeded", [rsv], (1.0 / int(p.get("smooth", 1)), _kd.SEED))
+    if field == "k":
+        return k
+    return b.node("seeded", [k], (1.0 / int(p["d_period"]), _kd.SEED))
+
+
+EXPANDERS: Dict[str, Callable[[PlanBuilder, Dict[str, Any], str, Optional[str]], NodeKey]] = {
+    "ma": _x_ma,
+    "ema": _x_ema,
+    "rsi": _x_rsi,
+    "macd": _x_macd,
+    "boll": _x_boll,
+    "bias": _x_bias,
+    "volume": _x_volume,
+    "diff": _x_diff,
+    "kd": _x_kd,
+}
+
+
+def plan_strategies(strategies: Iterable[Strategy]) -> Plan:
+    """把多個策略所有條件的左右運算元放進同一張 DAG"""
+    b = PlanBuilder()
+    for st in strategies:
+        for cond in st.conditions:
+            b.operand(cond.left)
+            b.operand(cond.right)
+    return b.build()
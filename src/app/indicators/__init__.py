@@ -2,10 +2,15 @@
 """
 Indicators package bootstrap:
 - 暴露 registry 物件
+- 每個內建指標同時註冊單檔版（fn，pandas 參考實作）、panel 版（panel_fn，欄向量化 NumPy）
+  與增量版（stream_cls，每根新 bar O(1) 更新）；registry.calc 一律走 panel_fn（單檔 = (n, 1) panel）
+- 均線家族另註冊 sweep_fn：registry.calc_sweep 一次算多個 window
 - 匯入並註冊內建指標（名稱大小寫不敏感；一律以小寫註冊）
+- meta["timeframes"] 宣告支援的週期；週 / 月線由 data_pipeline/resample.py 彙總後以同一個 panel_fn 計算
 """
 
 from . import registry  # re-export
+from . import cache  # re-export：指標結果快取（scan/backtest/alert 共用）
 
 # ---- import builtin modules ----
 from .builtin import ma as _ma
@@ -16,13 +21,18 @@ from .builtin import boll as _boll
 from .builtin import bias as _bias
 from .builtin import volume as _volume
 from .builtin import diff as _diff
+from .builtin import kd as _kd
+from . import streaming as _streaming
 
 # ---- register all builtins (keys in lowercase) ----
 registry.register(
     name="ma",
     fn=_ma.compute,
+    panel_fn=_ma.compute_panel,
+    sweep_fn=_ma.compute_sweep,
+    stream_cls=_streaming.MAState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         "fields": None,
         "default_field": None,
         "warmup": lambda p: int((p or {}).get("window", 5)),
@@ -32,10 +42,14 @@ registry.register(
 registry.register(
     name="ema",
     fn=_ema.compute,
+    panel_fn=_ema.compute_panel,
+    sweep_fn=_ema.compute_sweep,
+    stream_cls=_streaming.EMAState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         "fields": None,
         "default_field": None,
+        "recursive": True,  # 遞迴型：值依賴全部歷史（見 domain/strategies/lookback.py）
         "warmup": lambda p: int((p or {}).get("window", 5)),
     },
 )
@@ -43,10 +57,13 @@ registry.register(
 registry.register(
     name="rsi",
     fn=_rsi.compute,
+    panel_fn=_rsi.compute_panel,
+    stream_cls=_streaming.RSIState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         "fields": None,
         "default_field": None,
+        "recursive": True,
         "warmup": lambda p: int((p or {}).get("period", 14)),
     },
 )
@@ -54,10 +71,13 @@ registry.register(
 registry.register(
     name="macd",
     fn=_macd.compute,
+    panel_fn=_macd.compute_panel,
+    stream_cls=_streaming.MACDState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         "fields": ["macd", "signal", "hist"],
         "default_field": "macd",
+        "recursive": True,
         "warmup": lambda p: max(int((p or {}).get("fast", 12)), int((p or {}).get("slow", 26))) + int((p or {}).get("signal", 9)),
     },
 )
@@ -65,8 +85,11 @@ registry.register(
 registry.register(
     name="boll",
     fn=_boll.compute,
+    panel_fn=_boll.compute_panel,
+    sweep_fn=_boll.compute_sweep,
+    stream_cls=_streaming.BOLLState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         "fields": ["middle", "upper", "lower"],
         "default_field": "middle",
         "warmup": lambda p: int((p or {}).get("window", 20)),
@@ -76,8 +99,11 @@ registry.register(
 registry.register(
     name="bias",
     fn=_bias.compute,
+    panel_fn=_bias.compute_panel,
+    sweep_fn=_bias.compute_sweep,
+    stream_cls=_streaming.BIASState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         "fields": None,
         "default_field": None,
         "warmup": lambda p: int((p or {}).get("window", 20)),
@@ -87,8 +113,11 @@ registry.register(
 registry.register(
     name="volume",
     fn=_volume.compute,
+    panel_fn=_volume.compute_panel,
+    sweep_fn=_volume.compute_sweep,
+    stream_cls=_streaming.VolumeState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         # 內建 volume 常見回傳 raw / ma
         "fields": ["raw", "ma"],
         "default_field": "raw",
@@ -99,10 +128,26 @@ registry.register(
 registry.register(
     name="diff",
     fn=_diff.compute,
+    panel_fn=_diff.compute_panel,
+    stream_cls=_streaming.DiffState,
     meta={
-        "timeframes": ["1d"],
+        "timeframes": ["1d", "1w", "1m"],
         "fields": None,
         "default_field": None,
         "warmup": lambda p: 1,
     },
-)
\ No newline at end of file
+)
+
+registry.register(
+    name="kd",
+    fn=_kd.compute,
+    panel_fn=_kd.compute_panel,
+    stream_cls=_streaming.KDState,
+    meta={
+        "timeframes": ["1d", "1w", "1m"],
+        "fields": ["k", "d"],
+        "default_field": "k",
+        "recursive": True,
+        "warmup": lambda p: int((p or {}).get("k_period", 9)) + int((p or {}).get("smooth", 1)) + int((p or {}).get("d_period", 3)),
+    },
+)
@@ -1,7 +1,29 @@
 import pandas as pd
+import numpy as np
+from .. import kernels as K
 
 def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None) -> pd.Series:
     w = int(params["window"])
     ma = data["close"].rolling(window=w, min_periods=w).mean()
     bias = (data["close"] - ma) / ma * 100
     return bias
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None, out=None) -> np.ndarray:
+    w = int(params["window"])
+    close = panel["close"]
+    ma = K.rolling_mean(close, w)
+    out = K.out_buffer(close, out)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.subtract(close, ma, out=out)
+        out /= ma
+        out *= 100
+    return out
+
+def compute_sweep(panel, params: dict, windows, *, timeframe: str="1d", field=None) -> np.ndarray:
+    close = panel["close"][:, 0]
+    ma = K.sweep_mean(close, windows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.subtract(close[None, :], ma)
+        out /= ma
+        out *= 100
+    return out
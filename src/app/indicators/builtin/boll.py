@@ -1,4 +1,6 @@
 import pandas as pd
+import numpy as np
+from .. import kernels as K
 
 def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None) -> pd.DataFrame:
     w = int(params["window"]); mult = float(params["mult"])
@@ -7,3 +9,18 @@ def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None
     upper = m + mult*std
     lower = m - mult*std
     return pd.DataFrame({"upper": upper, "middle": m, "lower": lower})
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None) -> dict:
+    w = int(params["window"]); mult = float(params["mult"])
+    close = panel["close"]
+    m = K.rolling_mean(close, w)
+    std = K.rolling_std(close, w, ddof=0)
+    return {"upper": m + mult*std, "middle": m, "lower": m - mult*std}
+
+def compute_sweep(panel, params: dict, windows, *, timeframe: str="1d", field=None) -> dict:
+    # x 與 x^2 的前綴和各算一次，所有 window 共用
+    mult = float(params["mult"])
+    close = panel["close"][:, 0]
+    m = K.sweep_mean(close, windows)
+    std = np.sqrt(K.sweep_var(close, windows, ddof=0))
+    return {"upper": m + mult*std, "middle": m, "lower": m - mult*std}
@@ -1,4 +1,6 @@
 import pandas as pd
+import numpy as np
+from .. import kernels as K
 
 ALLOWED = {"open","high","low","close","volume"}
 
@@ -8,3 +10,9 @@ def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None
     if left not in ALLOWED or right not in ALLOWED:
         raise ValueError("DIFF.left/right must be one of open/high/low/close/volume")
     return data[left] - data[right]
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None, out=None) -> np.ndarray:
+    left = params.get("left"); right = params.get("right")
+    if left not in ALLOWED or right not in ALLOWED:
+        raise ValueError("DIFF.left/right must be one of open/high/low/close/volume")
+    return np.subtract(panel[left], panel[right], out=K.out_buffer(panel[left], out))
@@ -1,4 +1,6 @@
 import pandas as pd
+import numpy as np
+from .. import kernels as K
 
 def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None) -> pd.Series:
     w = int(params["window"])
@@ -6,3 +8,19 @@ def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None
     # warm-up：前 w-1 設為 NaN
     s.iloc[:max(w-1,0)] = pd.NA
     return s
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None, out=None) -> np.ndarray:
+    w = int(params["window"])
+    close = panel["close"]
+    s = K.ewm_mean(close, 2.0 / (w + 1), out=out)
+    return K.mask_head(s, max(w-1,0), K.first_valid(close))
+
+def compute_sweep(panel, params: dict, windows, *, timeframe: str="1d", field=None) -> np.ndarray:
+    # 同一序列複製成 len(windows) 欄、每欄一個 span，一次批次遞迴
+    w = np.asarray(windows, dtype=np.int64)
+    close = panel["close"]
+    s = K.ewm_mean(np.repeat(close, w.size, axis=1), 2.0 / (w + 1))
+    first = int(K.first_valid(close)[0])
+    rows = np.arange(s.shape[0])[:, None]
+    s[rows < first + np.maximum(w - 1, 0)[None, :]] = np.nan
+    return s.T
@@ -0,0 +1,31 @@
+import pandas as pd
+import numpy as np
+from .. import kernels as K
+
+SEED = 50.0  # 台股慣例：K、D 初值 50
+
+def rsv(close: np.ndarray, hh: np.ndarray, ll: np.ndarray) -> np.ndarray:
+    """RSV = (C - LLV) / (HHV - LLV) * 100；HHV == LLV（區間為 0）時取 50"""
+    rng = hh - ll
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(rng > 0, (close - ll) / rng * 100, 50.0)
+    out[np.isnan(rng) | np.isnan(close)] = np.nan
+    return out
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None) -> dict:
+    k_period = int(params["k_period"]); d_period = int(params["d_period"])
+    smooth = int(params.get("smooth", 1))
+    # HHV/LLV：van Herk 滑動極值，O(n) 與 k_period 無關
+    hh = K.rolling_max(panel["high"], k_period)
+    ll = K.rolling_min(panel["low"], k_period)
+    raw = rsv(panel["close"], hh, ll)
+    # K = 前K*(smooth-1)/smooth + RSV/smooth（smooth=1 → K 即 RSV；常見 KD(9,3,3) 為 smooth=3）
+    k = K.ewm_seeded(raw, 1.0 / smooth, SEED)
+    # D = 前D*(d-1)/d + K/d
+    d = K.ewm_seeded(k, 1.0 / d_period, SEED)
+    return {"k": k, "d": d}
+
+def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None) -> pd.DataFrame:
+    panel = {c: K.as_2d(data[c].to_numpy(dtype=float)) for c in ("high", "low", "close")}
+    out = compute_panel(panel, params, timeframe=timeframe, field=field)
+    return pd.DataFrame({f: v[:, 0] for f, v in out.items()}, index=data.index)
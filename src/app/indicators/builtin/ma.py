@@ -1,5 +1,7 @@
 # src/app/indicators/builtin/ma.py
 import pandas as pd
+import numpy as np
+from .. import kernels as K
 
 def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None) -> pd.Series:
     w = int(params["window"])
@@ -7,3 +9,13 @@ def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None
     # 前 w-1 筆強制 NaN
     s.iloc[:w-1] = pd.NA
     return s
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None, out=None) -> np.ndarray:
+    w = int(params["window"])
+    close = panel["close"]
+    s = K.rolling_mean(close, w, out=out)
+    return K.mask_head(s, w-1, K.first_valid(close))
+
+def compute_sweep(panel, params: dict, windows, *, timeframe: str="1d", field=None) -> np.ndarray:
+    # 所有 window 共用一個前綴和 → (len(windows), rows)
+    return K.sweep_mean(panel["close"][:, 0], windows)
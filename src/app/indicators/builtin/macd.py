@@ -1,4 +1,6 @@
 import pandas as pd
+import numpy as np
+from .. import kernels as K
 
 def _ema(s: pd.Series, n: int) -> pd.Series:
     e = s.ewm(span=n, adjust=False).mean()
@@ -15,3 +17,14 @@ def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None
     signal_line.iloc[:max(signal-1,0)] = pd.NA
     hist = macd - signal_line
     return pd.DataFrame({"macd": macd, "signal": signal_line, "hist": hist})
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None) -> dict:
+    fast = int(params["fast"]); slow = int(params["slow"]); signal = int(params["signal"])
+    close = panel["close"]
+    first = K.first_valid(close)
+    ema_fast = K.mask_head(K.ewm_mean(close, 2.0 / (fast + 1)), max(fast-1,0), first)
+    ema_slow = K.mask_head(K.ewm_mean(close, 2.0 / (slow + 1)), max(slow-1,0), first)
+    macd = ema_fast - ema_slow
+    signal_line = K.mask_head(K.ewm_mean(macd, 2.0 / (signal + 1)), max(signal-1,0), first)
+    hist = macd - signal_line
+    return {"macd": macd, "signal": signal_line, "hist": hist}
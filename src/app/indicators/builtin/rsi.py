@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from .. import kernels as K
 
 def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None) -> pd.Series:
     p = int(params["period"])
@@ -16,3 +17,22 @@ def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None
     rsi = rsi.fillna(50)
     rsi.iloc[:max(p,1)] = pd.NA  # warm-up 前 p 筆 NaN（含第一筆）
     return rsi
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None, out=None) -> np.ndarray:
+    p = int(params["period"])
+    close = panel["close"]
+    delta = K.shift_diff(close)
+    gain = np.maximum(delta, 0.0)
+    loss = -np.minimum(delta, 0.0)
+    # 每欄自第一筆有效 close 起算，delta 首筆為 NaN → RMA 由第二筆開始
+    avg_gain = K.ewm_mean(gain, 1.0 / p, out=gain)
+    avg_loss = K.ewm_mean(loss, 1.0 / p, out=loss)
+    rsi = K.out_buffer(close, out)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_loss[avg_loss == 0] = np.nan
+        np.divide(avg_gain, avg_loss, out=rsi)
+        rsi += 1
+        np.divide(100, rsi, out=rsi)
+        np.subtract(100, rsi, out=rsi)
+    rsi[np.isnan(rsi)] = 50
+    return K.mask_head(rsi, max(p,1), K.first_valid(close))
@@ -1,4 +1,6 @@
 import pandas as pd
+import numpy as np
+from .. import kernels as K
 
 def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None) -> pd.Series:
     w = params.get("window")
@@ -6,3 +8,14 @@ def compute(data: pd.DataFrame, params: dict, *, timeframe: str="1d", field=None
         return data["volume"]
     w = int(w)
     return data["volume"].rolling(window=w, min_periods=w).mean()
+
+def compute_panel(panel, params: dict, *, timeframe: str="1d", field=None, out=None) -> np.ndarray:
+    w = params.get("window")
+    if w is None:
+        out = K.out_buffer(panel["volume"], out)
+        out[:] = panel["volume"]
+        return out
+    return K.rolling_mean(panel["volume"], int(w), out=out)
+
+def compute_sweep(panel, params: dict, windows, *, timeframe: str="1d", field=None) -> np.ndarray:
+    return K.sweep_mean(panel["volume"][:, 0], windows)
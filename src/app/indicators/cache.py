@@ -0,0 +1,117 @@
+# src/app/indicators/cache.py
+"""
+指標結果快取（包在 registry.calc 外層）：
+- key = (symbol, 指標名, 正規化 params, field, timeframe, data_version)
+- 同一策略重複引用 MA(window=20)、或多個策略共用相同參數時只算一次
+- scan / backtest / alert 在同一行程內共用 get_cache() 這個實例
+- 容量以位元組預算控制（INDICATOR_CACHE_MAX_BYTES，預設 128MB），LRU 淘汰
+回傳的 Series 為快取本體，呼叫端請勿就地修改。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.cache import ByteLRUCache
+from app.config import get_env_int
+from . import registry
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+_CACHE = ByteLRUCache(get_env_int("INDICATOR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def get_cache() -> ByteLRUCache:
+    return _CACHE
+
+
+def configure(max_bytes: int) -> None:
+    """調整記憶體預算（立即淘汰到新上限以內）"""
+    _CACHE.resize(max_bytes)
+
+
+def canonical_params(params: Optional[Dict[str, Any]]) -> str:
+    """參數正規化：鍵排序、去空白；20 與 20.0 視為相同"""
+    def norm(v: Any) -> Any:
+        if isinstance(v, float) and v.is_integer():
+            return int(v)
+        if isinstance(v, dict):
+            return {str(k): norm(x) for k, x in v.items()}
+        if isinstance(v, (list, tuple)):
+            return [norm(x) for x in v]
+        return v
+    return json.dumps(norm(params or {}), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def fingerprint(data: pd.DataFrame) -> str:
+    """
+    未提供 data_version 時的後備：以 OHLCV 內容雜湊當版本。
+    成本 O(rows)，仍遠低於重算指標；有正式版本號時請直接傳入。
+    """
+    h = hashlib.blake2b(digest_size=12)
+    h.update(str(len(data)).encode())
+    if len(data):
+        h.update(str(data.index[0]).encode())
+        h.update(str(data.index[-1]).encode())
+    for col in registry.OHLCV_COLUMNS:
+        if col in data.columns:
+            h.update(np.ascontiguousarray(data[col].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def _resolve_field(name: str, field: Optional[str]) -> Optional[str]:
+    meta = registry.get(name).get("meta", {})
+    fields = meta.get("fields")
+    return field or meta.get("default_field") or (fields[0] if fields else None)
+
+
+def cache_key(
+    symbol: Optional[str],
+    name: str,
+    params: Optional[Dict[str, Any]],
+    *,
+    field: Optional[str],
+    timeframe: str,
+    version: str,
+) -> Tuple[Any, ...]:
+    return (
+        symbol,
+        (name or "").lower(),
+        canonical_params(params),
+        _resolve_field(name, field),
+        (timeframe or "1d").lower(),
+        version,
+    )
+
+
+def calc_cached(
+    symbol: Optional[str],
+    name: str,
+    data: pd.DataFrame,
+    params: Dict[str, Any],
+    *,
+    timeframe: str = "1d",
+    field: Optional[str] = None,
+    data_version: Optional[str] = None,
+) -> pd.Series:
+    """
+    與 registry.calc 相同語意，但先查快取。
+    - symbol: 股票代號；匿名資料可傳 None（此時以內容雜湊區分）
+    - data_version: 資料版本（ingest 更新後應變動）；None → 以內容雜湊計算
+    """
+    version = data_version if data_version is not None else fingerprint(data)
+    key = cache_key(symbol, name, params, field=field, timeframe=timeframe, version=version)
+    found, value = _CACHE.get(key)
+    if found:
+        return value
+    out = registry.calc(name, data, params, timeframe=timeframe, field=field)
+    _CACHE.put(key, out)
+    return out
+
+
+def stats() -> Dict[str, Any]:
+    return _CACHE.stats()
@@ -0,0 +1,407 @@
+# src/app/indicators/kernels.py
+"""
+欄向量化（column-wise）NumPy 指標核心：
+- 輸入一律為 2-D ndarray（rows=日期, cols=股票），沿 axis=0 計算
+- 一次呼叫處理整個 universe，Python 層迴圈只跟 bar 數有關、與股票數無關
+- NaN 語意對齊 pandas：rolling(min_periods=window)、ewm(adjust=False)
+- 所有核心皆接受 out=（呼叫端預先配置、同 shape 的 float64 陣列），結果直接寫入；
+  warm-up 遮罩（mask_head）同樣 in-place，單檔短序列不再多出 Series 複本
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Optional
+
+import numpy as np
+
+# rolling_var 分段長度：每段以段內均值為錨點平移，並重新起算 cumsum
+VAR_BLOCK = 1024
+# E[d^2] / var 超過此比值（相減後剩不到約 6 位有效數字）的視窗改以兩段式精算
+VAR_RECHECK_RATIO = 1e4
+# EMA 閉式解分段：段內 decay^len 不小於此值，避免 1/decay^k 溢位。
+# 誤差約 eps*|x|/alpha，與段長無關（早期小項被吸收時，其真實貢獻同樣低於 eps）
+EWM_MIN_SCALE = 1e-200
+
+
+def as_2d(x: Any) -> np.ndarray:
+    """轉成 float64 的 2-D 陣列；1-D 視為單一欄位 (n, 1)"""
+    a = np.asarray(x, dtype=np.float64)
+    if a.ndim == 1:
+        a = a[:, None]
+    if a.ndim != 2:
+        raise ValueError(f"panel array must be 1-D or 2-D, got ndim={a.ndim}")
+    return a
+
+
+def out_buffer(x: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """取得輸出緩衝：未給則配置；給了則檢查 shape/dtype"""
+    if out is None:
+        return np.empty_like(x, dtype=np.float64)
+    if out.shape != x.shape or out.dtype != np.float64:
+        raise ValueError(f"out must be float64 with shape {x.shape}, got {out.dtype} {out.shape}")
+    return out
+
+
+def first_valid(x: np.ndarray) -> np.ndarray:
+    """每欄第一個非 NaN 的 row index；整欄皆 NaN 時回傳 rows 數"""
+    valid = ~np.isnan(x)
+    idx = valid.argmax(axis=0)
+    idx[~valid.any(axis=0)] = x.shape[0]
+    return idx
+
+
+def mask_head(out: np.ndarray, n: int, first: np.ndarray) -> np.ndarray:
+    """
+    warm-up 遮罩（in-place）：每欄自第一筆有效值起算，前 n 筆設為 NaN。
+    等同單檔 pandas 版本的 `s.iloc[:n] = NA`（上市較晚的股票以其首筆資料為起點）。
+    """
+    if n <= 0:
+        return out
+    if out.shape[1] == 1:
+        out[: int(first[0]) + n] = np.nan
+        return out
+    rows = np.arange(out.shape[0])[:, None]
+    out[rows < (first + n)[None, :]] = np.nan
+    return out
+
+
+def shift_diff(x: np.ndarray, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """x[t] - x[t-1]；第一列為 NaN（等同 Series.diff()）"""
+    out = out_buffer(x, out)
+    out[:1] = np.nan
+    np.subtract(x[1:], x[:-1], out=out[1:])
+    return out
+
+
+def rolling_sum(x: np.ndarray, window: int, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    累加和（cumsum）差分的滑動和，O(rows) 與 window 無關。
+    視窗內含 NaN 時輸出 NaN（等同 min_periods=window）。
+    """
+    n = x.shape[0]
+    out = out_buffer(x, out)
+    if window <= 0 or window > n:
+        out.fill(np.nan)
+        return out
+    out[: window - 1] = np.nan
+    valid = ~np.isnan(x)
+    cs = np.zeros((n + 1, x.shape[1]))
+    np.cumsum(np.where(valid, x, 0.0), axis=0, out=cs[1:])
+    np.subtract(cs[window:], cs[:-window], out=out[window - 1:])
+    if not valid.all():
+        cnt = np.zeros((n + 1, x.shape[1]), dtype=np.int64)
+        np.cumsum(valid, axis=0, out=cnt[1:])
+        out[window - 1:][(cnt[window:] - cnt[:-window]) != window] = np.nan
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    out = rolling_sum(x, window, out=out)
+    out /= float(window)
+    return out
+
+
+def rolling_var(x: np.ndarray, window: int, ddof: int = 0, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    滑動變異數（數值穩定版）：
+    - 以 VAR_BLOCK 列為一段，每段以段內均值為錨點平移後用 E[d^2] - E[d]^2 計算
+    - 每段重新起算 cumsum → 長序列的大數相減誤差不會累積，價格長期漂移也不影響精度
+    - 段內價位跳動（除權息、漲跌停鎖死的平盤）導致相消過大的視窗，以兩段式逐窗精算
+    - 負的微小誤差截為 0
+    """
+    n, m = x.shape
+    out = out_buffer(x, out)
+    out.fill(np.nan)
+    if window <= 0 or window > n or window - ddof <= 0:
+        return out
+    block = max(VAR_BLOCK, window)
+    for s in range(window - 1, n, block):
+        e = min(s + block, n)
+        seg = x[s - window + 1: e]
+        valid = ~np.isnan(seg)
+        if valid.all():
+            anchor = seg.mean(axis=0)
+        else:
+            cnt = valid.sum(axis=0)
+            anchor = np.where(cnt > 0, np.nansum(seg, axis=0) / np.maximum(cnt, 1), 0.0)
+        d = seg - anchor[None, :]
+        s1 = rolling_sum(d, window)[window - 1:]
+        s2 = rolling_sum(d * d, window)[window - 1:]
+        dev = s2 - s1 * s1 / window
+        np.divide(dev, float(window - ddof), out=out[s:e])
+        with np.errstate(invalid="ignore"):
+            bad = s2 > VAR_RECHECK_RATIO * np.maximum(dev, 0.0)
+        if bad.any():
+            r, c = np.nonzero(bad)
+            wins = np.lib.stride_tricks.sliding_window_view(seg, window, axis=0)[r, c]
+            out[s + r, c] = wins.var(axis=1, ddof=ddof)
+    np.maximum(out, 0.0, out=out, where=~np.isnan(out))
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 0, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    out = rolling_var(x, window, ddof, out=out)
+    np.sqrt(out, out=out)
+    return out
+
+
+def _rolling_extreme(x: np.ndarray, window: int, ufunc: np.ufunc, out: Optional[np.ndarray]) -> np.ndarray:
+    """
+    van Herk / Gil-Werman：把序列切成長度 = window 的區塊，
+    視窗 [i, i+w-1] 的極值 = ufunc(區塊後綴[i], 區塊前綴[i+w-1])。
+    每列只做常數次運算 → O(rows)，與 window 無關；整段以 NumPy 向量化、沿 axis=0 支援 panel。
+    視窗內含 NaN 時輸出 NaN（等同 min_periods=window）。
+    """
+    n, m = x.shape
+    out = out_buffer(x, out)
+    if window <= 0 or window > n:
+        out.fill(np.nan)
+        return out
+    if window == 1:
+        out[:] = x
+        return out
+    nb = -(-n // window)
+    padded = np.full((nb * window, m), np.nan)
+    padded[:n] = x
+    blocks = padded.reshape(nb, window, m)
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(nb * window, m)
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(nb * window, m)
+    out[: window - 1] = np.nan
+    ufunc(suffix[: n - window + 1], prefix[window - 1: n], out=out[window - 1:])
+    return out
+
+
+def rolling_max(x: np.ndarray, window: int, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """滑動最大值（Donchian 上緣、KD/Williams %R 的 HHV）"""
+    return _rolling_extreme(x, window, np.maximum, out)
+
+
+def rolling_min(x: np.ndarray, window: int, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """滑動最小值（Donchian 下緣、KD/Williams %R 的 LLV）"""
+    return _rolling_extreme(x, window, np.minimum, out)
+
+
+def _linear_recurrence(x: np.ndarray, alpha: Any, y0: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    y[t] = (1-alpha)*y[t-1] + alpha*x[t]（x 不含 NaN，y[-1] = y0）的分段閉式解：
+    段內 y[j] = p[j] * (y_prev + alpha * cumsum(x / p)[j])，p[j] = decay^(j+1)。
+    段長使 p 不小於 EWM_MIN_SCALE；Python 迴圈只跑 rows/段長 次。
+    alpha 可為純量或每欄一個（參數掃描：同一序列複製成多欄、各欄不同 span）。
+    """
+    n, m = x.shape
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (m,))
+    decay = 1.0 - alpha
+    direct = decay <= 0.0  # alpha = 1：y 即 x
+    if direct.all():
+        out[:] = x
+        return out
+    decay = np.where(direct, 0.5, decay)
+    slowest = float(decay.min())
+    block = n if slowest == 1.0 else max(1, int(math.log(EWM_MIN_SCALE) / math.log(slowest)))
+    block = min(block, n)
+    p = decay[None, :] ** np.arange(1, block + 1, dtype=np.float64)[:, None]
+    # out 可與 x 共用記憶體（ewm_mean(x, a, out=x)）：種子與 alpha=1 欄位先複製，避免第一段就被覆寫
+    prev = np.array(np.broadcast_to(np.asarray(y0, dtype=np.float64), (m,)), copy=True)
+    keep = x[:, direct].copy() if direct.any() else None
+    for s in range(0, n, block):
+        e = min(s + block, n)
+        pj = p[: e - s]
+        seg = out[s:e]
+        np.divide(x[s:e], pj, out=seg)
+        np.cumsum(seg, axis=0, out=seg)
+        seg *= alpha
+        seg += prev[None, :]
+        seg *= pj
+        prev = seg[-1].copy()
+    if keep is not None:
+        out[:, direct] = keep
+    return out
+
+
+def _clean_columns(x: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """只有前段 NaN（上市前）、之後無缺值的欄位 → 可走閉式解"""
+    n = x.shape[0]
+    return (~np.isnan(x)).sum(axis=0) == (n - first)
+
+
+def _fill_head(x: np.ndarray, first: np.ndarray, value: np.ndarray) -> np.ndarray:
+    """前段 NaN 以 value 補齊（讓遞迴在首筆有效值前維持 value）"""
+    filled = x.copy()
+    rows = np.arange(x.shape[0])[:, None]
+    np.copyto(filled, np.broadcast_to(value[None, :], x.shape), where=rows < first[None, :])
+    return filled
+
+
+def _restore_head(out: np.ndarray, first: np.ndarray) -> np.ndarray:
+    rows = np.arange(out.shape[0])[:, None]
+    out[rows < first[None, :]] = np.nan
+    return out
+
+
+def ewm_mean(x: np.ndarray, alpha: Any, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    遞迴 EMA/RMA（等同 pandas `ewm(alpha=alpha, adjust=False).mean()`，ignore_na=False）：
+    - 每欄自第一筆有效值開始
+    - 中途遇 NaN：輸出沿用前值，且舊權重持續衰減
+    無中途缺值的欄位走分段閉式解（_linear_recurrence）；其餘欄位退回逐列遞迴。
+    alpha 可為純量或長度 = 欄數的陣列。
+    """
+    n, m = x.shape
+    out = out_buffer(x, out)
+    if n == 0:
+        return out
+    if not np.isnan(x).any():
+        return _linear_recurrence(x, alpha, x[0], out)
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (m,))
+    first = first_valid(x)
+    clean = _clean_columns(x, first)
+    if clean.all():
+        head = x[np.minimum(first, n - 1), np.arange(m)]
+        _linear_recurrence(_fill_head(x, first, head), alpha, head, out)
+        return _restore_head(out, first)
+    out[:, ~clean] = _ewm_mean_loop(x[:, ~clean], alpha[~clean])
+    if clean.any():
+        xc = x[:, clean]; fc = first[clean]
+        head = xc[np.minimum(fc, n - 1), np.arange(xc.shape[1])]
+        yc = _linear_recurrence(_fill_head(xc, fc, head), alpha[clean], head, np.empty_like(xc))
+        out[:, clean] = _restore_head(yc, fc)
+    return out
+
+
+def _ewm_mean_loop(x: np.ndarray, alpha: Any) -> np.ndarray:
+    """逐列遞迴（含中途 NaN 的欄位）；迴圈只跑 rows 次，每次以向量處理全部股票"""
+    n, m = x.shape
+    out = np.empty_like(x)
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (m,))
+    decay = 1.0 - alpha
+    weighted = x[0].copy()
+    old_wt = np.ones(m)
+    out[0] = weighted
+    for i in range(1, n):
+        cur = x[i]
+        obs = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        upd = started & obs
+        mixed = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(upd, mixed, np.where(obs, cur, weighted))
+        old_wt = np.where(upd, 1.0, old_wt)
+        out[i] = weighted
+    return out
+
+
+def ewm_seeded(x: np.ndarray, alpha: float, seed: float, *, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    帶初值的遞迴平滑：y[t] = (1-alpha)*y[t-1] + alpha*x[t]，
+    每欄第一筆有效值之前的 y 視為 seed（台股 KD 慣例 seed=50）。
+    首筆有效值之前輸出 NaN；中途遇 NaN 沿用前值。
+    """
+    n, m = x.shape
+    out = out_buffer(x, out)
+    if n == 0:
+        return out
+    first = first_valid(x)
+    if _clean_columns(x, first).all():
+        head = np.full(m, float(seed))
+        _linear_recurrence(_fill_head(x, first, head), alpha, head, out)
+        return _restore_head(out, first)
+    decay = 1.0 - alpha
+    state = np.full(m, float(seed))
+    started = np.zeros(m, dtype=bool)
+    for i in range(n):
+        cur = x[i]
+        obs = ~np.isnan(cur)
+        state = np.where(obs, decay * state + alpha * np.where(obs, cur, 0.0), state)
+        started |= obs
+        out[i] = np.where(started, state, np.nan)
+    return out
+
+
+# ------------------------------------------------------------
+# 參數掃描（同一序列 × 多個 window → (k, rows) 矩陣）
+# ------------------------------------------------------------
+def _windows(windows: Any) -> np.ndarray:
+    w = np.asarray(windows, dtype=np.int64).ravel()
+    if w.size and w.min() <= 0:
+        raise ValueError("windows must be positive integers")
+    return w
+
+
+def _prefix(x: np.ndarray):
+    """cumsum（NaN 當 0）與有效筆數的 cumsum；無 NaN 時後者為 None"""
+    valid = ~np.isnan(x)
+    cs = np.zeros(x.shape[0] + 1)
+    np.cumsum(np.where(valid, x, 0.0), out=cs[1:])
+    if valid.all():
+        return cs, None
+    cnt = np.zeros(x.shape[0] + 1, dtype=np.int64)
+    np.cumsum(valid, out=cnt[1:])
+    return cs, cnt
+
+
+def sweep_sum(x: np.ndarray, windows: Any, *, mean: bool = False) -> np.ndarray:
+    """
+    x 為 1-D 序列；第 i 列 = rolling_sum(x, windows[i])（mean=True 時為 rolling_mean）。
+    所有 window 共用同一個 cumsum，每個 window 只剩一次切片相減。
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    w = _windows(windows)
+    n = x.shape[0]
+    out = np.full((w.size, n), np.nan)
+    cs, cnt = _prefix(x)
+    for i, wi in enumerate(w.tolist()):
+        if wi > n:
+            continue
+        row = out[i, wi - 1:]
+        np.subtract(cs[wi:], cs[:-wi], out=row)
+        if mean:
+            row /= float(wi)
+        if cnt is not None:
+            row[(cnt[wi:] - cnt[:-wi]) != wi] = np.nan
+    return out
+
+
+def sweep_mean(x: np.ndarray, windows: Any) -> np.ndarray:
+    return sweep_sum(x, windows, mean=True)
+
+
+def sweep_var(x: np.ndarray, windows: Any, ddof: int = 0) -> np.ndarray:
+    """
+    x 為 1-D 序列；第 i 列 = rolling_var(x, windows[i], ddof)。
+    與 rolling_var 相同的分段錨點 + 相消過大時逐窗精算；每段 d 與 d^2 的 cumsum 各只算一次。
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    w = _windows(windows)
+    n = x.shape[0]
+    out = np.full((w.size, n), np.nan)
+    if not w.size or not n:
+        return out
+    maxw = int(w.max())
+    block = max(VAR_BLOCK, maxw)
+    for s in range(0, n, block):
+        e = min(s + block, n)
+        lo = max(0, s - maxw + 1)
+        seg = x[lo:e]
+        valid = ~np.isnan(seg)
+        d = seg - (seg[valid].mean() if valid.any() else 0.0)
+        cs1, cnt = _prefix(d)
+        cs2, _ = _prefix(d * d)
+        for i, wi in enumerate(w.tolist()):
+            a = max(s - lo, wi - 1)  # seg 內第一個可輸出的位置
+            b = e - lo
+            if a >= b or wi - ddof <= 0:
+                continue
+            s1 = cs1[a + 1: b + 1] - cs1[a + 1 - wi: b + 1 - wi]
+            s2 = cs2[a + 1: b + 1] - cs2[a + 1 - wi: b + 1 - wi]
+            dev = s2 - s1 * s1 / wi
+            row = out[i, lo + a: e]
+            np.divide(dev, float(wi - ddof), out=row)
+            if cnt is not None:
+                row[(cnt[a + 1: b + 1] - cnt[a + 1 - wi: b + 1 - wi]) != wi] = np.nan
+            with np.errstate(invalid="ignore"):
+                bad = np.nonzero(s2 > VAR_RECHECK_RATIO * np.maximum(dev, 0.0))[0]
+            if bad.size:
+                wins = np.lib.stride_tricks.sliding_window_view(seg, wi)[a + bad - wi + 1]
+                row[bad] = wins.var(axis=1, ddof=ddof)
+    np.maximum(out, 0.0, out=out, where=~np.isnan(out))
+    return out
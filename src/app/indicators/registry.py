@@ -1,13 +1,28 @@
 # src/app/indicators/registry.py
-from typing import Dict, Any, Optional, Callable, List
+from typing import Dict, Any, Optional, Callable, List, Mapping, Sequence, Union
+import numpy as np
 import pandas as pd
 
-RegistryType = Dict[str, Dict[str, Any]]  # key(lower) -> {"fn": callable, "meta": dict}
+from . import kernels
+
+RegistryType = Dict[str, Dict[str, Any]]  # key(lower) -> {"fn", "meta", "panel_fn", "stream_cls", "sweep_fn"}
 _REGISTRY: RegistryType = {}
 
-def register(name: str, fn: Callable, meta: Dict[str, Any]) -> None:
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+def register(
+    name: str,
+    fn: Callable,
+    meta: Dict[str, Any],
+    *,
+    panel_fn: Optional[Callable] = None,
+    stream_cls: Optional[type] = None,
+    sweep_fn: Optional[Callable] = None,
+) -> None:
     key = (name or "").lower()
-    _REGISTRY[key] = {"fn": fn, "meta": meta or {}}
+    _REGISTRY[key] = {
+        "fn": fn, "meta": meta or {}, "panel_fn": panel_fn, "stream_cls": stream_cls, "sweep_fn": sweep_fn,
+    }
 
 def get(name: str) -> Dict[str, Any]:
     key = (name or "").lower()
@@ -15,39 +30,289 @@ def get(name: str) -> Dict[str, Any]:
         raise KeyError(f"indicator not registered: {name}")
     return _REGISTRY[key]
 
+def names() -> List[str]:
+    """已註冊的指標名稱（小寫，依註冊順序）"""
+    return list(_REGISTRY)
+
+def timeframes(name: str) -> List[str]:
+    """指標宣告支援的週期（meta["timeframes"]；1d 日線、1w 週線、1m 月線，見 data_pipeline/resample.py）"""
+    return [str(t).lower() for t in get(name).get("meta", {}).get("timeframes", ["1d"])]
+
+def _check_timeframe(name: str, meta: Dict[str, Any], timeframe: str) -> str:
+    tf = (timeframe or "1d").lower()
+    tfs: List[str] = [str(t).lower() for t in meta.get("timeframes", ["1d"])]
+    if tf not in tfs:
+        raise ValueError(f"timeframe not supported for {name}: {timeframe}")
+    return tf
+
+def _dates(data: Any) -> Optional[np.ndarray]:
+    """資料列的日期（"date" 欄或 DatetimeIndex）；沒有日期回 None"""
+    if isinstance(data, pd.DataFrame):
+        if "date" in data.columns:
+            return data["date"].to_numpy()
+        if isinstance(data.index, pd.DatetimeIndex):
+            return data.index.to_numpy()
+        return None
+    if "date" in _columns(data):
+        col = data["date"]
+        return col.to_numpy() if hasattr(col, "to_numpy") and not isinstance(col, np.ndarray) else np.asarray(col)
+    return None
+
+def _float_column(col: Any) -> np.ndarray:
+    if not isinstance(col, np.ndarray) and hasattr(col, "to_numpy"):
+        col = col.to_numpy()  # Series / pyarrow ChunkedArray（null → NaN）
+    return np.asarray(col, dtype=np.float64)
+
+def _to_timeframe(name: str, data: Any, tf: str, dates: Optional[np.ndarray] = None) -> Any:
+    """
+    1w / 1m：data 為日線時先彙總（data_pipeline/resample.py，日期標在每期最後一根）；
+    已是該週期（每期一根）原樣回傳。沒有日期無法判斷 → ValueError（不默默拿日線算週線）
+    """
+    if tf == "1d":
+        return data
+    from app.services.data_pipeline import resample  # 延遲 import：indicators 不依賴資料層
+
+    dates = _dates(data) if dates is None else np.asarray(dates)
+    if dates is None:
+        raise ValueError(f"timeframe {tf} for {name} needs dates (a 'date' column or DatetimeIndex) to resample")
+    keys = resample.period_keys(dates, tf)
+    if len(keys) < 2 or bool((keys[1:] != keys[:-1]).all()):
+        return data
+    cols = [c for c in _columns(data) if c in OHLCV_COLUMNS or c.startswith("adj_")]
+    bars = resample.resample({"date": dates, **{c: _float_column(data[c]) for c in cols}}, tf)
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame({c: bars[c] for c in cols}, index=pd.DatetimeIndex(bars["date"], name="date"))
+    return bars
+
+def _chosen_field(name: str, meta: Dict[str, Any], available, field: Optional[str]) -> str:
+    fields: Optional[List[str]] = meta.get("fields")
+    default_field: Optional[str] = meta.get("default_field")
+    chosen = field or default_field or (fields[0] if fields else None)
+    if chosen is None or chosen not in available:
+        raise ValueError(f"field not available for {name}: {chosen}")
+    return chosen
+
+class _FrameArrays(Mapping):
+    """
+    單檔資料 → (n, 1) panel 的惰性視圖：只轉換指標實際用到的欄位。
+    data 可為 DataFrame、{欄: 1-D ndarray}（duckdb_io output="numpy"）或 pyarrow.Table（output="arrow"）。
+    """
+
+    def __init__(self, data: Any) -> None:
+        self.data = data
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if key not in self.arrays:
+            col = self.data[key]
+            if not isinstance(col, np.ndarray) and hasattr(col, "to_numpy"):
+                col = col.to_numpy()  # Series / pyarrow ChunkedArray（null → NaN）
+            self.arrays[key] = kernels.as_2d(np.asarray(col, dtype=np.float64))
+        return self.arrays[key]
+
+    def __iter__(self):
+        return iter(OHLCV_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(OHLCV_COLUMNS)
+
+def _columns(data: Any) -> List[str]:
+    if isinstance(data, pd.DataFrame):
+        return list(data.columns)
+    if hasattr(data, "column_names"):
+        return list(data.column_names)
+    return list(data.keys())
+
+def _nrows(data: Any) -> int:
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    if hasattr(data, "num_rows"):
+        return int(data.num_rows)
+    return len(data["close"])
+
+def column_arrays(data: Any) -> Mapping[str, np.ndarray]:
+    """DataFrame / {欄: ndarray} / pyarrow.Table → {OHLCV 欄: (n, 1) float64}（惰性、缺欄報 KeyError）"""
+    missing = [c for c in OHLCV_COLUMNS if c not in _columns(data)]
+    if missing:
+        raise KeyError(f"missing columns: {missing}")
+    return _FrameArrays(data)
+
 def calc(
     name: str,
-    data: pd.DataFrame,
+    data: Any,
     params: Dict[str, Any],
     *,
     timeframe: str = "1d",
     field: Optional[str] = None,
-) -> pd.Series:
+) -> Union[pd.Series, np.ndarray]:
+    """
+    單檔計算。data 為 DataFrame 時回傳同 index 的 Series；
+    為 {欄: ndarray} 或 pyarrow.Table 時（掃描熱路徑，不經 pandas）回傳 1-D float64 ndarray。
+    timeframe 為 1w / 1m 時：data 為日線（含日期）會先彙總成週 / 月線，結果長度為期數
+    （DataFrame 時 index 為每期最後交易日）；已彙總者（resample.get_resampled）原樣計算。
+    """
     entry = get(name)
     fn = entry["fn"]
     meta = entry.get("meta", {})
 
-    # timeframe 正規化
-    tf = (timeframe or "1d").lower()
-    tfs: List[str] = [str(t).lower() for t in meta.get("timeframes", ["1d"])]
-    if tf not in tfs:
-        raise ValueError(f"timeframe not supported for {name}: {timeframe}")
+    # timeframe 正規化；非日線先彙總
+    tf = _check_timeframe(name, meta, timeframe)
+    data = _to_timeframe(name, data, tf)
 
     # 欄位檢查（OHLCV）
-    required = ["open", "high", "low", "close", "volume"]
-    missing = [c for c in required if c not in data.columns]
-    if missing:
-        raise KeyError(f"missing columns: {missing}")
+    arrays = column_arrays(data)
+    frame = isinstance(data, pd.DataFrame)
+
+    # 有 panel_fn 者走 NumPy 核心（單檔視為 (n, 1) panel）；fn 保留為 pandas 參考實作
+    panel_fn = entry.get("panel_fn")
+    if panel_fn is not None:
+        res = panel_fn(arrays, params or {}, timeframe=tf, field=field)
+        chosen = None
+        if isinstance(res, dict):
+            chosen = _chosen_field(name, meta, res.keys(), field)
+            res = res[chosen]
+        if not frame:
+            return res[:, 0]
+        return pd.Series(res[:, 0], index=data.index, name=chosen)
 
+    if not frame:
+        data = pd.DataFrame({c: arrays[c][:, 0] for c in OHLCV_COLUMNS})
     out = fn(data, params or {}, timeframe=tf, field=field)
 
     # multi-field 支援
     if hasattr(out, "columns"):
-        fields: Optional[List[str]] = meta.get("fields")
-        default_field: Optional[str] = meta.get("default_field")
-        chosen = field or default_field or (fields[0] if fields else None)
-        if chosen is None or chosen not in out.columns:
-            raise ValueError(f"field not available for {name}: {chosen}")
-        return out[chosen]
-
-    return out
\ No newline at end of file
+        out = out[_chosen_field(name, meta, out.columns, field)]
+
+    return out if frame else out.to_numpy(dtype=np.float64)
+
+def calc_panel(
+    name: str,
+    panel: Mapping[str, Any],
+    params: Dict[str, Any],
+    *,
+    timeframe: str = "1d",
+    field: Optional[str] = None,
+    out: Optional[np.ndarray] = None,
+    dates: Optional[Any] = None,
+) -> np.ndarray:
+    """
+    Panel 模式：一次計算整個 universe。
+    - panel: {"open","high","low","close","volume"} → 對齊的 2-D 陣列（rows=日期, cols=股票）
+      缺 bar 以 NaN 表示；上市較晚的股票前段為 NaN。
+    - 回傳 2-D ndarray（同 shape）；多欄指標依 field/default_field 取單一欄。
+    - out：呼叫端預先配置的 float64 緩衝（同 shape）；單欄指標（meta 無 fields）的 panel_fn
+      需接受 out= 並直接寫入，多欄指標則複製選定欄位。
+    - timeframe 為 1w / 1m 時需給 dates（列日期）：日線 panel 先沿列彙總，回傳列數為期數
+    結果每一欄等同於以該股（去除前段 NaN 後）呼叫 calc 的值。
+    """
+    entry = get(name)
+    meta = entry.get("meta", {})
+    tf = _check_timeframe(name, meta, timeframe)
+
+    missing = [c for c in OHLCV_COLUMNS if c not in panel]
+    if missing:
+        raise KeyError(f"missing columns: {missing}")
+    arrays = {c: kernels.as_2d(panel[c]) for c in OHLCV_COLUMNS}
+    if tf != "1d":
+        if dates is None:
+            raise ValueError(f"timeframe {tf} for {name} needs the panel row dates (dates=) to resample")
+        arrays = {c: kernels.as_2d(v) for c, v in _to_timeframe(name, {**arrays, "date": dates}, tf).items()
+                  if c in OHLCV_COLUMNS}
+    shapes = {a.shape for a in arrays.values()}
+    if len(shapes) != 1:
+        raise ValueError(f"panel arrays must share one shape, got {sorted(shapes)}")
+
+    panel_fn = entry.get("panel_fn")
+    if out is not None:
+        out = kernels.out_buffer(arrays["close"], out)
+    if panel_fn is None:
+        res = _calc_panel_by_column(name, entry, arrays, params or {}, tf, field)
+    elif out is not None and not meta.get("fields"):
+        res = panel_fn(arrays, params or {}, timeframe=tf, field=field, out=out)
+    else:
+        res = panel_fn(arrays, params or {}, timeframe=tf, field=field)
+
+    if isinstance(res, dict):
+        res = res[_chosen_field(name, meta, res.keys(), field)]
+    if out is not None and res is not out:
+        out[:] = res
+        return out
+    return res
+
+def _calc_panel_by_column(
+    name: str,
+    entry: Dict[str, Any],
+    arrays: Dict[str, np.ndarray],
+    params: Dict[str, Any],
+    tf: str,
+    field: Optional[str],
+) -> np.ndarray:
+    """未提供 panel_fn 的指標：逐欄退回單檔 calc（正確但較慢）"""
+    rows, cols = arrays["close"].shape
+    out = np.full((rows, cols), np.nan)
+    first = kernels.first_valid(arrays["close"])
+    for j in range(cols):
+        start = int(first[j])
+        if start >= rows:
+            continue
+        df = pd.DataFrame({c: arrays[c][start:, j] for c in OHLCV_COLUMNS})
+        s: Union[pd.Series, pd.DataFrame] = calc(name, df, params, timeframe=tf, field=field)
+        out[start:, j] = np.asarray(s, dtype=np.float64)
+    return out
+
+def calc_sweep(
+    name: str,
+    data: Any,
+    windows: Sequence[int],
+    params: Optional[Dict[str, Any]] = None,
+    *,
+    key: str = "window",
+    timeframe: str = "1d",
+    field: Optional[str] = None,
+) -> np.ndarray:
+    """
+    參數掃描：同一檔資料、同一指標，對多個 window 一次算完。
+    - 回傳 (len(windows), len(data)) 矩陣；第 i 列等同
+      calc(name, data, {**params, key: windows[i]}, field=field)
+    - 有 sweep_fn 者（ma/ema/bias/boll/volume）共用前綴和、EMA 跨 span 批次遞迴，
+      400 個 window 的成本約等於數次單一 calc；其餘指標或 key 不是 window 時逐一呼叫 calc
+    """
+    entry = get(name)
+    meta = entry.get("meta", {})
+    tf = _check_timeframe(name, meta, timeframe)
+    arrays = column_arrays(data)
+    wins = [int(w) for w in windows]
+    if any(w <= 0 for w in wins):
+        raise ValueError(f"windows must be positive integers: {list(windows)}")
+    base = dict(params or {})
+
+    sweep_fn = entry.get("sweep_fn")
+    if sweep_fn is None or key != "window" or not wins:
+        out = np.full((len(wins), _nrows(data)), np.nan)
+        for i, w in enumerate(wins):
+            out[i] = np.asarray(calc(name, data, {**base, key: w}, timeframe=tf, field=field), dtype=np.float64)
+        return out
+
+    res = sweep_fn(arrays, base, np.asarray(wins, dtype=np.int64), timeframe=tf, field=field)
+    if isinstance(res, dict):
+        res = res[_chosen_field(name, meta, res.keys(), field)]
+    return res
+
+def new_stream(name: str, params: Dict[str, Any], history: Optional[pd.DataFrame] = None):
+    """
+    建立增量指標狀態（見 indicators/streaming.py）；給 history 時直接 init。
+    之後每根新 bar 呼叫 state.update(bar) 即可，O(1)。
+    """
+    entry = get(name)
+    cls = entry.get("stream_cls")
+    if cls is None:
+        raise ValueError(f"streaming not supported for {name}")
+    state = cls(params or {})
+    return state.init(history) if history is not None else state
+
+def restore_stream(state: Dict[str, Any]):
+    """由 to_state() 的輸出還原增量指標狀態"""
+    cls = get(state["indicator"]).get("stream_cls")
+    if cls is None:
+        raise ValueError(f"streaming not supported for {state['indicator']}")
+    return cls.from_state(state)
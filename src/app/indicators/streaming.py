@@ -0,0 +1,385 @@
+# src/app/indicators/streaming.py
+"""
+增量（streaming）指標狀態：每根新 bar O(1) 更新，取代每日對整段歷史重算。
+介面（每個內建指標一個類別）：
+- init(history)   以既有歷史 OHLCV 建立狀態（僅一次 O(history)）
+- update(bar)     餵入一根 bar（mapping：open/high/low/close/volume），回傳當根指標值
+                  單欄指標回 float；多欄指標回 {field: float}；warm-up 期間為 NaN
+- to_state() / registry.restore_stream(state)  可 JSON 序列化，供排程跨日保存
+數值語意與批次 compute 一致（ewm adjust=False、rolling min_periods=window、warm-up 遮罩）。
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+import pandas as pd
+
+NAN = float("nan")
+Value = Union[float, Dict[str, float]]
+
+
+def _f(x: Optional[float]) -> float:
+    return NAN if x is None else float(x)
+
+
+def _j(x: float) -> Optional[float]:
+    """NaN → None，讓狀態可存成標準 JSON"""
+    return None if x is None or math.isnan(x) else float(x)
+
+
+class _Ewm:
+    """遞迴 EMA/RMA（adjust=False）：首筆即為初值"""
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha: float, value: Optional[float] = None) -> None:
+        self.alpha = float(alpha)
+        self.value = value
+
+    def push(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        elif self.value != x:
+            decay = 1.0 - self.alpha
+            self.value = (decay * self.value + self.alpha * x) / (decay + self.alpha)
+        return self.value
+
+
+class _Window:
+    """
+    固定長度滑動視窗的 running sum（可選 Welford M2 供標準差）。
+    每繞完一圈以視窗內容重算一次，抑制浮點累積誤差（攤提仍為 O(1)）。
+    """
+
+    def __init__(self, size: int, with_var: bool = False) -> None:
+        self.size = int(size)
+        self.with_var = with_var
+        self.buf: deque = deque(maxlen=self.size)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.since_resync = 0
+
+    def push(self, x: float) -> None:
+        n = len(self.buf)
+        if n < self.size:
+            self.buf.append(x)
+            delta = x - self.mean
+            self.mean += delta / (n + 1)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.buf[0]
+            self.buf.append(x)
+            new_mean = self.mean + (x - old) / self.size
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+        self.since_resync += 1
+        if self.since_resync >= self.size:
+            self._resync()
+
+    def _resync(self) -> None:
+        n = len(self.buf)
+        self.since_resync = 0
+        if n == 0:
+            return
+        self.mean = math.fsum(self.buf) / n
+        if self.with_var:
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.buf)
+
+    @property
+    def full(self) -> bool:
+        return len(self.buf) == self.size
+
+    def std(self) -> float:
+        return math.sqrt(max(self.m2 / self.size, 0.0))
+
+    def dump(self) -> Dict[str, Any]:
+        return {"buf": list(self.buf), "mean": self.mean, "m2": self.m2, "since_resync": self.since_resync}
+
+    def load(self, st: Mapping[str, Any]) -> None:
+        self.buf = deque(st["buf"], maxlen=self.size)
+        self.mean = float(st["mean"]); self.m2 = float(st["m2"])
+        self.since_resync = int(st["since_resync"])
+
+
+class StreamState:
+    """所有增量指標的共同骨架"""
+    name: str = ""
+    fields: Optional[List[str]] = None
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None) -> None:
+        self.params: Dict[str, Any] = dict(params or {})
+        self.count = 0
+        self.last: Value = self._empty()
+
+    def _empty(self) -> Value:
+        return {f: NAN for f in self.fields} if self.fields else NAN
+
+    def init(self, history: pd.DataFrame) -> "StreamState":
+        self.__init__(self.params)  # 重設
+        cols = [c for c in ("open", "high", "low", "close", "volume") if c in history.columns]
+        arr = history[cols].to_numpy(dtype=float)
+        for row in arr:
+            self.update(dict(zip(cols, row)))
+        return self
+
+    def update(self, bar: Mapping[str, Any]) -> Value:
+        self.count += 1
+        self.last = self._step(bar)
+        return self.last
+
+    def _step(self, bar: Mapping[str, Any]) -> Value:
+        raise NotImplementedError
+
+    # ---- 序列化 ----
+    def to_state(self) -> Dict[str, Any]:
+        last = {k: _j(v) for k, v in self.last.items()} if isinstance(self.last, dict) else _j(self.last)
+        return {"indicator": self.name, "params": self.params, "count": self.count, "last": last, **self._dump()}
+
+    def _dump(self) -> Dict[str, Any]:
+        return {}
+
+    def _load(self, st: Mapping[str, Any]) -> None:
+        pass
+
+    @classmethod
+    def from_state(cls, st: Mapping[str, Any]) -> "StreamState":
+        obj = cls(st.get("params"))
+        obj.count = int(st["count"])
+        last = st.get("last")
+        obj.last = {k: _f(v) for k, v in last.items()} if isinstance(last, dict) else _f(last)
+        obj._load(st)
+        return obj
+
+
+class MAState(StreamState):
+    name = "ma"
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        self.win = _Window(int(self.params["window"]))
+
+    def _step(self, bar):
+        self.win.push(float(bar["close"]))
+        return self.win.mean if self.win.full else NAN
+
+    def _dump(self):
+        return {"window": self.win.dump()}
+
+    def _load(self, st):
+        self.win.load(st["window"])
+
+
+class EMAState(StreamState):
+    name = "ema"
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        self.w = int(self.params["window"])
+        self.ema = _Ewm(2.0 / (self.w + 1))
+
+    def _step(self, bar):
+        v = self.ema.push(float(bar["close"]))
+        return v if self.count >= self.w else NAN
+
+    def _dump(self):
+        return {"ema": self.ema.value}
+
+    def _load(self, st):
+        self.ema.value = st["ema"]
+
+
+class RSIState(StreamState):
+    name = "rsi"
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        self.p = int(self.params["period"])
+        self.prev_close: Optional[float] = None
+        self.gain = _Ewm(1.0 / self.p)
+        self.loss = _Ewm(1.0 / self.p)
+
+    def _step(self, bar):
+        close = float(bar["close"])
+        prev, self.prev_close = self.prev_close, close
+        if prev is None:
+            return NAN
+        delta = close - prev
+        ag = self.gain.push(max(delta, 0.0))
+        al = self.loss.push(-min(delta, 0.0))
+        if self.count <= max(self.p, 1):
+            return NAN
+        if al == 0:
+            return 50.0  # 與批次版 fillna(50) 一致
+        return 100 - (100 / (1 + ag / al))
+
+    def _dump(self):
+        return {"prev_close": self.prev_close, "gain": self.gain.value, "loss": self.loss.value}
+
+    def _load(self, st):
+        self.prev_close = st["prev_close"]
+        self.gain.value = st["gain"]; self.loss.value = st["loss"]
+
+
+class MACDState(StreamState):
+    name = "macd"
+    fields = ["macd", "signal", "hist"]
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        self.fast = int(self.params["fast"]); self.slow = int(self.params["slow"])
+        self.signal = int(self.params["signal"])
+        self.ema_fast = _Ewm(2.0 / (self.fast + 1))
+        self.ema_slow = _Ewm(2.0 / (self.slow + 1))
+        self.ema_signal = _Ewm(2.0 / (self.signal + 1))
+
+    def _step(self, bar):
+        close = float(bar["close"])
+        f = self.ema_fast.push(close)
+        s = self.ema_slow.push(close)
+        if self.count < max(self.fast, self.slow):
+            return self._empty()
+        macd = f - s
+        sig = self.ema_signal.push(macd)
+        if self.count < self.signal:
+            sig = NAN
+        return {"macd": macd, "signal": sig, "hist": macd - sig}
+
+    def _dump(self):
+        return {"fast_ema": self.ema_fast.value, "slow_ema": self.ema_slow.value, "signal_ema": self.ema_signal.value}
+
+    def _load(self, st):
+        self.ema_fast.value = st["fast_ema"]; self.ema_slow.value = st["slow_ema"]
+        self.ema_signal.value = st["signal_ema"]
+
+
+class BOLLState(StreamState):
+    name = "boll"
+    fields = ["upper", "middle", "lower"]
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        self.mult = float(self.params["mult"])
+        self.win = _Window(int(self.params["window"]), with_var=True)
+
+    def _step(self, bar):
+        self.win.push(float(bar["close"]))
+        if not self.win.full:
+            return self._empty()
+        m = self.win.mean; sd = self.win.std()
+        return {"upper": m + self.mult * sd, "middle": m, "lower": m - self.mult * sd}
+
+    def _dump(self):
+        return {"window": self.win.dump()}
+
+    def _load(self, st):
+        self.win.load(st["window"])
+
+
+class BIASState(MAState):
+    name = "bias"
+
+    def _step(self, bar):
+        close = float(bar["close"])
+        ma = super()._step(bar)
+        if math.isnan(ma):
+            return NAN
+        return (close - ma) / ma * 100
+
+
+class VolumeState(StreamState):
+    name = "volume"
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        w = self.params.get("window")
+        self.win = _Window(int(w)) if w is not None else None
+
+    def _step(self, bar):
+        vol = float(bar["volume"])
+        if self.win is None:
+            return vol
+        self.win.push(vol)
+        return self.win.mean if self.win.full else NAN
+
+    def _dump(self):
+        return {"window": self.win.dump() if self.win is not None else None}
+
+    def _load(self, st):
+        if self.win is not None:
+            self.win.load(st["window"])
+
+
+class DiffState(StreamState):
+    name = "diff"
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        allowed = {"open", "high", "low", "close", "volume"}
+        if self.params.get("left") not in allowed or self.params.get("right") not in allowed:
+            raise ValueError("DIFF.left/right must be one of open/high/low/close/volume")
+
+    def _step(self, bar):
+        return float(bar[self.params["left"]]) - float(bar[self.params["right"]])
+
+
+class _Extreme:
+    """
+    單調佇列（monotonic deque）滑動極值：每根 bar 攤提 O(1)。
+    佇列存 (序號, 值)，由前到後單調；超出視窗的序號自前端移除。
+    """
+
+    def __init__(self, size: int, is_max: bool) -> None:
+        self.size = int(size)
+        self.is_max = is_max
+        self.q: deque = deque()
+        self.seq = 0
+
+    def push(self, x: float) -> float:
+        beaten = (lambda v: v <= x) if self.is_max else (lambda v: v >= x)
+        while self.q and beaten(self.q[-1][1]):
+            self.q.pop()
+        self.q.append((self.seq, x))
+        if self.q[0][0] <= self.seq - self.size:
+            self.q.popleft()
+        self.seq += 1
+        return self.q[0][1] if self.seq >= self.size else NAN
+
+    def dump(self) -> Dict[str, Any]:
+        return {"q": [list(e) for e in self.q], "seq": self.seq}
+
+    def load(self, st: Mapping[str, Any]) -> None:
+        self.q = deque((int(i), float(v)) for i, v in st["q"])
+        self.seq = int(st["seq"])
+
+
+class KDState(StreamState):
+    name = "kd"
+    fields = ["k", "d"]
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        n = int(self.params["k_period"])
+        self.k_alpha = 1.0 / int(self.params.get("smooth", 1))
+        self.d_alpha = 1.0 / int(self.params["d_period"])
+        self.hh = _Extreme(n, is_max=True)
+        self.ll = _Extreme(n, is_max=False)
+        self.k = 50.0; self.d = 50.0  # 與批次版 SEED 一致
+
+    def _step(self, bar):
+        close = float(bar["close"])
+        hh = self.hh.push(float(bar["high"]))
+        ll = self.ll.push(float(bar["low"]))
+        if math.isnan(hh) or math.isnan(ll):
+            return self._empty()
+        rsv = (close - ll) / (hh - ll) * 100 if hh > ll else 50.0
+        self.k = (1.0 - self.k_alpha) * self.k + self.k_alpha * rsv
+        self.d = (1.0 - self.d_alpha) * self.d + self.d_alpha * self.k
+        return {"k": self.k, "d": self.d}
+
+    def _dump(self):
+        return {"hh": self.hh.dump(), "ll": self.ll.dump(), "k": self.k, "d": self.d}
+
+    def _load(self, st):
+        self.hh.load(st["hh"]); self.ll.load(st["ll"])
+        self.k = float(st["k"]); self.d = float(st["d"])
@@ -1,9 +1,22 @@
 # src/app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.routers import symbols, watchlist, strategies, alerts, backtest, scan, signals
 from app.routers import metrics  # ← 新增
+from app.runners import scan_runner
+from app.scheduler import scan_worker
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 背景 scan job worker（SCAN_WORKER_ENABLED=0 時改由獨立行程執行）
+    if scan_worker.ENABLED:
+        scan_worker.start()
+    yield
+    scan_worker.stop(timeout=30)
+    scan_runner.shutdown()  # 掃描用的共用行程池
 
-app = FastAPI(title="StockPicker TW API", version="0.1.0")
+app = FastAPI(title="StockPicker TW API", version="0.1.0", lifespan=lifespan)
 
 @app.get("/api/v1/health")
 def health():
@@ -0,0 +1,23 @@
+-- src/app/migrations/V3__scan_job_progress.sql
+-- scan_jobs 背景執行：狀態、payload 與進度欄位（由 scheduler/scan_worker.py 寫入）
+-- Dialect: PostgreSQL（SQLite 既有 DB 用 db/migrate_v2.patch_db_in_place）
+
+BEGIN;
+
+ALTER TABLE scan_jobs
+  ADD COLUMN IF NOT EXISTS status TEXT NOT NULL DEFAULT 'pending',
+  ADD COLUMN IF NOT EXISTS payload JSONB,
+  ADD COLUMN IF NOT EXISTS symbols_total INT NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS symbols_done INT NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ,
+  ADD COLUMN IF NOT EXISTS finished_at TIMESTAMPTZ,
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
+  ADD COLUMN IF NOT EXISTS error TEXT;
+
+-- 加欄位前建立的 job 沒有 payload，無法補跑
+UPDATE scan_jobs SET status = 'failed', error = 'submitted before background execution; resubmit'
+ WHERE payload IS NULL AND status = 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs (status, created_at);
+
+COMMIT;
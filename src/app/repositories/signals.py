@@ -49,7 +49,10 @@ def _normalize_strength(x) -> Optional[float]:
 
 class SignalsRepo:
     # ---- Idempotent scan job 映射 ----
-    def get_or_create_scan_job(self, db, key: str) -> str:
+    def get_or_create_scan_job(self, db, key: str, payload: Optional[Dict[str, Any]] = None) -> str:
+        """
+        同 key 回同一個 job_id；新建時存下 payload（worker 據以執行）與 symbols_total。
+        """
         conn = db or get_conn()
         cur = conn.cursor()
         try:
@@ -60,13 +63,75 @@ class SignalsRepo:
         if row:
             return row["job_id"]
         job_id = uuid.uuid4().hex
+        symbols = (payload or {}).get("symbols") or []
         cur.execute(
-            "INSERT INTO scan_jobs(key, job_id, created_at) VALUES(?, ?, datetime('now'))",
-            (key, job_id),
+            """
+            INSERT INTO scan_jobs(key, job_id, created_at, status, payload, symbols_total, updated_at)
+            VALUES(?, ?, datetime('now'), 'pending', ?, ?, datetime('now'))
+            """,
+            (key, job_id, _to_json_text(payload), len(symbols)),
         )
         conn.commit()
         return job_id
 
+    def claim_scan_job(self, db, *, stale_seconds: int = 600) -> Optional[Dict[str, Any]]:
+        """
+        取走最早的一個待跑 job（pending，或 running 但心跳超過 stale_seconds 未更新＝原 worker 已中斷），
+        標成 running 後回傳（含 payload）；沒有可跑的回 None。
+        以單一 UPDATE ... RETURNING 完成，多個 worker 同時搶也只有一個拿到。
+        """
+        conn = db or get_conn()
+        cur = conn.cursor()
+        row = cur.execute(
+            """
+            UPDATE scan_jobs
+               SET status='running',
+                   started_at=COALESCE(started_at, datetime('now')),
+                   updated_at=datetime('now')
+             WHERE job_id = (
+                   SELECT job_id FROM scan_jobs
+                    WHERE payload IS NOT NULL
+                      AND (status='pending'
+                           OR (status='running' AND updated_at < datetime('now', ?)))
+                    ORDER BY created_at, rowid
+                    LIMIT 1)
+            RETURNING key, job_id, created_at, payload, symbols_total, symbols_done
+            """,
+            (f"-{int(stale_seconds)} seconds",),
+        ).fetchone()
+        conn.commit()
+        if not row:
+            return None
+        return {
+            "key": row["key"],
+            "job_id": row["job_id"],
+            "created_at": row["created_at"],
+            "payload": _maybe_parse_json_text(row["payload"]),
+            "symbols_total": int(row["symbols_total"] or 0),
+            "symbols_done": int(row["symbols_done"] or 0),
+        }
+
+    def update_scan_progress(self, db, job_id: str, symbols_done: int) -> None:
+        """每批完成後更新進度（同時當作 worker 心跳）"""
+        conn = db or get_conn()
+        conn.execute(
+            "UPDATE scan_jobs SET symbols_done=?, updated_at=datetime('now') WHERE job_id=?",
+            (int(symbols_done), job_id),
+        )
+        conn.commit()
+
+    def finish_scan_job(self, db, job_id: str, *, status: str, error: Optional[str] = None) -> None:
+        """
+        status：done / failed 記 finished_at；pending＝中途停止、放回佇列（下次由 symbols_done 接續）
+        """
+        conn = db or get_conn()
+        finished = "datetime('now')" if status in ("done", "failed") else "NULL"
+        conn.execute(
+            f"UPDATE scan_jobs SET status=?, error=?, finished_at={finished}, updated_at=datetime('now') WHERE job_id=?",
+            (status, error, job_id),
+        )
+        conn.commit()
+
     def generate_job_id(self) -> str:
         return uuid.uuid4().hex
 
@@ -179,7 +244,10 @@ class SignalsRepo:
         cur = conn.cursor()
         try:
             row = cur.execute(
-                "SELECT key, job_id, created_at FROM scan_jobs WHERE job_id=?",
+                """
+                SELECT key, job_id, created_at, status, symbols_total, symbols_done, started_at, finished_at, error
+                  FROM scan_jobs WHERE job_id=?
+                """,
                 (job_id,),
             ).fetchone()
         except Exception:
@@ -190,9 +258,10 @@ class SignalsRepo:
             "key": row["key"],
             "job_id": row["job_id"],
             "created_at": row["created_at"],
-            "status": "pending",
-            "symbols_total": 0,
-            "symbols_done": 0,
-            "started_at": None,
-            "finished_at": None,
+            "status": row["status"],
+            "symbols_total": int(row["symbols_total"] or 0),
+            "symbols_done": int(row["symbols_done"] or 0),
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "error": row["error"],
         }
\ No newline at end of file
@@ -1,6 +1,8 @@
 # src/app/routers/metrics.py
 from fastapi import APIRouter
 from app.db.conn import get_conn
+from app.indicators import cache as indicator_cache
+from app.services.data_pipeline import bar_cache, resample
 
 router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
 
@@ -18,5 +20,13 @@ def get_metrics():
         "alerts_failed": one("SELECT COUNT(*) FROM alerts WHERE status='failed'"),
         "backtest_runs_total": one("SELECT COUNT(*) FROM backtest_runs"),
         "trades_total": one("SELECT COUNT(*) FROM trades"),
+        "scan_jobs_pending": one("SELECT COUNT(*) FROM scan_jobs WHERE status='pending'"),
+        "scan_jobs_running": one("SELECT COUNT(*) FROM scan_jobs WHERE status='running'"),
+        # 行程內指標快取：entries/bytes/max_bytes/hits/misses/evictions/hit_ratio
+        "indicator_cache": indicator_cache.stats(),
+        # 行程內 bar 快取：同上＋ loads（實際讀檔）/ coalesced（single-flight 合併等待）
+        "bar_cache": bar_cache.stats(),
+        # 週 / 月線彙總快取：同上＋ builds（整段重建）/ appends（增量接上）
+        "resample_cache": resample.stats(),
         # 之後可擴充：今日新增、最近7天、各 strategy 分佈等
     }
\ No newline at end of file
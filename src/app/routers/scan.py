@@ -5,11 +5,13 @@ from datetime import datetime
 from ..repositories.signals import SignalsRepo
 from ..repositories.alerts import AlertsRepo
 from ..db.conn import get_conn
+from ..services.scan_service import ScanService
 from app.config import get_env_int
 
 router = APIRouter(prefix="/api/v1/scan", tags=["scan"])
 signals_repo = SignalsRepo()
 alerts_repo = AlertsRepo()
+scan_service = ScanService(signals_repo)
 
 @router.post("")
 def submit_scan(
@@ -21,9 +23,14 @@ def submit_scan(
             status_code=400,
             detail={"error_code": "VALIDATION_ERROR", "message": "Idempotency-Key required"},
         )
+    symbols = payload.get("symbols")
+    if not isinstance(symbols, list) or len(symbols) == 0:
+        raise HTTPException(status_code=422, detail={"error": "symbols must be a non-empty array"})
+    if "strategy_id" not in payload:
+        raise HTTPException(status_code=422, detail={"error": "strategy_id required"})
+    # 不受 SCAN_SYMBOLS_MAX 限制：由背景 worker 分批執行，進度以 GET /scan/{job_id} 查詢
     db = None
-    job_id = signals_repo.get_or_create_scan_job(db, idempotency_key)
-    return {"job_id": job_id, "status": "pending"}
+    return scan_service.submit_job(db, payload, idempotency_key=idempotency_key)
 
 @router.get("")
 def noop_for_now():
@@ -1,6 +1,6 @@
 # backend/app/routers/symbols.py
 from fastapi import APIRouter, Query
-from app.services.resolve import normalize_code_or_name
+from app.services.resolve import market_of, normalize_code_or_name
 
 router = APIRouter(prefix="/api/v1/symbols", tags=["symbols"])
 
@@ -8,14 +8,14 @@ router = APIRouter(prefix="/api/v1/symbols", tags=["symbols"])
 def search_symbols(q: str = Query(..., description="代碼或中文名稱片段")):
     """
     Phase0: 走純正規化邏輯，不依賴 DB 的 symbols 表
-    回傳格式與舊邏輯相容：[{code, name?}]
+    回傳格式與舊邏輯相容：[{code, name?, market?}]（market 來自入庫時解析的代碼對照，未知為 None）
     """
     code, choices = normalize_code_or_name(q)
 
     # 命中唯一（沒有多選）
     if code and not choices:
         # 沒查 DB，名稱暫時給 None（測試僅關心 200 與型別）
-        return [{"code": code, "name": None}]
+        return [{"code": code, "name": None, "market": market_of(code)}]
 
     # 有多個候選：直接回 choices（假設內含 code/name 結構）
     if choices:
@@ -1,11 +1,47 @@
 # src/app/runners/scan_runner.py
+"""
+掃描 runner：逐檔讀取真實 bar（data_pipeline）並評估，回傳每檔一筆
+{symbol, signal_type, strength, meta}。
+- 單一指標模式（indicator + params）：收盤價在指標之上 → buy、之下 → sell（_signal_from_indicator）
+- 策略模式（strategy = Strategy / dict / CompiledStrategy）：最後一根觸發 → buy，否則 noop；
+  strength = 最後一根成立的條件比例
+- 日線讀 bar_cache.get_bars；1w / 1m 讀 resample.get_resampled；只讀 warm-up 所需的最後 N 根
+- 查無資料 → noop，meta.reason = "no_data"
+- 代碼切成 chunk 丟進 ProcessPoolExecutor（pandas / NumPy 受 GIL 限制，多行程才用得滿多核）；
+  代碼數不超過一個 chunk 或 workers <= 1 時直接在本行程執行（共用本行程的 bar / 指標快取）
+- 行程池延遲建立、跨 run_scan 共用（get_pool）：不必每批重付啟動成本，子行程的 bar / 指標快取也能持續命中
+  （資料版本來自 ingest manifest，跨行程一樣會失效）；API 結束時由 lifespan 呼叫 shutdown()
+- 子行程以 forkserver（無則 spawn）啟動，不 fork 呼叫端：API 行程內有背景 worker 執行緒、
+  DuckDB 連線與各種鎖，fork 會把持有中的鎖複製進子行程而卡死；資料目錄由 initializer 帶入
+環境變數：SCAN_WORKERS（預設 0 = CPU 數）、SCAN_CHUNK_SIZE（預設 64）、SCAN_SETTLE（遞迴型指標 warm-up 倍數，預設 3）、
+SCAN_MP_CONTEXT（forkserver / spawn；預設 forkserver，平台不支援時 spawn）
+"""
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-import pandas as pd
+from typing import Any, Dict, List, Mapping, Optional, Union
+
 import numpy as np
 
-from app.indicators import registry as ind_registry
+from app.config import get_env_int
+from app.domain.strategies import lookback
+from app.domain.strategies.compiler import CompiledStrategy, get_compiled
+from app.domain.strategies.validation import Strategy
+from app.indicators import cache as ind_cache
+from app.indicators import registry
+from app.services.data_pipeline import bar_cache, dataset, duckdb_io, hotstore, resample
+
+WORKERS = get_env_int("SCAN_WORKERS", 0)
+CHUNK_SIZE = get_env_int("SCAN_CHUNK_SIZE", 64)
+SETTLE = get_env_int("SCAN_SETTLE", lookback.SETTLE)
+MP_CONTEXT = os.getenv("SCAN_MP_CONTEXT") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
 
 @dataclass
 class ScanConfig:
@@ -13,26 +49,6 @@ class ScanConfig:
     timeframe: str = "1D"
     params: Optional[Dict[str, Any]] = None  # e.g. {"window": 3}
 
-def _make_minimal_ohlcv(n: int = 100) -> pd.DataFrame:
-    """產生最小可用的 OHLCV DataFrame（單調遞增 close，方便產生 buy/sell 訊號）"""
-    close = np.linspace(100, 110, num=n, dtype=float)
-    high = close + 0.5
-    low = close - 0.5
-    open_ = close - 0.1
-    volume = np.linspace(1000, 2000, num=n, dtype=float)
-    return pd.DataFrame(
-        {"open": open_, "high": high, "low": low, "close": close, "volume": volume}
-    )
-
-def _validate_ohlcv(df: pd.DataFrame, need_rows: int) -> None:
-    """基本防呆：欄位齊全且筆數足夠"""
-    required = ["open", "high", "low", "close", "volume"]
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        raise KeyError(f"missing columns: {missing}")
-    if len(df) < need_rows:
-        raise ValueError(f"need at least {need_rows} rows, got {len(df)}")
-
 def _signal_from_indicator(close_last: float, indi_last: float) -> Dict[str, Any]:
     """
     最小策略：
@@ -49,54 +65,147 @@ def _signal_from_indicator(close_last: float, indi_last: float) -> Dict[str, Any
     stype = "buy" if delta > 0 else ("sell" if delta < 0 else "noop")
     return {"signal_type": stype, "strength": strength}
 
+def _need_bars(indicator: str, params: Dict[str, Any]) -> int:
+    """單一指標模式要讀的 bar 數：warm-up（遞迴型 × SETTLE）＋ 最後一根"""
+    meta = registry.get(indicator).get("meta", {})
+    warmup = meta.get("warmup")
+    bars = int(warmup(params)) if callable(warmup) else 0
+    if meta.get("recursive"):
+        bars *= max(int(SETTLE), 1)
+    return max(bars, 1) + 1
+
+def _load(code: str, tf: str, need: int, price_adjustment: str) -> Dict[str, np.ndarray]:
+    if tf == "1d":
+        return bar_cache.get_bars(code, need, price_adjustment=price_adjustment)
+    return resample.get_resampled(code, tf, need, price_adjustment=price_adjustment)
+
+def _strategy_payload(strategy: Union[Strategy, Mapping[str, Any], CompiledStrategy]) -> Dict[str, Any]:
+    """跨行程傳遞用：一律轉成 dict（CompiledStrategy 內含函式，不送進子行程）"""
+    if isinstance(strategy, CompiledStrategy):
+        strategy = strategy.strategy
+    if isinstance(strategy, Strategy):
+        return json.loads(strategy.json())
+    return dict(strategy)
+
+def _compiled(payload: Dict[str, Any]) -> CompiledStrategy:
+    """同一份策略在同一行程只編譯一次（get_compiled 以內容當 key）"""
+    key = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return get_compiled(("scan", key), None, payload)
+
+def _scan_one(code: str, spec: Dict[str, Any], compiled: Optional[CompiledStrategy]) -> Dict[str, Any]:
+    tf, adj = spec["timeframe"], spec["price_adjustment"]
+    meta: Dict[str, Any] = dict(spec["meta"])
+    try:
+        bars = _load(code, tf, spec["need"], adj)
+    except FileNotFoundError:
+        bars = None
+    if bars is None or not len(bars["date"]):
+        return {"symbol": code, "signal_type": "noop", "strength": 0.0, "meta": {**meta, "reason": "no_data"}}
+    meta.update(bars=int(len(bars["date"])), last_date=str(np.datetime64(bars["date"][-1], "D")))
+
+    if compiled is not None:
+        masks = compiled.condition_masks(bars)[:, -1]
+        hit = bool(np.logical_and.reduce(masks) if compiled.logic == "AND" else np.logical_or.reduce(masks))
+        sig = {"signal_type": "buy" if hit else "noop", "strength": float(masks.mean()) if len(masks) else 0.0}
+    else:
+        version = f"{bar_cache.data_version(code)}|{tf}|{adj}|{len(bars['date'])}"
+        indi = ind_cache.calc_cached(code, spec["indicator"], bars, spec["params"], timeframe=tf,
+                                     field=spec.get("field"), data_version=version)
+        sig = _signal_from_indicator(float(bars["close"][-1]), float(np.asarray(indi)[-1]))
+    return {"symbol": code, **sig, "meta": meta}
+
+def _scan_chunk(codes: List[str], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """一個 chunk（子行程的工作單位）"""
+    compiled = _compiled(spec["strategy"]) if spec.get("strategy") is not None else None
+    return [_scan_one(code, spec, compiled) for code in codes]
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_KEY: Optional[tuple] = None
+_POOL_LOCK = threading.Lock()
+
+def _data_dirs() -> tuple:
+    return (dataset.DATASET_DIR, duckdb_io.PARQUET_DIR, hotstore.HOT_DIR)
+
+def _init_worker(dirs: tuple) -> None:
+    """子行程啟動時套用父行程的資料目錄（spawn / forkserver 不繼承執行期的設定）"""
+    dataset.DATASET_DIR, duckdb_io.PARQUET_DIR, hotstore.HOT_DIR = dirs
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """共用的行程池；worker 數或資料目錄改變時換一個新的"""
+    global _POOL, _POOL_KEY
+    key = (int(workers), _data_dirs(), os.getpid())
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_KEY != key:
+            old, _POOL = _POOL, None
+            if old is not None and _POOL_KEY[2] == os.getpid():
+                old.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(max_workers=int(workers), mp_context=multiprocessing.get_context(MP_CONTEXT),
+                                        initializer=_init_worker, initargs=(key[1],))
+            _POOL_KEY = key
+        return _POOL
+
+def shutdown(wait: bool = True) -> None:
+    """關閉共用行程池（API lifespan 結束時呼叫；下次 run_scan 會重新建立）"""
+    global _POOL, _POOL_KEY
+    with _POOL_LOCK:
+        pool, _POOL, _POOL_KEY = _POOL, None, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
 def run_scan(
     symbols: List[str],
     *,
     indicator: str = "ma",
     timeframe: str = "1D",
     params: Optional[Dict[str, Any]] = None,
+    strategy: Union[Strategy, Mapping[str, Any], CompiledStrategy, None] = None,
+    field: Optional[str] = None,
+    price_adjustment: str = "raw",
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
-    回傳每個 symbol 一筆：
+    回傳每個 symbol 一筆（順序同輸入）：
       {
         "symbol": "2330",
         "signal_type": "buy|sell|noop",
         "strength": 0.0~1.0,
-        "meta": {"indicator": "...", "timeframe": "...", "params": {...}}
+        "meta": {"indicator": "...", "timeframe": "...", "params": {...}, "bars": n, "last_date": "..."}
       }
+    workers / chunk_size 未給時取 SCAN_WORKERS / SCAN_CHUNK_SIZE
     """
     if not symbols:
         return []
+    codes = [str(s) for s in symbols]
+    tf = resample.normalize_timeframe(timeframe)
 
     # 預設參數：確保 ma/ema 至少有 window，避免 KeyError
     cfg_params: Dict[str, Any] = {"window": 5}
     cfg_params.update(params or {})
 
-    # 資料與 warmup
-    win = int(cfg_params.get("window", 5))
-    n = max(5 * win, 50)  # 足夠 warmup
-    df = _make_minimal_ohlcv(n=n)
-    _validate_ohlcv(df, need_rows=n)
-
-    # 計算指標（使用指標註冊表）
-    indi_series = ind_registry.calc(indicator, df, cfg_params, timeframe=timeframe, field=None)
-    indi_last = float(indi_series.iloc[-1]) if not pd.isna(indi_series.iloc[-1]) else np.nan
-    close_last = float(df["close"].iloc[-1])
-    sig = _signal_from_indicator(close_last, indi_last)
+    spec: Dict[str, Any] = {
+        "timeframe": tf, "price_adjustment": price_adjustment, "indicator": indicator, "params": cfg_params,
+        "field": field, "strategy": None,
+    }
+    if strategy is not None:
+        payload = _strategy_payload(strategy)
+        compiled = _compiled(payload)
+        spec.update(strategy=payload, need=compiled.required_bars(settle=SETTLE),
+                    meta={"strategy": compiled.name, "version": compiled.version, "timeframe": timeframe})
+    else:
+        spec.update(need=_need_bars(indicator, cfg_params),
+                    meta={"indicator": indicator, "timeframe": timeframe, "params": cfg_params})
 
-    # 對每個 symbol 輸出相同決策（runner 只計一次）
+    size = max(int(chunk_size or CHUNK_SIZE), 1)
+    n_workers = int(workers if workers is not None else (WORKERS or os.cpu_count() or 1))
+    chunks = [codes[i:i + size] for i in range(0, len(codes), size)]
+    if n_workers <= 1 or len(chunks) <= 1:
+        return _scan_chunk(codes, spec)
     out: List[Dict[str, Any]] = []
-    for s in symbols:
-        out.append(
-            {
-                "symbol": s,
-                "signal_type": sig["signal_type"],
-                "strength": sig["strength"],
-                "meta": {
-                    "indicator": indicator,
-                    "timeframe": timeframe,
-                    "params": cfg_params,
-                },
-            }
-        )
-    return out
\ No newline at end of file
+    try:
+        for part in get_pool(n_workers).map(_scan_chunk, chunks, [spec] * len(chunks)):
+            out.extend(part)
+    except BrokenProcessPool:
+        shutdown(wait=False)  # 子行程異常結束：丟掉這個池，下次重建
+        raise
+    return out
@@ -1,36 +1,42 @@
 # src/app/scheduler/scan_cron.py
 from __future__ import annotations
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Callable, Optional
 
-# 之後可換成 zoneinfo.ZoneInfo("Asia/Taipei")
-TZ: Optional[object] = None  # 測試中用 naive datetime；預留介面
+from app.services.data_pipeline.trading_calendar import get_calendar
+
+# 臺灣無日光節約時間，固定 UTC+8 即等同 Asia/Taipei；naive datetime 視為台北時間
+TZ = timezone(timedelta(hours=8), "Asia/Taipei")
 
 class DailyState:
     """記錄每日是否已觸發"""
     def __init__(self) -> None:
         self.last_run_date: Optional[str] = None  # "YYYY-MM-DD"
 
+def _local(now: datetime) -> datetime:
+    """帶時區的時間換成台北時間；naive 原樣使用"""
+    return now.astimezone(TZ) if now.tzinfo is not None else now
+
 def next_due(now: datetime) -> datetime:
     """
-    計算下一次觸發時間（平日 16:30）。
-    若當下已過 16:30 或是假日，往後推到下一個平日的 16:30。
+    計算下一次觸發時間（交易日 16:30，台北時間）。
+    若當下已過 16:30 或非交易日（週末、休市日），往後推到下一個交易日的 16:30。
     """
+    now = _local(now)
     nxt = now.replace(hour=16, minute=30, second=0, microsecond=0)
-    # 今日過了 16:30 → 推一天
+    # 今日過了 16:30 → 從明天起找
     if now >= nxt:
         nxt = nxt + timedelta(days=1)
-    # 若是週末則推到下個週一
-    while nxt.weekday() >= 5:
-        nxt = nxt + timedelta(days=1)
-    return nxt
+    day = get_calendar().next_trading_day(nxt.date(), inclusive=True).item()
+    return nxt + timedelta(days=(day - nxt.date()).days)
 
 def run_if_due(cb: Callable[[], None], *, state: DailyState, now: datetime) -> bool:
     """
     到期且當日尚未執行 → 呼叫 cb 並回 True；否則 False。
-    規則：平日 >= 16:30 才到期；每日僅一次。
+    規則：交易日 >= 16:30（台北時間）才到期；每日僅一次。
     """
-    if now.weekday() >= 5:
+    now = _local(now)
+    if not get_calendar().is_trading_day(now.date()):
         return False
     due = (now.hour > 16) or (now.hour == 16 and now.minute >= 30)
     if not due:
@@ -0,0 +1,151 @@
+# src/app/scheduler/scan_worker.py
+"""
+背景掃描 worker：執行 POST /api/v1/scan 建立的 scan_jobs，不佔用 HTTP 請求執行緒。
+- 單一 daemon 執行緒：有新 job 時由 notify() 喚醒，否則每 SCAN_JOB_POLL_SECONDS 輪詢一次
+- 以 SignalsRepo.claim_scan_job 原子地取走 job（多個行程各跑一個 worker 也不會重複執行）
+- 代碼分批交給 ScanService.run_now（內部 scan_runner 再分 chunk 進 ProcessPoolExecutor），
+  每批寫回 symbols_done / updated_at；GET /api/v1/scan/{job_id} 即時讀到進度
+- 停止時把執行中的 job 放回 pending；worker 中斷（心跳超過 SCAN_JOB_STALE_SECONDS）的 job 會被重新取走，
+  兩者都從 symbols_done 接續（signals 為 UPSERT，重跑同一批不會重複）
+環境變數：SCAN_JOB_BATCH（預設 0 = SCAN_CHUNK_SIZE × worker 數）、SCAN_JOB_POLL_SECONDS（預設 5）、
+SCAN_JOB_STALE_SECONDS（預設 600）、SCAN_WORKER_ENABLED（預設 1；0 = API 行程不啟動，改由
+`python -m app.scheduler.scan_worker` 獨立執行）
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.config import get_env_int
+from app.repositories.signals import SignalsRepo
+from app.runners import scan_runner
+from app.services.scan_service import ScanService
+
+BATCH = get_env_int("SCAN_JOB_BATCH", 0)
+POLL_SECONDS = get_env_int("SCAN_JOB_POLL_SECONDS", 5)
+STALE_SECONDS = get_env_int("SCAN_JOB_STALE_SECONDS", 600)
+ENABLED = get_env_int("SCAN_WORKER_ENABLED", 1)
+
+_repo = SignalsRepo()
+logger = logging.getLogger(__name__)
+
+def batch_size() -> int:
+    """每批代碼數：預設讓每個 worker 行程各分到一個 chunk"""
+    if BATCH > 0:
+        return BATCH
+    workers = scan_runner.WORKERS or os.cpu_count() or 1
+    return max(int(scan_runner.CHUNK_SIZE), 1) * max(int(workers), 1)
+
+def run_job(job: Dict[str, Any], *, should_stop: Optional[Callable[[], bool]] = None) -> str:
+    """
+    執行一個已 claim 的 job，回傳最終 status（done / failed / pending＝中途停止）。
+    ts 依 payload 的 ts > end_date，皆無時取 job 建立當日 00:00:00（重跑結果一致）
+    """
+    job_id = job["job_id"]
+    try:
+        payload = job["payload"] or {}
+        symbols = [str(s) for s in payload["symbols"]]
+        strategy_id = int(payload["strategy_id"])
+        ts = payload.get("ts") or payload.get("end_date") or f"{str(job['created_at'])[:10]} 00:00:00"
+        service = ScanService(_repo)
+        size = batch_size()
+        for i in range(int(job.get("symbols_done") or 0), len(symbols), size):
+            if should_stop is not None and should_stop():
+                _repo.finish_scan_job(None, job_id, status="pending")
+                return "pending"
+            service.run_now(
+                strategy_id=strategy_id,
+                symbols=symbols[i:i + size],
+                ts=ts,
+                timeframe=payload.get("timeframe"),  # 未指定 → 策略的 timeframe（resolve_timeframe）
+                indicator=str(payload.get("indicator", "ma")),
+                params=payload.get("params") or {},
+            )
+            _repo.update_scan_progress(None, job_id, min(i + size, len(symbols)))
+        _repo.finish_scan_job(None, job_id, status="done")
+    except Exception as e:
+        logger.exception("scan job %s failed", job_id)
+        _mark_failed(job_id, e)
+        return "failed"
+    return "done"
+
+def _mark_failed(job_id: str, exc: BaseException) -> None:
+    """記錄失敗原因；連 DB 都寫不進去時只能留給 stale 回收（SCAN_JOB_STALE_SECONDS）"""
+    try:
+        _repo.finish_scan_job(None, job_id, status="failed", error=f"{type(exc).__name__}: {exc}")
+    except Exception:
+        logger.exception("could not mark scan job %s failed", job_id)
+
+def run_pending(*, should_stop: Optional[Callable[[], bool]] = None) -> int:
+    """依建立順序跑完所有待跑 job（同步），回傳處理的 job 數"""
+    n = 0
+    while should_stop is None or not should_stop():
+        job = _repo.claim_scan_job(None, stale_seconds=STALE_SECONDS)
+        if job is None:
+            break
+        run_job(job, should_stop=should_stop)
+        n += 1
+    return n
+
+class ScanWorker:
+    """背景執行緒：notify() 喚醒、stop() 於批次之間停止"""
+    def __init__(self, *, poll_seconds: float = POLL_SECONDS) -> None:
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="scan-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                run_pending(should_stop=self._stop.is_set)
+            except Exception:
+                # claim 失敗（DB 鎖定 / 重建中）→ 下一輪再試；job 執行中的錯誤已在 run_job 記成 failed
+                logger.exception("scan worker poll failed")
+            self._wake.wait(self.poll_seconds)
+
+_WORKER = ScanWorker()
+
+def start() -> None:
+    _WORKER.start()
+
+def stop(timeout: Optional[float] = None) -> None:
+    _WORKER.stop(timeout)
+
+def notify() -> None:
+    """有新 job：喚醒 worker（未啟動時為 no-op，job 留在 pending 等 worker 取走）"""
+    _WORKER.notify()
+
+if __name__ == "__main__":
+    # 獨立 worker 行程（API 端設 SCAN_WORKER_ENABLED=0 時使用）
+    worker = ScanWorker()
+    worker.start()
+    try:
+        while worker.running:
+            worker._thread.join(1.0)
+    except KeyboardInterrupt:
+        worker.stop()
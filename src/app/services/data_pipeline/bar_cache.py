@@ -0,0 +1,162 @@
+# src/app/services/data_pipeline/bar_cache.py
+"""
+行程內共用的近期 bar 快取（scan / backtest / alert 共用，避免同一代碼各自 read_ohlcv）：
+- 每檔保存最後 BAR_CACHE_BARS 根（{"date", open..volume: ndarray}，唯讀），容量以位元組預算控制、LRU 淘汰（app.cache.ByteLRUCache）
+- key = (code, data_version)：版本來自 ingest manifest 的尾段雜湊（跨行程的 ingest 也會生效）
+  加上行程內的 bump() 計數；ingest 寫入後 bump，舊版本的項目不再命中、由 LRU 自然淘汰
+- single-flight：同一 key 同時有多個請求時只有一個執行緒讀檔，其餘等待同一份結果
+- 讀取走 duckdb_io.read_ohlcv_hot（熱快取優先，未涵蓋者退回 parquet）；熱快取建置後才入庫的代碼直接讀 parquet
+環境變數：BAR_CACHE_BARS（預設 500）、BAR_CACHE_MAX_BYTES（預設 256MB）
+"""
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from app.cache import ByteLRUCache
+from app.config import get_env_int
+from . import duckdb_io, hotstore
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+BAR_CACHE_BARS = get_env_int("BAR_CACHE_BARS", 500)
+
+_CACHE = ByteLRUCache(get_env_int("BAR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+_LOCK = threading.Lock()
+_FLIGHTS: Dict[Any, "_Flight"] = {}
+_BUMPS: Dict[str, int] = {}
+_STATE: Dict[str, Any] = {"generation": 0, "coalesced": 0, "loads": 0, "manifest_mtime": None, "manifest": {}}
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def get_cache() -> ByteLRUCache:
+    return _CACHE
+
+
+def configure(max_bytes: int) -> None:
+    """調整記憶體預算（立即淘汰到新上限以內）"""
+    _CACHE.resize(max_bytes)
+
+
+def _manifest() -> Dict[str, Dict[str, Any]]:
+    """ingest manifest（檔案有更新才重新載入）"""
+    from .ingest import manifest_path  # ingest 寫入後會呼叫 bump()，延後載入避免循環
+
+    path = manifest_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    with _LOCK:
+        if _STATE["manifest_mtime"] != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                _STATE["manifest"] = json.load(f)
+            _STATE["manifest_mtime"] = mtime
+        return _STATE["manifest"]
+
+
+def data_version(code: str) -> str:
+    """代碼目前的資料版本；亦可作為 indicators.cache.calc_cached 的 data_version"""
+    code = str(code)
+    entry = _manifest().get(code) or {}
+    with _LOCK:
+        local = f"{_STATE['generation']}.{_BUMPS.get(code, 0)}"
+    return f"{entry.get('last_date', '')}:{entry.get('tail_hash', '')[:16]}:{local}"
+
+
+def bump(codes: Optional[Iterable[str]] = None) -> None:
+    """資料已更新：指定代碼（None = 全部）的版本 +1，既有快取項目隨即失效"""
+    with _LOCK:
+        if codes is None:
+            _STATE["generation"] += 1
+            return
+        for c in codes:
+            _BUMPS[str(c)] = _BUMPS.get(str(c), 0) + 1
+
+
+def _reader(code: str):
+    """熱快取建置後又入庫過的代碼直接讀 parquet（熱快取要等下次 export 才會更新）"""
+    store = hotstore.open_store()
+    entry = _manifest().get(code)
+    if store is not None and entry and entry.get("updated_at", "") >= store.meta.get("built_at", ""):
+        return duckdb_io.read_ohlcv
+    return duckdb_io.read_ohlcv_hot
+
+
+def _load(code: str, bars: int, price_adjustment: str = "raw") -> Dict[str, np.ndarray]:
+    res = _reader(code)(code, last_n=bars, output="numpy", price_adjustment=price_adjustment)
+    out = {}
+    for k, v in res.items():
+        arr = np.array(v)  # 熱快取回傳的是 memmap 視圖；複製成獨立陣列才能正確計算佔用位元組
+        arr.flags.writeable = False  # 快取本體由多個呼叫端共用
+        out[k] = arr
+    return out
+
+
+def get_bars(code: str, last_n: Optional[int] = None, *, price_adjustment: str = "raw") -> Dict[str, np.ndarray]:
+    """
+    最後 last_n 根 bar（預設 BAR_CACHE_BARS）：{"date", open, high, low, close, volume}，陣列唯讀。
+    price_adjustment 同 duckdb_io.read_ohlcv（raw / adjusted 分開快取）。
+    last_n 超過 BAR_CACHE_BARS 時直接讀取、不進快取。查無代碼拋 FileNotFoundError（同 read_ohlcv）。
+    """
+    code = str(code)
+    depth = int(BAR_CACHE_BARS)
+    if last_n and int(last_n) > depth:
+        return _reader(code)(code, last_n=int(last_n), output="numpy", price_adjustment=price_adjustment)
+    key = (code, price_adjustment, data_version(code))
+    found, value = _CACHE.get(key)
+    if not found:
+        with _LOCK:
+            flight = _FLIGHTS.get(key)
+            leader = flight is None
+            if leader:
+                flight = _FLIGHTS[key] = _Flight()
+            else:
+                _STATE["coalesced"] += 1
+        if leader:
+            try:
+                flight.value = _load(code, depth, price_adjustment)
+                _CACHE.put(key, flight.value)
+                with _LOCK:
+                    _STATE["loads"] += 1
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with _LOCK:
+                    _FLIGHTS.pop(key, None)
+                flight.done.set()
+        else:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+        value = flight.value
+    if last_n and int(last_n) < len(value["date"]):
+        return {k: v[-int(last_n):] for k, v in value.items()}
+    return value
+
+
+def stats() -> Dict[str, Any]:
+    """LRU 計數（entries/bytes/max_bytes/hits/misses/evictions/hit_ratio）＋ 實際讀檔次數與合併等待次數"""
+    out = _CACHE.stats()
+    with _LOCK:
+        out.update(loads=_STATE["loads"], coalesced=_STATE["coalesced"], bars=int(BAR_CACHE_BARS))
+    return out
+
+
+def clear(*, reset_stats: bool = False) -> None:
+    _CACHE.clear(reset_stats=reset_stats)
+    if reset_stats:
+        with _LOCK:
+            _STATE["loads"] = _STATE["coalesced"] = 0
+
+
+__all__ = ["get_bars", "data_version", "bump", "stats", "clear", "configure", "get_cache", "BAR_CACHE_BARS"]
@@ -0,0 +1,304 @@
+# src/app/services/data_pipeline/dataset.py
+"""
+合併式 OHLCV 資料集（取代每檔一個 data/parquet/{code}.parquet）：
+
+    data/dataset/ohlcv/year=2024/part-0.parquet                 ← 壓實後的主檔（依 code, date 排序）
+    data/dataset/ohlcv/year=2024/delta-<ns>-<rand>.parquet      ← 每次 append 的小檔
+
+- 以年份做 hive 分割；主檔依 (code, date) 排序、固定列數切 row group，
+  min/max 統計量讓單檔查詢只讀到少數 row group（寫入統一走 parquet_writer，footer 宣告排序鍵）
+- append 只寫新的 delta 檔，不改寫既有檔案；同 (code, date) 以較新的 delta 為準
+- compact 把主檔＋delta 合併去重後原子替換主檔，再刪除已併入的 delta
+- 前復權（含息含拆）OHLC 與原始價格並存：adj_open/adj_high/adj_low/adj_close；
+  寫入時以 factor = adj_close / close 一次向量化算好，讀取端只需選欄位（見 duckdb_io 的 price_adjustment）
+- 加入前復權欄位之前寫成的檔案：讀取時以 adj_close / close 即時推得，壓實後即補齊
+- DATASET_ROW_GROUP_SIZE：壓實時每個 row group 的列數（預設 16384）
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app.config import get_env_int
+from .parquet_writer import write_ohlcv
+
+ROOT = Path(__file__).resolve().parents[4]
+DATASET_DIR = ROOT / "data" / "dataset" / "ohlcv"
+
+COLUMNS = ["code", "date", "open", "high", "low", "close", "adj_open", "adj_high", "adj_low", "adj_close", "volume", "source"]
+# 原始價格欄 → 前復權欄
+ADJUSTED = {"open": "adj_open", "high": "adj_high", "low": "adj_low", "close": "adj_close"}
+BASE_NAME = "part-0.parquet"
+DELTA_PREFIX = "delta-"
+ROW_GROUP_SIZE = get_env_int("DATASET_ROW_GROUP_SIZE", 16384)
+
+# 還原因子（前復權價 = 原始價 × factor）；close 非正值時視為 1
+FACTOR_SQL = "CASE WHEN CAST(close AS DOUBLE) > 0 THEN CAST(adj_close AS DOUBLE) / CAST(close AS DOUBLE) ELSE 1.0 END"
+
+
+def adjusted_sql(col: str) -> str:
+    """沒有 adj_open/adj_high/adj_low 欄的檔案（舊檔）以 adj_close / close 推得前復權價"""
+    raw = next(k for k, v in ADJUSTED.items() if v == col)
+    return f"CAST(adj_close AS DOUBLE)" if raw == "close" else f"CAST({raw} AS DOUBLE) * {FACTOR_SQL}"
+
+
+def _select(derive: bool) -> str:
+    """讀取時選出的欄位（date 統一為 TIMESTAMP、數值為 DOUBLE，與舊檔 schema 差異由此吸收）"""
+    cols = ["CAST(code AS VARCHAR) AS code", "CAST(date AS TIMESTAMP) AS date"]
+    for c in COLUMNS[2:]:
+        if c == "source":
+            cols.append("CAST(source AS VARCHAR) AS source")
+        elif derive and c in ("adj_open", "adj_high", "adj_low"):
+            cols.append(f"{adjusted_sql(c)} AS {c}")
+        else:
+            cols.append(f"CAST({c} AS DOUBLE) AS {c}")
+    return ", ".join(cols)
+# 同 (code, date) 多筆時的優先序：delta 依檔名（時間戳）由新到舊，主檔最舊
+_RANK = f"CASE WHEN parse_filename(filename) LIKE '{DELTA_PREFIX}%' THEN parse_filename(filename) ELSE '' END"
+
+
+def _root(root) -> Path:
+    return Path(root) if root is not None else DATASET_DIR
+
+
+def _year(value) -> Optional[int]:
+    return int(str(value)[:4]) if value else None
+
+
+def _cursor():
+    from .duckdb_io import get_cursor  # duckdb_io 也會 import 本模組，延後載入避免循環
+    return get_cursor()
+
+
+def _literal(path: Path) -> str:
+    """COPY ... TO 的目的路徑無法參數綁定，以 SQL 字串常值跳脫"""
+    return "'" + path.as_posix().replace("'", "''") + "'"
+
+
+def partition_dirs(root=None, *, start=None, end=None) -> Dict[int, Path]:
+    """year → 分割目錄；start/end 只保留可能含有該區間資料的年份"""
+    base = _root(root)
+    if not base.is_dir():
+        return {}
+    lo, hi = _year(start), _year(end)
+    out = {}
+    for entry in os.scandir(base):
+        if not entry.is_dir() or not entry.name.startswith("year="):
+            continue
+        try:
+            y = int(entry.name[5:])
+        except ValueError:
+            continue
+        if (lo is None or y >= lo) and (hi is None or y <= hi):
+            out[y] = Path(entry.path)
+    return dict(sorted(out.items()))
+
+
+def partition_files(root=None, *, start=None, end=None) -> List[Path]:
+    """區間內所有分割的 parquet 檔（主檔＋delta）；分割剪枝在這裡以年份完成"""
+    files = []
+    for d in partition_dirs(root, start=start, end=end).values():
+        files.extend(sorted(Path(e.path) for e in os.scandir(d) if e.is_file() and e.name.endswith(".parquet")))
+    return files
+
+
+def is_delta(path) -> bool:
+    return Path(path).name.startswith(DELTA_PREFIX)
+
+
+_SCHEMAS: Dict[tuple, bool] = {}
+
+
+def has_adjusted(files: Iterable) -> bool:
+    """檔案是否都已有前復權 OHLC 欄（只讀 footer，依路徑＋mtime 快取）"""
+    for f in files:
+        st = os.stat(f)
+        key = (str(f), st.st_mtime_ns, st.st_size)
+        ok = _SCHEMAS.get(key)
+        if ok is None:
+            ok = _SCHEMAS[key] = "adj_open" in pq.read_schema(f).names
+        if not ok:
+            return False
+    return True
+
+
+_CODES: Dict[tuple, frozenset] = {}
+
+
+def codes(files: Optional[Iterable] = None, *, root=None) -> frozenset:
+    """
+    資料集中出現過的代碼（不限日期）。每個檔案只讀一次 code 欄，依路徑＋mtime 快取：
+    append 後只多讀新的 delta，compact 後重讀主檔
+    """
+    out = set()
+    for f in (partition_files(root) if files is None else files):
+        st = os.stat(f)
+        key = (str(f), st.st_mtime_ns, st.st_size)
+        got = _CODES.get(key)
+        if got is None:
+            col = pq.read_table(f, columns=["code"]).column("code").unique()
+            got = _CODES[key] = frozenset(str(c) for c in col.to_pylist())
+        out |= got
+    return frozenset(out)
+
+
+def source_sql(has_delta: bool, where: str = "", derive: bool = False) -> str:
+    """
+    讀取資料集的 FROM 子查詢（第一個參數：檔案清單；where 中的 ? 接在其後）。
+    where 套用在原始欄位上，讓 code/date 條件直接用 row group 統計剪枝；
+    有未壓實的 delta 時，同 (code, date) 只留優先序最高的一筆。
+    derive=True（並非所有檔案都有前復權欄，見 has_adjusted）：前復權 OHLC 一律由 adj_close / close 推得。
+    """
+    select = _select(derive)
+    cond = f" WHERE {where}" if where else ""
+    if not has_delta:
+        return f"(SELECT {select} FROM read_parquet(?, hive_partitioning=false){cond})"
+    return (
+        f"(SELECT {select} FROM read_parquet(?, filename=true, hive_partitioning=false, union_by_name=true){cond} "
+        f"QUALIFY row_number() OVER (PARTITION BY code, date ORDER BY {_RANK} DESC) = 1)"
+    )
+
+
+def files_sql(files: List[Path], where: str = "") -> str:
+    """source_sql 的便利版：依檔案清單判斷是否有 delta、是否需要推得前復權欄"""
+    return source_sql(any(is_delta(p) for p in files), where=where, derive=not has_adjusted(files))
+
+
+def with_adjusted(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    補上前復權 OHLC（向量化）：factor = adj_close / close，adj_open/high/low = 原始價 × factor。
+    已有值的 adj_* 保留不動（只補缺值）；沒有 adj_close 時視為未調整（factor = 1）。
+    """
+    out = df.copy()
+    close = pd.to_numeric(out["close"], errors="coerce").to_numpy(dtype=np.float64)
+    adj_close = (pd.to_numeric(out["adj_close"], errors="coerce").to_numpy(dtype=np.float64)
+                 if "adj_close" in out.columns else close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(close > 0, adj_close / close, 1.0)
+    factor = np.where(np.isfinite(factor), factor, 1.0)
+    out["adj_close"] = np.where(np.isnan(adj_close), close, adj_close)
+    for raw, adj in ADJUSTED.items():
+        derived = pd.to_numeric(out[raw], errors="coerce").to_numpy(dtype=np.float64) * factor
+        if adj in out.columns:
+            have = pd.to_numeric(out[adj], errors="coerce").to_numpy(dtype=np.float64)
+            derived = np.where(np.isnan(have), derived, have)
+        out[adj] = derived
+    return out
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    missing = [c for c in ("code", "date") if c not in df.columns]
+    if missing:
+        raise ValueError(f"dataset rows require columns: {missing}")
+    out = df.copy()
+    out["code"] = out["code"].astype(str)
+    out["date"] = pd.to_datetime(out["date"]).dt.normalize()
+    if "close" in out.columns:
+        out = with_adjusted(out)
+    for col in COLUMNS:
+        if col not in out.columns:
+            out[col] = pd.NA
+    for col in COLUMNS[2:-1]:
+        out[col] = pd.to_numeric(out[col], errors="coerce").astype("float64")
+    out["source"] = out["source"].astype("string")
+    return out[COLUMNS]
+
+
+def _delta_name() -> str:
+    return f"{DELTA_PREFIX}{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+
+
+def append(df: pd.DataFrame, *, root=None) -> List[Path]:
+    """
+    追加資料（需含 code, date 欄）：依年份各寫一個 delta 檔，不動既有檔案。
+    回傳新寫入的檔案路徑。
+    """
+    if df is None or df.empty:
+        return []
+    rows = _normalize(df)
+    base = _root(root)
+    written = []
+    for year, part in rows.groupby(rows["date"].dt.year, sort=True):
+        d = base / f"year={int(year)}"
+        d.mkdir(parents=True, exist_ok=True)
+        written.append(write_ohlcv(part, d / _delta_name(), row_group_size=ROW_GROUP_SIZE))
+    return written
+
+
+def compact(*, root=None, years: Optional[Iterable[int]] = None, row_group_size: Optional[int] = None,
+            force: bool = False) -> Dict[int, int]:
+    """
+    壓實：每個分割的主檔＋delta 合併去重、依 (code, date) 排序，寫成單一主檔。
+    - 只處理開始時已存在的 delta；壓實期間新 append 的 delta 會保留到下次
+    - 沒有 delta 的分割預設略過（force=True 則一律重寫，例如調整 row group 大小後）
+    回傳 {year: 壓實後列數}
+    """
+    rg = int(row_group_size or ROW_GROUP_SIZE)
+    wanted = set(int(y) for y in years) if years is not None else None
+    cur = _cursor()
+    done = {}
+    for year, d in partition_dirs(root).items():
+        if wanted is not None and year not in wanted:
+            continue
+        files = sorted(p for p in d.glob("*.parquet"))
+        deltas = [p for p in files if is_delta(p)]
+        if not files or (not deltas and not force):
+            continue
+        query = f"SELECT * FROM {files_sql(files)} ORDER BY code, date"
+        table = cur.execute(query, [[p.as_posix() for p in files]]).arrow()
+        table = table.read_all() if hasattr(table, "read_all") else table  # 新版 DuckDB 回 RecordBatchReader
+        write_ohlcv(table, d / BASE_NAME, row_group_size=rg)
+        for p in deltas:
+            p.unlink(missing_ok=True)
+        done[year] = int(table.num_rows)
+    return done
+
+
+def import_legacy(parquet_dir, *, root=None, row_group_size: Optional[int] = None) -> Dict[int, int]:
+    """
+    舊佈局（每檔一個 {code}.parquet）→ 資料集：一次掃描全部舊檔、依年份寫成 delta，再壓實。
+    舊檔保留不動；duckdb_io 對資料集中沒有的代碼仍會讀舊檔。
+    """
+    files = sorted(Path(parquet_dir).glob("*.parquet"))
+    if not files:
+        return {}
+    base = _root(root)
+    base.mkdir(parents=True, exist_ok=True)
+    cur = _cursor()
+    staging = Path(tempfile.mkdtemp(prefix=".import-", dir=base))
+    try:
+        select = _select(True).replace("CAST(code AS VARCHAR)", "parse_filename(filename, true)", 1)
+        names = cur.execute("DESCRIBE SELECT * FROM read_parquet(?, union_by_name=true)",
+                            [[p.as_posix() for p in files]]).df()["column_name"].tolist()
+        if "source" not in names:
+            select = select.replace("CAST(source AS VARCHAR)", "CAST(NULL AS VARCHAR)")
+        if "adj_close" not in names:
+            select = select.replace("CAST(adj_close AS DOUBLE)", "CAST(close AS DOUBLE)")
+        cur.execute(
+            f"COPY (SELECT *, year(date) AS year FROM (SELECT {select} "
+            f"FROM read_parquet(?, filename=true, union_by_name=true, hive_partitioning=false))) "
+            f"TO {_literal(staging)} (FORMAT PARQUET, PARTITION_BY (year))",
+            [[p.as_posix() for p in files]],
+        )
+        for part in sorted(staging.glob("year=*/*.parquet")):
+            d = base / part.parent.name
+            d.mkdir(parents=True, exist_ok=True)
+            os.replace(part, d / _delta_name())
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return compact(root=base, row_group_size=row_group_size)
+
+
+__all__ = [
+    "DATASET_DIR", "COLUMNS", "ADJUSTED", "append", "compact", "import_legacy", "with_adjusted",
+    "partition_dirs", "partition_files", "source_sql", "files_sql", "has_adjusted", "codes", "adjusted_sql", "is_delta",
+]
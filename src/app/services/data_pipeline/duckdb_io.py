@@ -1,36 +1,495 @@
 # backend/app/services/data_pipeline/duckdb_io.py
+"""
+Parquet → DuckDB 讀取：
+- 全程序共用一個 in-memory DuckDB database；每個執行緒各自一個 cursor（DuckDB 連線不可跨執行緒共用）
+- fork 出的子程序（ProcessPool）偵測到 pid 改變即重建，不沿用父程序的連線
+- SQL 為固定樣板、路徑/日期/筆數一律以參數綁定（不再 f-string 拼接）
+- DUCKDB_THREADS：DuckDB 內部執行緒數；0（預設）= DuckDB 自行決定（CPU 數）
+- read_ohlcv_many：多檔一次 read_parquet([...])，回長表或對齊的 (dates × codes) panel
+- 來源：優先讀合併資料集（dataset.py，year 分割＋row group 統計），資料集中沒有的代碼退回舊的每檔一個 parquet
+- output="pandas"（預設）/"arrow"/"numpy"：後兩者只取 date + 五個 float64 欄位，不經 pandas
+  （numpy = {欄: 連續 ndarray}，缺值為 NaN；可直接交給 registry.calc / CompiledStrategy.evaluate）
+- price_adjustment="raw"（預設）/"adjusted"：adjusted 時 open/high/low/close 換成入庫時算好的前復權欄
+  （dataset 的 adj_*；舊檔以 adj_close / close 推得），只差在選哪一欄，讀取成本相同
+- read_ohlcv_hot / read_ohlcv_many_hot：同簽名，先讀 memmap 熱快取（hotstore.py），未涵蓋的代碼／區間退回 parquet
+"""
+import os
+import threading
+from datetime import date
+from functools import lru_cache
 from pathlib import Path
 import duckdb
+import numpy as np
 import pandas as pd
 
+from app.config import get_env_int
+from . import dataset, hotstore, parquet_writer
+from .trading_calendar import get_calendar
+from .panel import FIELDS, OhlcvPanel, long_to_panel
+
 
 # 回到專案根需要往上 4 層
 ROOT = Path(__file__).resolve().parents[4]
 PARQUET_DIR = ROOT / "data" / "parquet"
 
-def read_ohlcv(code: str, start: str | None = None, end: str | None = None, limit: int | None = None) -> pd.DataFrame:
+# 以平日近似交易日時，為國定假日/颱風假多抓的比例與下限（讀完再 tail 精準截斷）
+HOLIDAY_PAD_RATIO = 0.05
+HOLIDAY_PAD_MIN = 10
+
+DUCKDB_THREADS = get_env_int("DUCKDB_THREADS", 0)
+
+# 資料集單檔讀取回傳的欄位（對齊舊檔 SELECT * 的欄位）
+DATASET_COLS = [c for c in dataset.COLUMNS if c not in ("code", "date")]
+
+OUTPUTS = ("pandas", "arrow", "numpy")
+PRICE_ADJUSTMENTS = ("raw", "adjusted")
+
+_DB = None
+_DB_PID = None
+_DB_GEN = 0
+_DB_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+def _database():
+    global _DB, _DB_PID, _DB_GEN
+    with _DB_LOCK:
+        if _DB is None or _DB_PID != os.getpid():
+            con = duckdb.connect(database=":memory:")
+            if DUCKDB_THREADS > 0:
+                con.execute(f"SET threads = {int(DUCKDB_THREADS)}")
+            _DB, _DB_PID = con, os.getpid()
+            _DB_GEN += 1
+        return _DB, _DB_GEN
+
+def get_cursor():
+    """目前執行緒專用的 cursor（共用同一個 database 與設定）"""
+    db, gen = _database()
+    cur = getattr(_LOCAL, "cursor", None)
+    if cur is None or getattr(_LOCAL, "gen", None) != gen:
+        cur = db.cursor()
+        _LOCAL.cursor, _LOCAL.gen = cur, gen
+    return cur
+
+def configure(*, threads: int | None = None) -> None:
+    """
+    調整 DuckDB 執行緒數。threads 是 database 層級的設定：直接套用到共用的 database，
+    不關閉、不替換連線，其他執行緒手上的 cursor（含執行中的查詢）照常可用
+    """
+    global DUCKDB_THREADS
+    with _DB_LOCK:
+        if threads is not None:
+            DUCKDB_THREADS = int(threads)
+        if _DB is None or _DB_PID != os.getpid():
+            return  # 尚未建立（或 fork 後待重建）：_database() 建立時套用
+        with _DB.cursor() as cur:
+            cur.execute(f"SET threads = {int(DUCKDB_THREADS)}" if DUCKDB_THREADS > 0 else "RESET threads")
+
+def lookback_start(end: str | None, bars: int) -> str:
+    """
+    回推 bars 根交易日的起始日期（YYYY-MM-DD），供 `date >=` 下推到 DuckDB。
+    以交易日曆（trading_calendar）回推，並多抓少量交易日涵蓋休市表未列出的停市（農曆節日、颱風假）。
+    """
+    anchor = np.datetime64(end or date.today().isoformat(), "D")
+    pad = max(HOLIDAY_PAD_MIN, int(bars * HOLIDAY_PAD_RATIO))
+    return str(get_calendar().offset(anchor, -(int(bars) - 1 + pad)))
+
+def read_ohlcv(
+    code: str,
+    start: str | None = None,
+    end: str | None = None,
+    limit: int | None = None,
+    *,
+    last_n: int | None = None,
+    output: str = "pandas",
+    price_adjustment: str = "raw",
+):
     """
-    從 data/parquet/{code}.parquet 讀取 OHLCV
+    讀取單檔 OHLCV：優先讀合併資料集（dataset.py），資料集中沒有此代碼時退回 data/parquet/{code}.parquet
     可選 start/end（YYYY-MM-DD）與 limit。
+    last_n：只取（end 以前）最後 N 根 bar；會把 `date >=` 下界下推到查詢，
+            避免掃描整檔歷史（N 通常來自策略 warm-up，見 domain/strategies/lookback.py）。
+    output：pandas → DataFrame（全部欄位）；arrow → pyarrow.Table；numpy → {"date", open..volume: ndarray}
+    price_adjustment：adjusted → open/high/low/close 為前復權價（含息含拆）
     """
+    _check_output(output)
+    adjusted = _check_adjustment(price_adjustment)
+    cur = get_cursor()
+    if last_n:
+        bound = lookback_start(end, int(last_n))
+        res = _read_one(cur, code, max(start, bound) if start else bound, end, limit, last_n, output, adjusted)
+        # 資料未更新到 end（或今天）時，下界可能切太多 → 退回不設下界
+        if res is not None and _nrows(res) >= min(int(last_n), int(limit or last_n)):
+            return res
+    res = _read_one(cur, code, start, end, limit, last_n, output, adjusted)
+    if res is None:
+        raise FileNotFoundError(f"Parquet not found for code={code}: {PARQUET_DIR / f'{code}.parquet'}")
+    return res
+
+def _check_output(output: str) -> None:
+    if output not in OUTPUTS:
+        raise ValueError(f"output must be one of {OUTPUTS}, got {output!r}")
+
+def _check_adjustment(price_adjustment: str) -> bool:
+    if price_adjustment not in PRICE_ADJUSTMENTS:
+        raise ValueError(f"price_adjustment must be one of {PRICE_ADJUSTMENTS}, got {price_adjustment!r}")
+    return price_adjustment == "adjusted"
+
+def _read_one(cur, code: str, start, end, limit, last_n, output, adjusted=False):
+    """資料集 → 舊檔；兩邊都沒有此代碼時回 None（代碼是否屬於資料集見 _in_dataset，與 _read_many 相同）"""
+    cols = DATASET_COLS if output == "pandas" else FIELDS
+    if _in_dataset([code]):
+        files = dataset.partition_files(start=start, end=end)
+        if not files:
+            return _empty(["date", *cols], output)
+        # 沒有 delta、且 footer 宣告依 (code, date) 排序：掃描順序即日期順序，省略排序改在取回後截尾
+        ordered = not any(dataset.is_delta(f) for f in files) and parquet_writer.declares_sorted(files, ("code", "date"))
+        sql, params = _many_sql(("dataset", files), [code], start, end, None if ordered else last_n,
+                                limit=None if ordered and last_n else limit, cols=cols, with_code=False,
+                                adjusted=adjusted, ordered=ordered)
+        res = _fetch(cur.execute(sql, params), output)
+        return _tail(res, last_n, limit) if ordered and last_n else res
     path = PARQUET_DIR / f"{code}.parquet"
     if not path.exists():
-        raise FileNotFoundError(f"Parquet not found for code={code}: {path}")
+        return None
+    return _query(cur, path.as_posix(), start, end, limit, last_n, output, adjusted)
+
+def _in_dataset(codes) -> list:
+    """
+    資料集中有的代碼（不限日期，依 dataset.codes 的檔案快取，不必每次掃描）。
+    這些代碼只讀資料集：區間內沒有 bar 就是空結果，不退回舊檔
+    """
+    known = dataset.codes()
+    return [c for c in codes if str(c) in known]
+
+# ---- 輸出格式（pandas / arrow / numpy）共用的小工具 ----
+
+def _fetch(result, output: str):
+    if output == "pandas":
+        return result.df()
+    if output == "arrow":
+        table = result.arrow()
+        return table.read_all() if hasattr(table, "read_all") else table  # 新版 DuckDB 回 RecordBatchReader
+    out = {}
+    for name, col in result.fetchnumpy().items():
+        if np.ma.isMaskedArray(col):
+            col = col.filled(np.nan) if col.dtype.kind == "f" else col.filled()
+        out[name] = np.ascontiguousarray(col)
+    return out
+
+def _empty(cols, output: str):
+    if output == "pandas":
+        return pd.DataFrame({c: pd.Series(dtype="float64") for c in cols})
+    dtype = {"code": object, "date": "datetime64[us]"}
+    if output == "arrow":
+        import pyarrow as pa
+        return pa.table({c: pa.array(np.empty(0, dtype=dtype.get(c, np.float64))) for c in cols})
+    return {c: np.empty(0, dtype=dtype.get(c, np.float64)) for c in cols}
+
+def _nrows(res) -> int:
+    if isinstance(res, dict):
+        return len(next(iter(res.values()))) if res else 0
+    return res.num_rows if hasattr(res, "num_rows") else len(res)
+
+def _column(res, name: str) -> np.ndarray:
+    if isinstance(res, pd.DataFrame):
+        return res[name].to_numpy()
+    if isinstance(res, dict):
+        return res[name]
+    return res.column(name).to_numpy()
+
+def _take(res, rows: np.ndarray):
+    if isinstance(res, pd.DataFrame):
+        return res.iloc[rows].reset_index(drop=True)
+    if isinstance(res, dict):
+        return {k: v[rows] for k, v in res.items()}
+    return res.take(rows)
+
+def _tail(res, last_n: int, limit: int | None = None):
+    """已依日期排序的結果取最後 last_n 列（再套 limit），等同 SQL 的 ORDER BY date DESC LIMIT 後再正排"""
+    n = _nrows(res)
+    rows = np.arange(max(n - int(last_n), 0), n)
+    return _take(res, rows[:int(limit)] if limit else rows)
 
-    con = duckdb.connect(database=":memory:")
-    query = f"SELECT * FROM read_parquet('{path.as_posix()}')"
+def _concat_sorted(parts, output: str):
+    """多段結果合併後依 (code, date) 排序"""
+    if output == "pandas":
+        df = pd.concat(parts, ignore_index=True)
+        return df.sort_values(["code", "date"], kind="stable").reset_index(drop=True)
+    if output == "arrow":
+        import pyarrow as pa
+        return pa.concat_tables(parts).sort_by([("code", "ascending"), ("date", "ascending")])
+    merged = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    order = np.lexsort((merged["date"], merged["code"].astype(str)))
+    return {k: v[order] for k, v in merged.items()}
 
+# ---- 舊佈局：單檔 ----
+
+def _legacy_col(c: str, adjusted: bool) -> str:
+    """舊檔的數值欄（轉為 DOUBLE）：沒有 adj_open 等欄，前復權價以 adj_close / close 推得"""
+    if adjusted and c in dataset.ADJUSTED:
+        c = dataset.ADJUSTED[c]
+    if c in dataset.ADJUSTED.values():
+        return dataset.adjusted_sql(c)
+    return f"CAST({c} AS DOUBLE)"
+
+@lru_cache(maxsize=None)
+def _sql(has_start: bool, has_end: bool, has_last_n: bool, has_limit: bool, cols: tuple | None = None,
+         adjusted: bool = False, ordered: bool = False) -> str:
+    """
+    依條件組合產生固定的參數化 SQL 樣板（參數順序：path, start, end, last_n, limit）
+    cols：None = 全部欄位；否則只取 date + cols（轉為 DOUBLE）
+    adjusted：open/high/low/close 換成前復權價
+    ordered：檔案已依日期排序（parquet_writer 寫入）→ 不排序；呼叫端不傳 last_n，取回後以 _tail 截尾
+    """
+    if cols is None:
+        replace = ", ".join(f"{_legacy_col(c, True)} AS {c}" for c in dataset.ADJUSTED)
+        select = f"* REPLACE ({replace})" if adjusted else "*"
+    else:
+        select = "date, " + ", ".join(f"{_legacy_col(c, adjusted)} AS {c}" for c in cols)
+    query = f"SELECT {select} FROM read_parquet(?)"
     where = []
-    if start:
-        where.append(f"date >= '{start}'")
-    if end:
-        where.append(f"date <= '{end}'")
+    if has_start:
+        where.append("date >= CAST(? AS DATE)")
+    if has_end:
+        where.append("date <= CAST(? AS DATE)")
     if where:
         query += " WHERE " + " AND ".join(where)
+    if has_last_n:
+        query = f"SELECT * FROM ({query} ORDER BY date DESC LIMIT ?)"
+    if not ordered:
+        query += " ORDER BY date"
+    if has_limit:
+        query += " LIMIT ?"
+    return query
+
+def _query(cur, src: str, start: str | None, end: str | None, limit: int | None, last_n: int | None,
+           output: str = "pandas", adjusted: bool = False):
+    # parquet_writer 寫入（footer 宣告依日期排序）的檔案：不排序，last_n / limit 在取回後截取
+    ordered = parquet_writer.declares_sorted([src], ("date",))
+    in_sql = not (ordered and last_n)
+    params = [src]
+    if start:
+        params.append(str(start))
+    if end:
+        params.append(str(end))
+    if last_n and in_sql:
+        params.append(int(last_n))
+    if limit and in_sql:
+        params.append(int(limit))
+    cols = None if output == "pandas" else tuple(FIELDS)
+    sql = _sql(bool(start), bool(end), bool(last_n) and in_sql, bool(limit) and in_sql, cols, adjusted, ordered)
+    res = _fetch(cur.execute(sql, params), output)
+    return res if in_sql else _tail(res, last_n, limit)
+
+# ---- 多檔 ----
+
+def read_ohlcv_many(
+    codes,
+    start: str | None = None,
+    end: str | None = None,
+    *,
+    last_n: int | None = None,
+    layout: str = "long",
+    dates=None,
+    output: str = "pandas",
+    extra_columns=(),
+    price_adjustment: str = "raw",
+):
+    """
+    多檔 OHLCV 一次讀取：資料集與舊檔各一次 read_parquet([...]) 掃描，日期條件下推。
+    - layout="long"  → (code, date, open, high, low, close, volume)，依 code, date 排序；
+                       output 決定型別（DataFrame / pyarrow.Table / {欄: ndarray}）
+    - layout="panel" → OhlcvPanel（dates × codes，缺 bar 為 NaN；dates 省略時取資料日期聯集），一律不經 pandas
+    - last_n：每檔只取（end 以前）最後 N 根；同 read_ohlcv 會下推 `date >=` 下界
+    - 資料集中沒有的代碼讀舊檔；兩邊都找不到不報錯：長表中不出現，panel 中整欄 NaN 並列入 missing
+    - extra_columns：長表另外帶出的數值欄（例如 adj_close）
+    - price_adjustment：同 read_ohlcv
+    """
+    if layout not in ("long", "panel"):
+        raise ValueError(f"layout must be 'long' or 'panel', got {layout!r}")
+    _check_output(output)
+    adjusted = _check_adjustment(price_adjustment)
+    if layout == "panel":
+        output = "numpy"
+    codes = [str(c) for c in codes]
+    cols = tuple(FIELDS) + tuple(c for c in extra_columns if c not in FIELDS)
+    cur = get_cursor()
+
+    if last_n:
+        bound = lookback_start(end, int(last_n))
+        res = _read_many(cur, codes, max(start, bound) if start else bound, end, last_n, output, cols, adjusted)
+        # 部分代碼資料未更新到 end 時，下界可能切太多 → 這些代碼退回不設下界
+        found, counts = np.unique(_column(res, "code").astype(str), return_counts=True)
+        size = dict(zip(found.tolist(), counts.tolist()))
+        stale = [c for c in codes if size.get(c, 0) < int(last_n)]
+        if stale:
+            again = _read_many(cur, stale, start, end, last_n, output, cols, adjusted)
+            keep = np.flatnonzero(~np.isin(_column(res, "code").astype(str), stale))
+            res = _concat_sorted([_take(res, keep), again], output)
+    else:
+        res = _read_many(cur, codes, start, end, None, output, cols, adjusted)
 
-    query += " ORDER BY date"
+    if layout == "long":
+        return res
+    return long_to_panel(res, codes, dates=dates)
+
+def _read_many(cur, codes, start, end, last_n, output, cols=tuple(FIELDS), adjusted=False):
+    parts = []
+    known = _in_dataset(codes)
+    files = dataset.partition_files(start=start, end=end) if known else []
+    if files:
+        parts.append(_fetch(cur.execute(*_many_sql(("dataset", files), known, start, end, last_n, cols=cols,
+                                                   adjusted=adjusted)), output))
+    seen = set(known)
+    rest = [c for c in codes if c not in seen]
+    legacy = [p.as_posix() for p in (PARQUET_DIR / f"{c}.parquet" for c in rest) if p.exists()]
+    if legacy:
+        parts.append(_fetch(cur.execute(*_many_sql(("files", legacy), None, start, end, last_n, cols=cols,
+                                                   adjusted=adjusted)), output))
+    parts = [p for p in parts if _nrows(p)]
+    if not parts:
+        return _empty(["code", "date", *cols], output)
+    if len(parts) == 1:
+        return parts[0]
+    return _concat_sorted(parts, output)
+
+@lru_cache(maxsize=None)
+def _sql_many(kind: str, has_delta: bool, one_code: bool, has_start: bool, has_end: bool,
+              has_last_n: bool, has_limit: bool, cols: tuple, with_code: bool,
+              derive: bool = False, adjusted: bool = False, ordered: bool = False) -> str:
+    """
+    參數順序：files, [codes | code], start, end, last_n, limit
+    - kind="files"：舊檔，代碼取自檔名
+    - kind="dataset"：合併資料集，代碼條件與日期條件一起下推到掃描（去重前）；
+      derive = 檔案中有缺前復權欄者（dataset.has_adjusted）
+    - adjusted：open/high/low/close 取前復權欄
+    - ordered：單檔且檔案已依 (code, date) 排序、無 delta → 掃描順序即結果順序，省略 ORDER BY
+    """
+    where = []
+    if kind == "dataset":
+        where.append("code = ?" if one_code else "list_contains(?, code)")
+    if has_start:
+        where.append("date >= CAST(? AS DATE)")
+    if has_end:
+        where.append("date <= CAST(? AS DATE)")
+    if kind == "dataset":
+        picks = ", ".join(f"{dataset.ADJUSTED[c]} AS {c}" if adjusted and c in dataset.ADJUSTED else c for c in cols)
+        query = f"SELECT code, date, {picks} FROM {dataset.source_sql(has_delta, where=' AND '.join(where), derive=derive)}"
+    else:
+        casts = ", ".join(f"{_legacy_col(c, adjusted)} AS {c}" for c in cols)
+        query = (
+            f"SELECT parse_filename(filename, true) AS code, date, {casts} "
+            "FROM read_parquet(?, filename=true, union_by_name=true)"
+        )
+        if where:
+            query += " WHERE " + " AND ".join(where)
+    select = ("code, " if with_code else "") + "date, " + ", ".join(cols)
+    if has_last_n:
+        query = (
+            f"SELECT {select} FROM ("
+            f"SELECT *, row_number() OVER (PARTITION BY code ORDER BY date DESC) AS rn FROM ({query})"
+            ") WHERE rn <= ?"
+        )
+    else:
+        query = f"SELECT {select} FROM ({query})"
+    if not ordered:
+        query += " ORDER BY code, date" if with_code else " ORDER BY date"
+    if has_limit:
+        query += " LIMIT ?"
+    return query
+
+def _many_sql(source, codes, start: str | None, end: str | None, last_n: int | None,
+              *, limit: int | None = None, cols=FIELDS, with_code: bool = True, adjusted: bool = False,
+              ordered: bool = False):
+    """回傳 (sql, params)"""
+    kind, files = source
+    params = [[Path(f).as_posix() for f in files]]
+    one_code = False
+    if kind == "dataset":
+        one_code = len(codes) == 1
+        params.append(str(codes[0]) if one_code else [str(c) for c in codes])
+    if start:
+        params.append(str(start))
+    if end:
+        params.append(str(end))
+    if last_n:
+        params.append(int(last_n))
     if limit:
-        query += f" LIMIT {int(limit)}"
+        params.append(int(limit))
+    has_delta = kind == "dataset" and any(dataset.is_delta(f) for f in files)
+    derive = kind == "dataset" and not dataset.has_adjusted(files)
+    sql = _sql_many(kind, has_delta, one_code, bool(start), bool(end), bool(last_n), bool(limit),
+                    tuple(cols), with_code, derive, adjusted, ordered and not with_code and not has_delta)
+    return sql, params
+
+# ---- 熱快取（memmap） ----
+
+def _from_numpy(res: dict, output: str):
+    if output == "pandas":
+        return pd.DataFrame(res)
+    if output == "arrow":
+        import pyarrow as pa
+        return pa.table(res)
+    return res
+
+def read_ohlcv_hot(
+    code: str,
+    start: str | None = None,
+    end: str | None = None,
+    limit: int | None = None,
+    *,
+    last_n: int | None = None,
+    output: str = "pandas",
+    price_adjustment: str = "raw",
+):
+    """
+    同 read_ohlcv，先讀熱快取；快取未建置、沒有此代碼或請求超出保存範圍時退回 read_ohlcv。
+    pandas 輸出的欄位為 date + open..volume + adj_*（快取不保存 source）。
+    """
+    _check_output(output)
+    adjusted = _check_adjustment(price_adjustment)
+    store = hotstore.open_store()
+    cols = hotstore.COLUMNS if output == "pandas" else FIELDS
+    res = None
+    if store is not None and store.has(cols, adjusted):
+        res = store.read(code, start, end, limit, last_n=last_n, cols=cols, adjusted=adjusted)
+    if res is None:
+        return read_ohlcv(code, start, end, limit, last_n=last_n, output=output, price_adjustment=price_adjustment)
+    return _from_numpy(res, output)
 
-    df = con.execute(query).df()
-    return df
\ No newline at end of file
+def read_ohlcv_many_hot(
+    codes,
+    start: str | None = None,
+    end: str | None = None,
+    *,
+    last_n: int | None = None,
+    layout: str = "long",
+    dates=None,
+    output: str = "pandas",
+    extra_columns=(),
+    price_adjustment: str = "raw",
+):
+    """同 read_ohlcv_many，先讀熱快取；未涵蓋的代碼以 read_ohlcv_many 補讀後合併"""
+    if layout not in ("long", "panel"):
+        raise ValueError(f"layout must be 'long' or 'panel', got {layout!r}")
+    _check_output(output)
+    adjusted = _check_adjustment(price_adjustment)
+    codes = [str(c) for c in codes]
+    cols = tuple(FIELDS) + tuple(c for c in extra_columns if c not in FIELDS)
+    store = hotstore.open_store()
+    if store is None or not store.has(cols, adjusted):
+        return read_ohlcv_many(codes, start, end, last_n=last_n, layout=layout, dates=dates,
+                               output=output, extra_columns=extra_columns, price_adjustment=price_adjustment)
+    rest = store.uncovered(codes, start, end, last_n=last_n)
+    more = (read_ohlcv_many(rest, start, end, last_n=last_n, output="numpy", extra_columns=extra_columns,
+                            price_adjustment=price_adjustment) if rest else None)
+    if layout == "panel" and (more is None or not _nrows(more)):
+        # 全部來自快取：不經長表
+        return store.panel(codes, start, end, last_n=last_n, dates=dates, adjusted=adjusted)
+    res, _ = store.read_many([c for c in codes if c not in set(rest)], start, end, last_n=last_n, cols=cols,
+                             adjusted=adjusted)
+    if more is not None and _nrows(more):
+        res = _concat_sorted([res, more], "numpy")
+    if layout == "panel":
+        return long_to_panel(res, codes, dates=dates)
+    return _from_numpy(res, output)
@@ -0,0 +1,269 @@
+# src/app/services/data_pipeline/hotstore.py
+"""
+掃描熱路徑用的近期 OHLCV 快取（memmap）：
+
+    data/hot/CURRENT                         ← 目前版本的目錄名（暫存檔＋os.replace 切換）
+    data/hot/<ns>-<rand>/index.json          ← codes / 每檔 bar 數 / depth / 欄位 / 建置時間
+    data/hot/<ns>-<rand>/date.npy            ← (代碼數 × depth) int32，1970-01-01 起算的日數
+    data/hot/<ns>-<rand>/{open,...}.npy      ← (代碼數 × depth) float64（或 float32）
+
+- 每欄一個 2-D 陣列、每檔一列，最後 depth 根 bar 靠右對齊，左側補 NaN / PAD
+- 讀取以 np.load(mmap_mode="r") 開啟：最後 N 根就是每列尾端的連續區段，不經 parquet 解碼
+- parquet（資料集／舊檔）仍是唯一資料來源；export() 於入庫後整份重建，寫入新目錄再切換 CURRENT，
+  讀取端看到的一律是完整的一版
+- 前復權 OHLC 一併保存；adjusted=True 時 open/high/low/close 讀對應的 adj_* 陣列
+- 只保存最後 depth 根：請求超出範圍（start 早於保存的第一根、或 last_n > depth）視為未涵蓋，由呼叫端退回 parquet
+環境變數：HOT_DEPTH（每檔保存的 bar 數，預設 500）
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_env_int
+from .panel import FIELDS, OhlcvPanel
+from .trading_calendar import get_calendar
+
+ROOT = Path(__file__).resolve().parents[4]
+HOT_DIR = ROOT / "data" / "hot"
+HOT_DEPTH = get_env_int("HOT_DEPTH", 500)
+
+# 保存的數值欄位（FIELDS 之外另帶前復權 OHLC）
+COLUMNS = [*FIELDS, "adj_open", "adj_high", "adj_low", "adj_close"]
+# 原始價格欄 → 前復權欄（同 dataset.ADJUSTED）
+ADJUSTED = {"open": "adj_open", "high": "adj_high", "low": "adj_low", "close": "adj_close"}
+POINTER = "CURRENT"
+INDEX_NAME = "index.json"
+PAD = np.iinfo(np.int32).min
+
+_LOCK = threading.Lock()
+_OPEN: Dict[str, Any] = {"key": None, "store": None}
+
+
+def _root(root) -> Path:
+    return Path(root) if root is not None else HOT_DIR
+
+
+def _days(value) -> int:
+    return int(np.datetime64(str(value)[:10], "D").astype(np.int64))
+
+
+class HotStore:
+    """單一版本的唯讀視圖；陣列在第一次用到時才 memmap"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path / INDEX_NAME, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.codes: List[str] = self.meta["codes"]
+        self.depth = int(self.meta["depth"])
+        self.counts = np.asarray(self.meta["counts"], dtype=np.int64)
+        self.rows = {c: i for i, c in enumerate(self.codes)}
+        self.columns: List[str] = self.meta["columns"]
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def has(self, cols, adjusted: bool = False) -> bool:
+        return all(_name(c, adjusted) in self.columns for c in cols)
+
+    def array(self, name: str) -> np.ndarray:
+        arr = self._arrays.get(name)
+        if arr is None:
+            arr = self._arrays[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")
+        return arr
+
+    def _window(self, rows: np.ndarray, start, end, last_n) -> Tuple[np.ndarray, np.ndarray]:
+        """rows 各列在 [start, end] 內（再取最後 last_n 根）的遮罩，以及各列是否完整涵蓋請求"""
+        days = self.array("date")[rows]
+        mask = days != PAD
+        if start:
+            mask &= days >= _days(start)
+        if end:
+            mask &= days <= _days(end)
+        if last_n:
+            # 由右往左數第幾根符合條件；超過 last_n 者去掉
+            rank = np.cumsum(mask[:, ::-1], axis=1)[:, ::-1]
+            mask &= rank <= int(last_n)
+        full = self.counts[rows] < self.depth  # 整段歷史都在 → 一律涵蓋
+        if start:
+            full |= days[:, 0] <= _days(start)
+        if last_n:
+            full |= mask.sum(axis=1) >= int(last_n)
+        return mask, full
+
+    def read(self, code: str, start=None, end=None, limit=None, *, last_n=None, cols=COLUMNS,
+             adjusted: bool = False) -> Optional[Dict[str, np.ndarray]]:
+        """單檔 → {"date", cols...}；不在快取中或未涵蓋請求時回 None"""
+        i = self.rows.get(str(code))
+        if i is None:
+            return None
+        mask, full = self._window(np.array([i]), start, end, last_n)
+        if not full[0]:
+            return None
+        sel = np.flatnonzero(mask[0])
+        if limit:
+            sel = sel[: int(limit)]
+        lo, hi = (int(sel[0]), int(sel[-1]) + 1) if len(sel) else (0, 0)
+        out = {"date": _dates(self.array("date")[i, lo:hi])}
+        for c in cols:
+            out[c] = np.asarray(self.array(_name(c, adjusted))[i, lo:hi])
+        return out
+
+    def uncovered(self, codes: List[str], start=None, end=None, *, last_n=None) -> List[str]:
+        """不在快取中或超出保存範圍的代碼"""
+        wanted = sorted(set(str(c) for c in codes))
+        hits = [c for c in wanted if c in self.rows]
+        if not hits:
+            return wanted
+        _, full = self._window(np.array([self.rows[c] for c in hits], dtype=np.int64), start, end, last_n)
+        covered = set(np.asarray(hits, dtype=object)[full].tolist())
+        return [c for c in wanted if c not in covered]
+
+    def read_many(self, codes: List[str], start=None, end=None, *, last_n=None, cols=COLUMNS,
+                  adjusted: bool = False) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """多檔長表（依 code, date 排序）＋ 未涵蓋（不在快取中或範圍不足）的代碼"""
+        wanted = sorted(set(str(c) for c in codes))
+        hits = [c for c in wanted if c in self.rows]
+        rows = np.array([self.rows[c] for c in hits], dtype=np.int64)
+        mask, full = self._window(rows, start, end, last_n) if len(rows) else (np.zeros((0, self.depth), bool), np.zeros(0, bool))
+        covered = set(np.asarray(hits, dtype=object)[full].tolist()) if len(hits) else set()
+        rows, mask = rows[full], mask[full]
+        out = {
+            "code": np.repeat(np.asarray([c for c in hits if c in covered], dtype=object), mask.sum(axis=1)),
+            "date": _dates(self.array("date")[rows][mask]),
+        }
+        for c in cols:
+            out[c] = self.array(_name(c, adjusted))[rows][mask]
+        return out, [c for c in wanted if c not in covered]
+
+    def panel(self, codes: List[str], start=None, end=None, *, last_n=None, dates=None, cols=FIELDS,
+              adjusted: bool = False) -> OhlcvPanel:
+        """
+        直接由 2-D 陣列組 panel（不經長表）；呼叫端需先以 uncovered() 確認沒有需要補讀的代碼，
+        不在快取中的代碼整欄 NaN 並列入 missing
+        """
+        codes = [str(c) for c in codes]
+        hits = [(j, self.rows[c]) for j, c in enumerate(codes) if c in self.rows]
+        cols_j = np.array([j for j, _ in hits], dtype=np.int64)
+        rows = np.array([i for _, i in hits], dtype=np.int64)
+        days = self.array("date")[rows]
+        mask, _ = self._window(rows, start, end, last_n)
+        picked = days[mask]
+        j = np.repeat(cols_j, mask.sum(axis=1))
+        if dates is None:
+            axis, i = get_calendar().align(picked)
+            keep = np.ones(len(picked), bool)
+        else:
+            axis = np.unique(pd.to_datetime(list(dates)).to_numpy().astype("datetime64[D]").astype(np.int64))
+            i = np.minimum(np.searchsorted(axis, picked), max(len(axis) - 1, 0))
+            keep = axis[i] == picked if len(axis) else np.zeros(len(picked), bool)
+        i, j = i[keep], j[keep]
+        arrays = {}
+        for c in cols:
+            arr = np.full((len(axis), len(codes)), np.nan)
+            arr[i, j] = self.array(_name(c, adjusted))[rows][mask][keep]
+            arrays[c] = arr
+        present = set(codes[k] for k in cols_j[mask.any(axis=1)].tolist())
+        return OhlcvPanel(dates=pd.DatetimeIndex(_dates(axis)), codes=codes, arrays=arrays,
+                          missing=[c for c in codes if c not in present])
+
+
+def _name(col: str, adjusted: bool) -> str:
+    return ADJUSTED.get(col, col) if adjusted else col
+
+
+def _dates(days: np.ndarray) -> np.ndarray:
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[us]")
+
+
+def current(root=None) -> Optional[Path]:
+    base = _root(root)
+    try:
+        name = (base / POINTER).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return base / name if name else None
+
+
+def open_store(root=None) -> Optional[HotStore]:
+    """目前版本（CURRENT 換版後自動重開）；尚未建置回 None"""
+    path = current(root)
+    if path is None:
+        return None
+    with _LOCK:
+        if _OPEN["key"] != path:
+            _OPEN["store"], _OPEN["key"] = HotStore(path), path
+        return _OPEN["store"]
+
+
+def _all_codes() -> List[str]:
+    """資料集與舊檔中的全部代碼"""
+    from . import dataset, duckdb_io  # duckdb_io 也會 import 本模組，延後載入避免循環
+    codes = set()
+    files = dataset.partition_files()
+    if files:
+        src = dataset.source_sql(any(dataset.is_delta(p) for p in files))
+        rows = duckdb_io.get_cursor().execute(f"SELECT DISTINCT code FROM {src}", [[p.as_posix() for p in files]]).fetchall()
+        codes.update(r[0] for r in rows)
+    if duckdb_io.PARQUET_DIR.is_dir():
+        codes.update(p.stem for p in duckdb_io.PARQUET_DIR.glob("*.parquet"))
+    return sorted(codes)
+
+
+def export(codes=None, *, root=None, depth: Optional[int] = None, dtype: str = "float64", keep: int = 1) -> Dict[str, Any]:
+    """
+    由 parquet 重建熱快取：每檔最後 depth 根，一次 read_ohlcv_many 讀出後寫入新版本目錄並切換 CURRENT。
+    codes 省略 = 資料集＋舊檔全部代碼；keep = 保留幾個舊版本（已開啟的 memmap 仍可讀完）。
+    回傳 index.json 內容。
+    """
+    from . import duckdb_io
+
+    depth = int(depth or HOT_DEPTH)
+    codes = sorted(set(str(c) for c in codes)) if codes is not None else _all_codes()
+    long = duckdb_io.read_ohlcv_many(codes, last_n=depth, output="numpy", extra_columns=COLUMNS[len(FIELDS):]) if codes else {}
+    found, first, counts = (np.unique(long["code"].astype(str), return_index=True, return_counts=True)
+                            if long and len(long["code"]) else (np.empty(0, str), np.empty(0, np.int64), np.empty(0, np.int64)))
+    n = len(found)
+    # 長表第 j 筆 → (列, 欄)：靠右對齊
+    row = np.repeat(np.arange(n), counts)
+    col = np.arange(len(row)) - np.repeat(first, counts) + np.repeat(depth - counts, counts)
+
+    base = _root(root)
+    build = base / f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"  # 名稱依建置時間排序
+    build.mkdir(parents=True)
+    days = np.full((n, depth), PAD, dtype=np.int32)
+    if n:
+        days[row, col] = long["date"].astype("datetime64[D]").astype(np.int64)
+    np.save(build / "date.npy", days)
+    for c in COLUMNS:
+        arr = np.full((n, depth), np.nan, dtype=dtype)
+        if n:
+            arr[row, col] = long[c]
+        np.save(build / f"{c}.npy", arr)
+    meta = {
+        "codes": found.tolist(), "counts": counts.tolist(), "depth": depth, "columns": COLUMNS, "dtype": dtype,
+        "last_date": str(_dates(days[days != PAD].max(initial=PAD))[()])[:10] if n else None,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(build / INDEX_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    tmp = base / f".{POINTER}.{os.getpid()}.tmp"
+    tmp.write_text(build.name, encoding="utf-8")
+    os.replace(tmp, base / POINTER)
+    old = sorted(p for p in base.iterdir() if p.is_dir() and p != build)
+    for p in old[: max(len(old) - int(keep), 0)]:
+        shutil.rmtree(p, ignore_errors=True)
+    return meta
+
+
+__all__ = ["HotStore", "HOT_DIR", "HOT_DEPTH", "COLUMNS", "export", "open_store", "current"]
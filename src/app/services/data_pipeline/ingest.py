@@ -0,0 +1,507 @@
+# src/app/services/data_pipeline/ingest.py
+"""
+增量日線入庫：
+- manifest（資料集目錄下的 _manifest.json）記錄每檔已入庫的最後日期與尾段內容雜湊
+- 每次只抓 last_date 之後的 bar，並往前重疊 OVERLAP_BARS 根：
+  重疊段雜湊不同 → 供應商修正過（除權息回補、更正），整段重寫；相同 → 只追加新 bar
+- 資料寫入合併資料集（dataset.append → delta 檔），再以暫存檔＋os.replace 原子更新 manifest；
+  中途失敗只會讓下次多抓一段，重複的 (code, date) 由 compact 去重
+- 前復權：dataset.append 寫入時以 adj_close / close 算好 adj_open/high/low；manifest 記下尾段起日的還原因子，
+  重疊段因子變了（新的除權息／分割）→ 尾段之前的歷史前復權欄整段乘上新舊因子比，其餘不重算
+- 寫入後 bar_cache.bump(code)：行程內的 bar 快取隨即失效（其他行程由 manifest 變動得知）
+- vendor 可替換：預設 Yahoo；測試／離線用 local_vendor(dir) 讀本機檔，不連網
+- 沒有 manifest 紀錄的代碼先以既有資料（資料集或舊檔）建立起點，不重抓整段歷史
+- ingest(codes)：各檔結果先暫存，整批合併成一次 dataset.append（每個年份分割一個 delta，不是每檔一個）；
+  有上限的執行緒池並行抓取，共用 token bucket 限流，暫時性錯誤指數退避重試（throttle.py）；
+  vendor 提供 fetch_many 時，起點相同的代碼合併成一次多代碼下載
+- 每檔回傳結構化結果：status / rows / attempts / latency_ms / error_class
+- vendor 標記 resolves_symbols（Yahoo）時，代碼 → vendor 代碼的對照存於 symbols.SymbolCache：
+  已解析者直接以 2330.TW / 6488.TWO 抓取；查無資料記入負快取，期限內 status="skipped" 不再請求
+環境變數：INGEST_OVERLAP_BARS（預設 5；0 = 不重疊）、INGEST_WORKERS（8）、INGEST_RATE（每秒請求數，5）、
+         INGEST_BURST（10）、INGEST_RETRIES（3）、INGEST_BATCH（多代碼下載每批上限，50；0 = 關閉）、
+         INGEST_FLUSH_ROWS（ingest() 暫存超過此列數即寫出，500000；0 = 只在結束時寫出）
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_env_int
+from . import bar_cache, dataset, duckdb_io
+from .symbols import NoDataError, SymbolCache, cache_path
+from .throttle import RetryError, TokenBucket, call_with_retry
+
+OVERLAP_BARS = get_env_int("INGEST_OVERLAP_BARS", 5)
+WORKERS = get_env_int("INGEST_WORKERS", 8)
+RATE = get_env_int("INGEST_RATE", 5)
+BURST = get_env_int("INGEST_BURST", 10)
+RETRIES = get_env_int("INGEST_RETRIES", 3)
+BATCH = get_env_int("INGEST_BATCH", 50)
+FLUSH_ROWS = get_env_int("INGEST_FLUSH_ROWS", 500_000)
+# 無任何既有資料時的起始日
+DEFAULT_START = "2010-01-01"
+MANIFEST_NAME = "_manifest.json"
+
+# 雜湊／比對用的欄位（source 不列入）
+HASH_COLUMNS = ["open", "high", "low", "close", "adj_close", "volume"]
+# 還原因子相對變化超過此值視為新的公司行動（低於此值為來源端浮點誤差）
+FACTOR_TOLERANCE = 1e-6
+
+# vendor(code, start, end) → DataFrame(date, open, high, low, close, adj_close, volume, source)
+# start 含、end 不含（同 yfinance）。可另帶 fetch_many(codes, start, end) → {code: DataFrame}
+# 支援多代碼一次下載（回傳中缺少的代碼會再逐檔抓取）。resolves_symbols=True 的 vendor 接受
+# 已解析的 vendor 代碼、查無資料拋 NoDataError，並把命中的代碼放在 df.attrs["vendor_symbol"]
+Vendor = Callable[[str, str, str], pd.DataFrame]
+
+
+def yahoo_vendor(code: str, start: str, end: str) -> pd.DataFrame:
+    from .yahoo_ingest import fetch_daily_ohlcv  # yfinance 為選配依賴，用到才載入
+    return fetch_daily_ohlcv(code, start, end)
+
+
+def _yahoo_many(codes: List[str], start: str, end: str) -> Dict[str, pd.DataFrame]:
+    from .yahoo_ingest import fetch_daily_ohlcv_many
+    return fetch_daily_ohlcv_many(codes, start, end)
+
+
+yahoo_vendor.fetch_many = _yahoo_many
+yahoo_vendor.resolves_symbols = True
+
+
+def local_vendor(root) -> Vendor:
+    """本機來源：{root}/{code}.parquet 或 {code}.csv（測試 fixture、離線補資料）"""
+    base = Path(root)
+
+    def fetch(code: str, start: str, end: str) -> pd.DataFrame:
+        pq, csv = base / f"{code}.parquet", base / f"{code}.csv"
+        if pq.exists():
+            df = pd.read_parquet(pq)
+        elif csv.exists():
+            df = pd.read_csv(csv)
+        else:
+            raise NoDataError(f"[local_vendor] 找不到代碼 {code} 的行情資料")
+        day = pd.to_datetime(df["date"])
+        return df[(day >= pd.Timestamp(start)) & (day < pd.Timestamp(end))].reset_index(drop=True)
+
+    return fetch
+
+
+VENDORS: Dict[str, Vendor] = {"yahoo": yahoo_vendor}
+
+
+# ------------------------------------------------------------
+# manifest
+# ------------------------------------------------------------
+def manifest_path(root=None) -> Path:
+    return (Path(root) if root is not None else dataset.DATASET_DIR) / MANIFEST_NAME
+
+
+def load_manifest(root=None) -> Dict[str, Dict[str, Any]]:
+    path = manifest_path(root)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]], root=None) -> Path:
+    """寫入暫存檔後 os.replace：讀取端只會看到完整的舊版或新版"""
+    path = manifest_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def tail_hash(df: pd.DataFrame) -> str:
+    """bar 內容雜湊（日期＋數值欄位四捨五入到 1e-6，避免浮點表示差異）"""
+    h = hashlib.sha256()
+    days = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d").tolist()
+    cols = [pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64) if c in df.columns
+            else np.full(len(df), np.nan) for c in HASH_COLUMNS]
+    for i, d in enumerate(days):
+        h.update(d.encode())
+        for col in cols:
+            h.update(b"," + (b"nan" if np.isnan(col[i]) else f"{col[i]:.6f}".encode()))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def _factor(row) -> Optional[float]:
+    """單根 bar 的還原因子 adj_close / close"""
+    close = float(row["close"])
+    adj = float(row["adj_close"]) if "adj_close" in row and pd.notna(row["adj_close"]) else close
+    return adj / close if close > 0 else None
+
+
+def _entry(bars: pd.DataFrame, overlap: int, vendor: str) -> Dict[str, Any]:
+    """
+    以 bars 的最後 overlap 根為比對尾段。overlap=0：不重抓已入庫的 bar，
+    下次從 last_date 隔天抓起（無尾段可比對，也就偵測不到修正）
+    """
+    tail = bars.tail(overlap) if overlap > 0 else bars.iloc[:0]
+    last = pd.Timestamp(bars["date"].iloc[-1])
+    start = pd.Timestamp(tail["date"].iloc[0]) if len(tail) else last + timedelta(days=1)
+    return {
+        "last_date": str(last.date()),
+        "tail_start": str(start.date()),
+        "tail_hash": tail_hash(tail),
+        "tail_factor": _factor(tail.iloc[0]) if len(tail) else None,
+        "vendor": vendor,
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def _seed(code: str, overlap: int, vendor: str) -> Optional[Dict[str, Any]]:
+    """manifest 沒有紀錄：以儲存端最後 overlap 根建立起點；完全沒有資料回 None"""
+    try:
+        tail = duckdb_io.read_ohlcv(code, last_n=max(overlap, 1))
+    except FileNotFoundError:
+        return None
+    if tail.empty:
+        return None
+    return _entry(tail, overlap, vendor)
+
+
+def _seed_many(codes: List[str], overlap: int, vendor: str) -> Dict[str, Dict[str, Any]]:
+    """_seed 的批次版：一次查詢取得所有代碼的尾段（全市場首次入庫時避免逐檔查詢）"""
+    if not codes:
+        return {}
+    tails = duckdb_io.read_ohlcv_many(codes, last_n=max(overlap, 1), extra_columns=["adj_close"])
+    return {str(code): _entry(tail, overlap, vendor) for code, tail in tails.groupby("code", sort=False)}
+
+
+def _clean(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    if df is None or df.empty:
+        return pd.DataFrame(columns=["date", *HASH_COLUMNS])
+    out = df.copy()
+    out["date"] = pd.to_datetime(out["date"]).dt.normalize()
+    out = out.dropna(subset=["close"])
+    return out.drop_duplicates("date", keep="last").sort_values("date").reset_index(drop=True)
+
+
+# ------------------------------------------------------------
+# 入庫
+# ------------------------------------------------------------
+def _start(code: str, manifest: Dict[str, Dict[str, Any]], overlap: int, vendor_name: str, root) -> Tuple[Optional[Dict[str, Any]], str]:
+    """本次抓取的起點：manifest 尾段起日；無紀錄時由既有資料推得，再不然從 DEFAULT_START"""
+    # 起點只從預設儲存位置（duckdb_io 讀得到的資料）推得；指定 root 時視為獨立資料集
+    entry = manifest.get(code) or (_seed(code, overlap, vendor_name) if root is None else None)
+    return entry, (entry["tail_start"] if entry else DEFAULT_START)
+
+
+def _until(end) -> pd.Timestamp:
+    return pd.Timestamp(end or date.today().isoformat()).normalize()
+
+
+def _vendor_end(until: pd.Timestamp) -> str:
+    return str((until + timedelta(days=1)).date())
+
+
+def _history(code: str, before: pd.Timestamp, root) -> pd.DataFrame:
+    """已入庫、早於 before 的全部 bar（原始＋前復權欄）"""
+    end = str((before - timedelta(days=1)).date())
+    if root is None:
+        try:
+            return duckdb_io.read_ohlcv(code, end=end)
+        except FileNotFoundError:
+            return pd.DataFrame()
+    files = dataset.partition_files(root, end=end)
+    if not files:
+        return pd.DataFrame()
+    src = dataset.files_sql(files, where="code = ? AND date <= CAST(? AS DATE)")
+    return duckdb_io.get_cursor().execute(f"SELECT * EXCLUDE (code) FROM {src} ORDER BY date",
+                                          [[p.as_posix() for p in files], code, end]).df()
+
+
+def _rescale(code: str, entry: Dict[str, Any], fetched: pd.DataFrame, root) -> pd.DataFrame:
+    """
+    重疊段起日的還原因子與 manifest 記錄不同（新的除權息／分割）→ 回傳尾段之前、前復權欄已乘上新舊因子比的歷史；
+    因子未變（或舊 manifest 沒有記錄因子）回空表
+    """
+    old = entry.get("tail_factor")
+    same = fetched[fetched["date"] == pd.Timestamp(entry["tail_start"])]
+    new = _factor(same.iloc[0]) if len(same) else None
+    if not old or not new or abs(new / old - 1.0) <= FACTOR_TOLERANCE:
+        return pd.DataFrame()
+    hist = _history(code, fetched["date"].iloc[0], root)
+    if hist.empty:
+        return hist
+    ratio = new / old
+    hist = hist.copy()
+    for col in dataset.ADJUSTED.values():
+        if col in hist.columns:
+            hist[col] = pd.to_numeric(hist[col], errors="coerce") * ratio
+    return hist
+
+
+def _store(code: str, entry: Optional[Dict[str, Any]], raw: Optional[pd.DataFrame], manifest: Dict[str, Dict[str, Any]],
+           *, until: pd.Timestamp, overlap: int, vendor_name: str, root,
+           sink: Optional[Callable[[str, pd.DataFrame, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    比對抓回的資料與 manifest，寫入新 bar／修正段並更新 manifest[code]。
+    有 sink 時改交給 sink(code, 待寫列, 新 manifest 紀錄)，由呼叫端合併寫入後再更新 manifest
+    """
+    fetched = _clean(raw)
+    fetched = fetched[fetched["date"] <= until].reset_index(drop=True)
+    if fetched.empty:
+        return {"code": code, "status": "unchanged", "rows": 0, "last_date": entry and entry["last_date"]}
+
+    if entry is None:
+        status, rows = "new", fetched
+    else:
+        last = pd.Timestamp(entry["last_date"])
+        known = fetched[fetched["date"] <= last]
+        fresh = fetched[fetched["date"] > last]
+        if len(known) and tail_hash(known) != entry["tail_hash"]:
+            status, rows = "revised", fetched
+        elif len(fresh):
+            status, rows = "appended", fresh
+        else:
+            manifest[code] = entry
+            return {"code": code, "status": "unchanged", "rows": 0, "last_date": entry["last_date"]}
+
+    hist = _rescale(code, entry, fetched, root) if status == "revised" else pd.DataFrame()
+    # 新抓的 bar 只帶 adj_close：前復權 OHLC 由 dataset.append 依因子補上
+    write = rows if hist.empty else pd.concat([hist, rows], ignore_index=True)
+    after = _entry(fetched, overlap, vendor_name)
+    if sink is not None:
+        sink(code, write.assign(code=code), after)
+    else:
+        dataset.append(write.assign(code=code), root=root)
+        if root is None:
+            bar_cache.bump([code])
+        manifest[code] = after
+    res = {"code": code, "status": status, "rows": int(len(rows)), "last_date": after["last_date"]}
+    if not hist.empty:
+        res["rescaled"] = int(len(hist))
+    return res
+
+
+def ingest_symbol(
+    code: str,
+    manifest: Dict[str, Dict[str, Any]],
+    *,
+    vendor: Vendor,
+    vendor_name: str = "yahoo",
+    end=None,
+    overlap: Optional[int] = None,
+    root=None,
+) -> Dict[str, Any]:
+    """
+    單檔增量入庫（不重試、不限流）；成功時就地更新 manifest[code]（由呼叫端負責 save_manifest）。
+    回傳 {"code", "status": new|appended|revised|unchanged, "rows": 寫入列數, "last_date"}
+    """
+    code = str(code)
+    overlap = OVERLAP_BARS if overlap is None else int(overlap)
+    until = _until(end)
+    entry, start = _start(code, manifest, overlap, vendor_name, root)
+    raw = vendor(code, start, _vendor_end(until))
+    return _store(code, entry, raw, manifest, until=until, overlap=overlap, vendor_name=vendor_name, root=root)
+
+
+def _failed(code: str, error: BaseException, attempts: int) -> Dict[str, Any]:
+    return {
+        "code": code, "status": "error", "rows": 0, "last_date": None, "attempts": attempts,
+        "error_class": type(error).__name__, "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def ingest(
+    codes: Iterable[str],
+    *,
+    vendor: Optional[Vendor] = None,
+    vendor_name: str = "yahoo",
+    end=None,
+    overlap: Optional[int] = None,
+    root=None,
+    workers: Optional[int] = None,
+    rate: Optional[float] = None,
+    burst: Optional[int] = None,
+    retries: Optional[int] = None,
+    batch: Optional[int] = None,
+    limiter: Optional[TokenBucket] = None,
+    symbols: Optional[SymbolCache] = None,
+    flush_rows: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    多檔增量入庫，回傳順序與 codes 相同。
+    - workers 條執行緒並行；每次對 vendor 的請求先向共用的 token bucket（rate/秒、burst）取 token
+    - 暫時性錯誤最多重試 retries 次（指數退避＋jitter）；單檔失敗記為 status="error" 不中斷
+    - vendor 有 fetch_many 且 batch > 0：起點相同的代碼每 batch 檔一次下載，缺漏者再逐檔抓
+    - 每筆結果含 attempts（請求次數）、latency_ms（含排隊與重試）、error_class
+    - vendor 有 resolves_symbols 時查詢／更新 symbols（預設為資料集目錄下的對照檔）；負快取中的代碼回 status="skipped"
+    - 各檔抓回的列先暫存，累積超過 flush_rows 列或結束時合併成一次 dataset.append（每個年份分割一個 delta），
+      寫入成功後才更新該批代碼的 manifest
+    結束（含例外中止）時寫出暫存列，再原子寫回 manifest 與代碼對照。
+    """
+    fetch = vendor or VENDORS[vendor_name]
+    codes = [str(c) for c in dict.fromkeys(str(c) for c in codes)]
+    overlap = OVERLAP_BARS if overlap is None else int(overlap)
+    until = _until(end)
+    bucket = limiter or TokenBucket(rate or RATE, burst or BURST)
+    tries = RETRIES if retries is None else int(retries)
+    size = BATCH if batch is None else int(batch)
+    fetch_many = getattr(fetch, "fetch_many", None) if size > 0 else None
+    manifest = load_manifest(root)
+    if root is None:
+        # 無紀錄者先一次補齊起點，之後各執行緒只讀 manifest（不再逐檔查詢儲存端）
+        manifest.update(_seed_many([c for c in codes if c not in manifest], overlap, vendor_name))
+    known = {c: manifest.get(c) for c in codes}
+    cache = (symbols or SymbolCache(cache_path(root))) if getattr(fetch, "resolves_symbols", False) else None
+    results: Dict[str, Dict[str, Any]] = {}
+    for c in codes:
+        if cache is not None and cache.is_missing(c):
+            results[c] = {"code": c, "status": "skipped", "rows": 0, "last_date": known[c] and known[c]["last_date"],
+                          "attempts": 0, "error_class": None, "latency_ms": 0.0}
+    pending = [c for c in codes if c not in results]
+
+    def target(code: str) -> str:
+        return (cache.symbol(code) if cache is not None else None) or code
+
+    def learn(code: str, raw) -> None:
+        sym = getattr(raw, "attrs", {}).get("vendor_symbol")
+        if cache is not None and sym:
+            cache.resolve(code, sym)
+
+    def missed(code: str, error: BaseException) -> None:
+        if cache is not None and isinstance(error, NoDataError):
+            cache.mark_missing(code)
+
+    def plan_of(code: str):
+        entry = known[code]
+        return entry, (entry["tail_start"] if entry else DEFAULT_START)
+    staged: List[pd.DataFrame] = []
+    entries: Dict[str, Dict[str, Any]] = {}
+    lock = threading.Lock()
+    limit = FLUSH_ROWS if flush_rows is None else int(flush_rows)
+
+    def flush() -> None:
+        """暫存列合併寫入（呼叫端持有 lock）；寫入成功才更新 manifest"""
+        if not staged:
+            return
+        dataset.append(pd.concat(staged, ignore_index=True), root=root)
+        if root is None:
+            bar_cache.bump(list(entries))
+        manifest.update(entries)
+        staged.clear()
+        entries.clear()
+
+    def sink(code: str, rows: pd.DataFrame, entry: Dict[str, Any]) -> None:
+        with lock:
+            staged.append(rows)
+            entries[code] = entry
+            if limit > 0 and sum(len(f) for f in staged) >= limit:
+                flush()
+    store = dict(until=until, overlap=overlap, vendor_name=vendor_name, root=root, sink=sink)
+
+    def one(code: str, plan=None, t0=None, spent: int = 0) -> None:
+        t0 = t0 or time.perf_counter()
+        attempts = spent
+        entry, start = plan or plan_of(code)
+        try:
+            raw, attempts = call_with_retry(lambda: fetch(target(code), start, _vendor_end(until)),
+                                            retries=tries, limiter=bucket)
+            attempts += spent
+            learn(code, raw)
+            res = _store(code, entry, raw, manifest, **store)
+            res.update(attempts=attempts, error_class=None)
+        except RetryError as e:
+            if entry is not None and isinstance(e.error, NoDataError):
+                # 已入庫的代碼在增量區間內沒有 bar（週末、休市、收盤前）：視為 unchanged，不記查無資料
+                res = _store(code, entry, None, manifest, **store)
+                res.update(attempts=spent + e.attempts, error_class=None)
+            else:
+                missed(code, e.error)
+                res = _failed(code, e.error, spent + e.attempts)
+        except Exception as e:
+            res = _failed(code, e, attempts)
+        res["latency_ms"] = round((time.perf_counter() - t0) * 1e3, 3)
+        results[code] = res
+
+    def many(group: List[str], plans: Dict[str, Any], start: str) -> None:
+        t0 = time.perf_counter()
+        syms = {c: target(c) for c in group}
+        try:
+            got, attempts = call_with_retry(lambda: fetch_many(list(syms.values()), start, _vendor_end(until)),
+                                            retries=tries, limiter=bucket)
+        except RetryError as e:
+            got, attempts = {}, e.attempts
+        for code in group:
+            raw = got.get(syms[code])
+            if raw is None or len(raw) == 0:
+                one(code, plans[code], t0, attempts)  # 批次中缺漏（例如上櫃 .TWO）→ 逐檔
+                continue
+            try:
+                learn(code, raw)
+                res = _store(code, plans[code][0], raw, manifest, **store)
+                res.update(attempts=attempts, error_class=None)
+            except Exception as e:
+                res = _failed(code, e, attempts)
+            res["latency_ms"] = round((time.perf_counter() - t0) * 1e3, 3)
+            results[code] = res
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(int(workers or WORKERS), 1)) as pool:
+            if fetch_many is None:
+                jobs = [pool.submit(one, c) for c in pending]
+            else:
+                plans = {c: plan_of(c) for c in pending}
+                by_start: Dict[str, List[str]] = {}
+                for c in pending:
+                    by_start.setdefault(plans[c][1], []).append(c)
+                jobs = [pool.submit(many, group[i:i + size], plans, start)
+                        for start, group in by_start.items() for i in range(0, len(group), size)]
+            for job in jobs:
+                job.result()
+    finally:
+        with lock:
+            flush()
+        save_manifest(manifest, root)
+        if cache is not None:
+            cache.save()
+    return [results[c] for c in codes]
+
+
+def summarize(results: List[Dict[str, Any]], elapsed_s: Optional[float] = None) -> Dict[str, Any]:
+    """status 計數、錯誤類別計數、延遲分位數（與選填的整體吞吐量）"""
+    status: Dict[str, int] = {}
+    errors: Dict[str, int] = {}
+    for r in results:
+        status[r["status"]] = status.get(r["status"], 0) + 1
+        if r.get("error_class"):
+            errors[r["error_class"]] = errors.get(r["error_class"], 0) + 1
+    lat = np.asarray([r.get("latency_ms", 0.0) for r in results], dtype=float)
+    out: Dict[str, Any] = {
+        "symbols": len(results),
+        "status": status,
+        "errors": errors,
+        "rows": int(sum(r["rows"] for r in results)),
+        "attempts": int(sum(r.get("attempts", 0) for r in results)),
+        "latency_ms_p50": float(np.percentile(lat, 50)) if lat.size else 0.0,
+        "latency_ms_p95": float(np.percentile(lat, 95)) if lat.size else 0.0,
+    }
+    if elapsed_s:
+        out["elapsed_s"] = round(elapsed_s, 3)
+        out["symbols_per_s"] = round(len(results) / elapsed_s, 2)
+    return out
+
+
+__all__ = [
+    "ingest", "ingest_symbol", "summarize", "load_manifest", "save_manifest", "tail_hash",
+    "local_vendor", "yahoo_vendor", "VENDORS",
+]
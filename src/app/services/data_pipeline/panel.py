@@ -0,0 +1,86 @@
+# src/app/services/data_pipeline/panel.py
+"""
+多檔 OHLCV 的對齊 panel：
+- 每個欄位一個 (dates × codes) 的 float64 陣列；缺 bar（停牌、尚未上市、無檔案）以 NaN 表示
+- 本身即為 Mapping（panel["close"]），可直接交給 registry.calc_panel / CompiledStrategy.evaluate_panel
+- long_to_panel：長表（code, date, open, ...）→ panel，不經 pandas pivot；日期軸以交易日曆對齊（trading_calendar.align）
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .trading_calendar import get_calendar
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+
+@dataclass(eq=False)
+class OhlcvPanel(Mapping):
+    dates: pd.DatetimeIndex
+    codes: List[str]
+    arrays: Dict[str, np.ndarray]
+    missing: List[str] = field(default_factory=list)  # 查無資料的代碼（整欄 NaN）
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+    def __iter__(self):
+        return iter(self.arrays)
+
+    def __len__(self) -> int:
+        return len(self.arrays)
+
+    @property
+    def shape(self):
+        return (len(self.dates), len(self.codes))
+
+    def frame(self, code: str) -> pd.DataFrame:
+        """取單檔（date 為 index）；去除上市前 / 無資料的前段"""
+        j = self.codes.index(code)
+        df = pd.DataFrame({k: v[:, j] for k, v in self.arrays.items()}, index=self.dates)
+        df.index.name = "date"
+        valid = df["close"].notna().to_numpy()
+        if not valid.any():
+            return df.iloc[0:0]
+        return df.iloc[int(valid.argmax()):]
+
+
+def long_to_panel(
+    df,
+    codes: Sequence[str],
+    *,
+    dates: Optional[Iterable] = None,
+    fields: Sequence[str] = FIELDS,
+) -> OhlcvPanel:
+    """
+    長表 → panel：
+    - df：DataFrame 或 {欄: ndarray}（duckdb_io 的 output="numpy"），需含 code, date 與 fields
+    - codes 決定欄順序（無資料者整欄 NaN，列入 missing）
+    - dates 為對齊用的交易日序列；省略時取長表中所有日期的聯集（以交易日曆索引標記，不必排序去重）
+    """
+    codes = [str(c) for c in codes]
+    code = np.asarray(df["code"]).astype(str)
+    day = np.asarray(df["date"]).astype("datetime64[ns]")
+    if dates is None:
+        days, i = get_calendar().align(day)
+        axis = pd.DatetimeIndex(days.astype("datetime64[D]").astype("datetime64[ns]"))
+    else:
+        axis = pd.DatetimeIndex(pd.to_datetime(list(dates))).sort_values().unique()
+        i = axis.get_indexer(day)
+
+    rows, cols = len(axis), len(codes)
+    arrays = {f: np.full((rows, cols), np.nan) for f in fields}
+    if len(code):
+        j = pd.Index(codes).get_indexer(code)
+        keep = (i >= 0) & (j >= 0)
+        i, j = i[keep], j[keep]
+        for f in fields:
+            if f in df:
+                arrays[f][i, j] = np.asarray(df[f], dtype=np.float64)[keep]
+    present = set(np.unique(code).tolist())
+    return OhlcvPanel(dates=axis, codes=codes, arrays=arrays, missing=[c for c in codes if c not in present])
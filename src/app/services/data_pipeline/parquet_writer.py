@@ -0,0 +1,92 @@
+# src/app/services/data_pipeline/parquet_writer.py
+"""
+OHLCV parquet 寫入（資料集主檔 / delta 共用）：
+- 保證依 sort_by（預設 code, date）排序；輸入已排序時只做一次單調檢查、不重排
+- 固定列數切 row group，每欄寫 min/max 統計量（讀取端據以剪枝）
+- code / source 用 dictionary encoding；浮點欄 BYTE_STREAM_SPLIT + zstd，其餘 snappy
+- 排序鍵寫進 footer：key-value metadata（SORTED_KEY）與 row group 的 sorting_columns；
+  sorted_by(path) 只讀 footer 取回，duckdb_io 據以省略 ORDER BY
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SORTED_KEY = b"stockpicker.sorted_by"
+DEFAULT_ROW_GROUP_SIZE = 16384
+FLOAT_COMPRESSION = "zstd"
+COMPRESSION = "snappy"
+DICTIONARY_COLUMNS = ("code", "source")
+
+_FOOTERS: Dict[tuple, Tuple[str, ...]] = {}
+
+
+def _table(data: Union[pd.DataFrame, pa.Table]) -> pa.Table:
+    if isinstance(data, pa.Table):
+        return data
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+def is_sorted(table: pa.Table, keys: Sequence[str]) -> bool:
+    """是否已依 keys 遞增排序（向量化單調檢查）"""
+    if table.num_rows < 2 or not keys:
+        return True
+    cols = [table.column(k).to_pandas() for k in keys]
+    index = pd.Index(cols[0]) if len(cols) == 1 else pd.MultiIndex.from_arrays(cols)
+    return bool(index.is_monotonic_increasing)
+
+
+def write_ohlcv(data: Union[pd.DataFrame, pa.Table], path, *, sort_by: Sequence[str] = ("code", "date"),
+                row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> Path:
+    """
+    寫入單一 parquet 檔（先寫暫存檔再 os.replace，讀取端不會看到寫一半的檔案）。
+    sort_by 只取資料中存在的欄位；回傳寫入路徑
+    """
+    path = Path(path)
+    table = _table(data)
+    keys = [k for k in sort_by if k in table.column_names]
+    if not is_sorted(table, keys):
+        table = table.sort_by([(k, "ascending") for k in keys])
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SORTED_KEY: ",".join(keys).encode()})
+
+    floats = [f.name for f in table.schema if pa.types.is_floating(f.type)]
+    names = table.column_names
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    pq.write_table(
+        table, tmp,
+        row_group_size=max(int(row_group_size), 1),
+        compression={c: FLOAT_COMPRESSION if c in floats else COMPRESSION for c in names},
+        use_dictionary=[c for c in DICTIONARY_COLUMNS if c in names],
+        use_byte_stream_split=floats or False,
+        write_statistics=True,
+        sorting_columns=[pq.SortingColumn(names.index(k)) for k in keys] or None,
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def sorted_by(path) -> Tuple[str, ...]:
+    """footer 宣告的排序鍵（只讀 footer，依路徑＋mtime＋大小快取）；沒有宣告回 ()"""
+    st = os.stat(path)
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    keys = _FOOTERS.get(key)
+    if keys is None:
+        meta = pq.read_schema(path).metadata or {}
+        raw = meta.get(SORTED_KEY, b"").decode()
+        keys = _FOOTERS[key] = tuple(k for k in raw.split(",") if k)
+    return keys
+
+
+def declares_sorted(files: Iterable, keys: Sequence[str]) -> bool:
+    """每個檔案的排序鍵都以 keys 開頭"""
+    want = tuple(keys)
+    return all(sorted_by(f)[:len(want)] == want for f in files)
+
+
+__all__ = ["write_ohlcv", "sorted_by", "declares_sorted", "is_sorted", "SORTED_KEY", "DEFAULT_ROW_GROUP_SIZE"]
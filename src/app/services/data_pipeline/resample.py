@@ -0,0 +1,187 @@
+# src/app/services/data_pipeline/resample.py
+"""
+日線 → 週線（1w）/ 月線（1m）：
+- 依交易日曆的日序分組（週一起算的週、曆月），以 ufunc.reduceat 一次彙總：
+  open 取第一根、high 取最大、low 取最小、close 取最後一根、volume 加總；日期標在該期最後一根日線
+- get_resampled：每檔、每個 timeframe 的彙總結果放在行程內快取（app.cache.ByteLRUCache），
+  以 bar_cache.data_version 判斷是否有新日線；有新資料時只重讀「最後一期」起的日線接上（增量）。
+  接縫前的檢查窗（ingest 重疊的 INGEST_OVERLAP_BARS 根＋接縫那根）一併重讀並比對雜湊，
+  窗內任一根被改寫（盤後修正、除權息重算）就整段重建
+環境變數：RESAMPLE_CACHE_MAX_BYTES（預設 128MB）
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.cache import ByteLRUCache
+from app.config import get_env_int
+from . import bar_cache, duckdb_io
+from .ingest import OVERLAP_BARS
+from .trading_calendar import day_numbers
+
+TIMEFRAMES = ("1d", "1w", "1m")
+FIRST = ("open", "adj_open")
+LAST = ("close", "adj_close")
+HIGH = ("high", "adj_high")
+LOW = ("low", "adj_low")
+SUM = ("volume",)
+
+_CACHE = ByteLRUCache(get_env_int("RESAMPLE_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+_LOCK = threading.Lock()
+_STATE: Dict[str, int] = {"builds": 0, "appends": 0}
+
+
+def normalize_timeframe(timeframe: Optional[str]) -> str:
+    """"1D" / "1W" / "1M" 等大小寫寫法 → 1d / 1w / 1m"""
+    tf = (timeframe or "1d").lower()
+    if tf not in TIMEFRAMES:
+        raise ValueError(f"timeframe must be one of {TIMEFRAMES}, got {timeframe!r}")
+    return tf
+
+
+def period_keys(dates, timeframe: str) -> np.ndarray:
+    """每根日線所屬的期別（週：週一起算的週序；月：1970-01 起算的月序）"""
+    day = day_numbers(dates)
+    tf = normalize_timeframe(timeframe)
+    if tf == "1w":
+        return (day + 3) // 7  # 1970-01-01 為週四，+3 使每週從週一開始
+    if tf == "1m":
+        return day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return day
+
+
+def resample(bars: Dict[str, np.ndarray], timeframe: str) -> Dict[str, np.ndarray]:
+    """
+    {"date", open..volume[, adj_*]}（日期遞增，如 read_ohlcv(output="numpy")）→ 同格式的週 / 月線；
+    1d 原樣回傳。不認得的欄位不輸出
+    """
+    tf = normalize_timeframe(timeframe)
+    if tf == "1d":
+        return bars
+    date = np.asarray(bars["date"])
+    if not len(date):
+        return {k: np.asarray(v)[:0] for k, v in bars.items() if k == "date" or k in FIRST + LAST + HIGH + LOW + SUM}
+    key = period_keys(date, tf)
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], len(key)] - 1
+    out: Dict[str, np.ndarray] = {"date": date[ends]}
+    for col, v in bars.items():
+        if col == "date":
+            continue
+        v = np.asarray(v, dtype=np.float64)
+        if col in FIRST:
+            out[col] = v[starts]
+        elif col in LAST:
+            out[col] = v[ends]
+        elif col in HIGH:
+            out[col] = np.fmax.reduceat(v, starts)
+        elif col in LOW:
+            out[col] = np.fmin.reduceat(v, starts)
+        elif col in SUM:
+            out[col] = np.add.reduceat(np.nan_to_num(v), starts)
+    return out
+
+
+def _read(code: str, start: Optional[str], price_adjustment: str) -> Dict[str, np.ndarray]:
+    return duckdb_io.read_ohlcv(code, start=start, output="numpy", price_adjustment=price_adjustment)
+
+
+def _build(code: str, tf: str, price_adjustment: str, version: str) -> Dict[str, Any]:
+    daily = _read(code, None, price_adjustment)
+    return _entry(version, tf, daily, resample(daily, tf))
+
+
+def _digest(daily: Dict[str, np.ndarray], lo: int, hi: int) -> str:
+    """日線第 lo..hi-1 列（全部欄位）的雜湊"""
+    h = hashlib.sha1()
+    for k in sorted(daily):
+        v = np.asarray(daily[k])[lo:hi]
+        v = day_numbers(v) if k == "date" else v.astype(np.float64)
+        h.update(k.encode())
+        h.update(np.ascontiguousarray(v).tobytes())
+    return h.hexdigest()
+
+
+def _entry(version: str, tf: str, daily: Dict[str, np.ndarray], bars: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    快取項目：bars 為彙總結果；anchor 為最後一期之前的那根日線（接縫）與其前 OVERLAP_BARS 根組成的檢查窗：
+    (窗起日, 接縫日, 窗內雜湊)，增量更新時據以確認歷史未被改寫
+    """
+    date = np.asarray(daily["date"])
+    anchor = None
+    if len(date):
+        key = period_keys(date, tf)
+        first = int(np.searchsorted(key, key[-1]))  # 最後一期的第一根日線
+        if first > 0:
+            lo = max(first - 1 - max(int(OVERLAP_BARS), 0), 0)
+            day = lambda i: str(date[i].astype("datetime64[D]"))
+            anchor = (day(lo), day(first - 1), _digest(daily, lo, first))
+    for v in bars.values():
+        v.flags.writeable = False
+    return {"version": version, "bars": bars, "anchor": anchor}
+
+
+def _append(code: str, tf: str, price_adjustment: str, version: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """只重讀檢查窗起的日線；窗內雜湊對不上（歷史被改寫）或沒有新資料時回 None（改為整段重建）"""
+    anchor = entry["anchor"]
+    if anchor is None:
+        return None
+    start, seam, digest = anchor
+    tail = _read(code, start, price_adjustment)
+    date = np.asarray(tail["date"])
+    k = int(np.searchsorted(day_numbers(date), day_numbers([seam])[0], side="right")) if len(date) else 0
+    if k == 0 or k >= len(date) or str(date[k - 1].astype("datetime64[D]")) != seam \
+            or str(date[0].astype("datetime64[D]")) != start or _digest(tail, 0, k) != digest:
+        return None
+    fresh = resample({c: np.asarray(v)[k:] for c, v in tail.items()}, tf)
+    old = entry["bars"]
+    n = len(old["date"]) - 1  # 最後一期以新讀到的日線重算
+    bars = {c: np.concatenate([old[c][:n], fresh[c]]) for c in old if c in fresh}
+    return _entry(version, tf, tail, bars)
+
+
+def get_resampled(code: str, timeframe: str = "1w", last_n: Optional[int] = None, *,
+                  price_adjustment: str = "raw") -> Dict[str, np.ndarray]:
+    """
+    單檔週 / 月線（{"date", open..volume}，陣列唯讀）；1d 直接走 bar_cache.get_bars。
+    快取失效（有新日線）時增量接上最後一期，不重讀整段歷史。查無代碼拋 FileNotFoundError
+    """
+    code = str(code)
+    tf = normalize_timeframe(timeframe)
+    if tf == "1d":
+        return bar_cache.get_bars(code, last_n, price_adjustment=price_adjustment)
+    version = bar_cache.data_version(code)
+    key = (code, tf, price_adjustment)
+    found, entry = _CACHE.get(key)
+    if not found or entry["version"] != version:
+        fresh = _append(code, tf, price_adjustment, version, entry) if found else None
+        with _LOCK:
+            _STATE["appends" if fresh is not None else "builds"] += 1
+        entry = fresh if fresh is not None else _build(code, tf, price_adjustment, version)
+        _CACHE.put(key, entry)
+    bars = entry["bars"]
+    if last_n and int(last_n) < len(bars["date"]):
+        return {k: v[-int(last_n):] for k, v in bars.items()}
+    return bars
+
+
+def stats() -> Dict[str, Any]:
+    """LRU 計數 ＋ 整段重建（builds）與增量接上（appends）次數"""
+    out = _CACHE.stats()
+    with _LOCK:
+        out.update(_STATE)
+    return out
+
+
+def clear(*, reset_stats: bool = False) -> None:
+    _CACHE.clear(reset_stats=reset_stats)
+    if reset_stats:
+        with _LOCK:
+            _STATE["builds"] = _STATE["appends"] = 0
+
+
+__all__ = ["TIMEFRAMES", "normalize_timeframe", "period_keys", "resample", "get_resampled", "stats", "clear"]
@@ -0,0 +1,140 @@
+# src/app/services/data_pipeline/symbols.py
+"""
+代碼 → 行情來源代碼（2330 → 2330.TW / 6488 → 6488.TWO）的持久化對照：
+- 純數字代碼預設要依序試 .TW、.TWO；上櫃股每次都會先白打一次 .TW
+- 入庫成功時記下實際命中的 vendor 代碼與市場（TWSE / TPEx），之後直接用
+- 查無資料（下市、代碼錯誤）累計 misses；從未解析成功、且連續 MISS_THRESHOLD 次查無資料才記為負快取，
+  NEGATIVE_TTL_DAYS 天內不再向來源查詢。已解析（status="ok"）的代碼不因查無資料降級（可能只是來源暫時異常）
+- 存放於資料集目錄下的 _vendor_symbols.json（暫存檔＋os.replace 原子寫入）；resolve.py 亦會讀取
+環境變數：SYMBOL_NEGATIVE_TTL_DAYS（預設 7）、SYMBOL_MISS_THRESHOLD（預設 3）
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import get_env_int
+
+CACHE_NAME = "_vendor_symbols.json"
+NEGATIVE_TTL_DAYS = get_env_int("SYMBOL_NEGATIVE_TTL_DAYS", 7)
+MISS_THRESHOLD = get_env_int("SYMBOL_MISS_THRESHOLD", 3)
+
+# vendor 代碼尾碼 → 市場
+MARKETS = {".TW": "TWSE", ".TWO": "TPEx"}
+
+
+class NoDataError(ValueError):
+    """行情來源查無此代碼的資料（不重試；入庫時記入負快取）"""
+
+
+def as_vendor_candidates(code_or_symbol: str) -> List[str]:
+    """
+    將輸入轉成可能的 Yahoo Finance 代碼列表。
+    - 若已含 .TW/.TWO，直接回傳 [原字串]
+    - 若是純數字，例如 '2330'，回傳 ['2330.TW', '2330.TWO']（先試上市，再試上櫃）
+    - 其他情況一律視為單一候選
+    """
+    s = code_or_symbol.strip()
+    if "." in s:
+        return [s]
+    if s.isdigit():
+        return [f"{s}.TW", f"{s}.TWO"]
+    return [s]
+
+
+def market_of(symbol: str) -> Optional[str]:
+    s = symbol.upper()
+    for suffix, market in MARKETS.items():
+        if s.endswith(suffix):
+            return market
+    return None
+
+
+def cache_path(root=None) -> Path:
+    from . import dataset
+    return (Path(root) if root is not None else dataset.DATASET_DIR) / CACHE_NAME
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SymbolCache:
+    """執行緒安全；修改後需呼叫 save() 才會寫回檔案"""
+
+    def __init__(self, path=None) -> None:
+        self.path = Path(path) if path is not None else cache_path()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(str(code))
+
+    def symbol(self, code: str) -> Optional[str]:
+        """已解析的 vendor 代碼；未解析或為負快取回 None"""
+        e = self.get(code)
+        return e["symbol"] if e and e.get("status") == "ok" else None
+
+    def candidates(self, code: str) -> List[str]:
+        sym = self.symbol(code)
+        return [sym] if sym else as_vendor_candidates(str(code))
+
+    def is_missing(self, code: str, *, now: Optional[datetime] = None, ttl_days: Optional[int] = None) -> bool:
+        """負快取且尚未過期"""
+        e = self.get(code)
+        if not e or e.get("status") != "missing":
+            return False
+        ttl = NEGATIVE_TTL_DAYS if ttl_days is None else int(ttl_days)
+        checked = datetime.fromisoformat(e["checked_at"])
+        return (now or _now()) - checked < timedelta(days=ttl)
+
+    def resolve(self, code: str, symbol: str) -> None:
+        entry = {"symbol": symbol, "market": market_of(symbol), "status": "ok",
+                 "checked_at": _now().isoformat(timespec="seconds")}
+        with self._lock:
+            old = self.entries.get(str(code))
+            if old and old.get("status") == "ok" and old.get("symbol") == symbol and not old.get("misses"):
+                return
+            self.entries[str(code)] = entry
+            self._dirty = True
+
+    def mark_missing(self, code: str) -> bool:
+        """
+        記一次查無資料（resolve 成功即歸零）；回傳是否因此進入負快取。
+        已解析的代碼只累計 misses、保留 status="ok"；未解析者連續 MISS_THRESHOLD 次才記為 missing
+        """
+        with self._lock:
+            old = self.entries.get(str(code)) or {}
+            misses = int(old.get("misses", 0)) + 1
+            ok = old.get("status") == "ok"
+            status = old["status"] if ok else ("missing" if misses >= max(int(MISS_THRESHOLD), 1) else "unresolved")
+            self.entries[str(code)] = {
+                "symbol": old.get("symbol"), "market": old.get("market"), "status": status,
+                "misses": misses, "checked_at": _now().isoformat(timespec="seconds"),
+            }
+            self._dirty = True
+            return status == "missing"
+
+    def save(self) -> bool:
+        """有異動才寫檔；回傳是否寫入"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+            return True
+
+
+__all__ = ["SymbolCache", "NoDataError", "as_vendor_candidates", "market_of", "cache_path"]
@@ -0,0 +1,96 @@
+# src/app/services/data_pipeline/throttle.py
+"""
+對外部行情來源的節流與重試：
+- TokenBucket：rate 次/秒、最多累積 burst 個 token；多執行緒共用一個，acquire() 不足時睡到補滿
+- backoff_delay：指數退避＋full jitter（uniform(0, min(cap, base·2^attempt))），避免同時重試撞在一起
+- call_with_retry：只重試暫時性錯誤（連線、逾時、限流）；查無資料等永久錯誤立即回報
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1, *, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+        self._clock, self._sleep = clock, sleep
+        self._tokens = float(self.burst)
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, n: int = 1) -> float:
+        """取得 n 個 token（必要時等待）；回傳等待秒數"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return waited
+                delay = (n - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class RetryError(Exception):
+    """重試用盡（或遇永久錯誤）；attempts 為實際呼叫次數，__cause__ 為最後一次的錯誤"""
+
+    def __init__(self, error: BaseException, attempts: int) -> None:
+        super().__init__(f"{type(error).__name__}: {error}")
+        self.error = error
+        self.attempts = attempts
+
+
+def is_transient(error: BaseException) -> bool:
+    """連線、逾時、限流類錯誤可重試；找不到檔案、權限、資料格式等不重試"""
+    if isinstance(error, (FileNotFoundError, PermissionError, IsADirectoryError)):
+        return False
+    if isinstance(error, (ConnectionError, TimeoutError, OSError)):
+        return True
+    name = type(error).__name__
+    return any(k in name for k in ("RateLimit", "Timeout", "Connection", "HTTP"))
+
+
+def backoff_delay(attempt: int, *, base: float = 0.5, cap: float = 30.0,
+                  rng: Optional[random.Random] = None) -> float:
+    """第 attempt 次重試前的等待秒數（attempt 從 0 起算）"""
+    return (rng or random).uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_retry(
+    fn: Callable[[], Any],
+    *,
+    retries: int = 3,
+    limiter: Optional[TokenBucket] = None,
+    base: float = 0.5,
+    cap: float = 30.0,
+    retryable: Callable[[BaseException], bool] = is_transient,
+    sleep: Callable[[float], None] = time.sleep,
+    rng: Optional[random.Random] = None,
+) -> Tuple[Any, int]:
+    """
+    呼叫 fn，暫時性錯誤最多重試 retries 次；每次呼叫前先向 limiter 取 token。
+    回傳 (結果, 呼叫次數)；失敗時拋 RetryError。
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn(), attempt
+        except Exception as e:
+            if attempt > retries or not retryable(e):
+                raise RetryError(e, attempt) from e
+            sleep(backoff_delay(attempt - 1, base=base, cap=cap, rng=rng))
@@ -0,0 +1,196 @@
+# src/app/services/data_pipeline/trading_calendar.py
+"""
+TWSE 交易日曆（預先計算，供排程、lookback 回推與多檔對齊共用）：
+- 交易日 = 平日（週一～五）扣除休市日，存成排序的 int32 日序（1970-01-01 起算的天數）
+- 休市日讀自 resources/calendar/twse_holidays.csv（date,name,kind；# 開頭為註解；
+  各 kind 皆為不交易日：國定假日 / 補假、春節前僅交割日、颱風停市、補行上班的週六），
+  可用環境變數 TRADING_HOLIDAYS_FILE 改指其他檔案；檔案未列出的日期只扣週末
+- 查詢皆為 np.searchsorted 二分搜尋：prev/next 交易日、往前 / 往後 N 個交易日、日期 → 列索引（向量化）
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+HOLIDAYS_FILE = Path(__file__).resolve().parents[2] / "resources" / "calendar" / "twse_holidays.csv"
+FIRST_DAY = "1990-01-01"
+LAST_DAY = "2040-12-31"
+
+_LOCK = threading.Lock()
+_LOADED: Dict[str, "TradingCalendar"] = {}
+
+
+def _day(d) -> int:
+    """單一日期（str / date / datetime / Timestamp / datetime64）→ 日序"""
+    if isinstance(d, (int, np.integer)):
+        return int(d)
+    return int(np.datetime64(pd.Timestamp(d).date(), "D").astype(np.int64))
+
+
+def day_numbers(dates) -> np.ndarray:
+    """日期序列 → int64 日序陣列（整數視為已是日序）"""
+    arr = np.asarray(dates)
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.int64)
+    if arr.dtype.kind != "M":
+        arr = pd.to_datetime(arr.ravel()).to_numpy()
+    return arr.astype("datetime64[D]").astype(np.int64)
+
+
+def _as_date(day: int) -> np.datetime64:
+    return np.datetime64(int(day), "D")
+
+
+def _weekdays(lo: int, hi: int) -> np.ndarray:
+    """[lo, hi] 日序內的平日（日曆範圍外的推算）"""
+    if hi < lo:
+        return np.array([], dtype="datetime64[D]")
+    days = np.arange(lo, hi + 1).astype("datetime64[D]")
+    return days[np.is_busday(days)]
+
+
+class TradingCalendar:
+    def __init__(self, holidays: Iterable = (), *, first: str = FIRST_DAY, last: str = LAST_DAY) -> None:
+        lo, hi = _day(first), _day(last)
+        every = np.arange(lo, hi + 1, dtype=np.int64)
+        weekday = (every + 3) % 7  # 1970-01-01 為週四（週一 = 0）
+        holidays = list(holidays)
+        self.holidays = np.unique(day_numbers(holidays)) if holidays else np.array([], dtype=np.int64)
+        keep = (weekday < 5) & ~np.isin(every, self.holidays)
+        self.days = every[keep].astype(np.int32)
+        self.first, self.last = lo, hi
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def _inside(self, day: int) -> bool:
+        return self.first <= day <= self.last
+
+    def is_trading_day(self, d) -> bool:
+        """日曆範圍外只看是否為平日"""
+        day = _day(d)
+        if not self._inside(day):
+            return bool(np.is_busday(_as_date(day)))
+        i = int(np.searchsorted(self.days, day))
+        return i < len(self.days) and int(self.days[i]) == day
+
+    def _step(self, i: int) -> np.datetime64:
+        """days 的第 i 個（可超出範圍：超出部分以平日推算，同舊的 np.busday_offset 行為）"""
+        if i < 0:
+            return np.busday_offset(_as_date(self.days[0]), i)
+        if i >= len(self.days):
+            return np.busday_offset(_as_date(self.days[-1]), i - len(self.days) + 1)
+        return _as_date(self.days[i])
+
+    def next_trading_day(self, d, *, inclusive: bool = False) -> np.datetime64:
+        """d 之後的第一個交易日（inclusive=True 時 d 本身是交易日即回 d）"""
+        day = _day(d)
+        if not self._inside(day):
+            if inclusive:
+                return np.busday_offset(_as_date(day), 0, roll="forward")
+            return np.busday_offset(_as_date(day), 1, roll="backward")
+        return self._step(int(np.searchsorted(self.days, day, side="left" if inclusive else "right")))
+
+    def prev_trading_day(self, d, *, inclusive: bool = False) -> np.datetime64:
+        """d 之前的最後一個交易日（inclusive=True 時 d 本身是交易日即回 d）"""
+        day = _day(d)
+        if not self._inside(day):
+            if inclusive:
+                return np.busday_offset(_as_date(day), 0, roll="backward")
+            return np.busday_offset(_as_date(day), -1, roll="forward")
+        return self._step(int(np.searchsorted(self.days, day, side="right" if inclusive else "left")) - 1)
+
+    def offset(self, d, n: int) -> np.datetime64:
+        """
+        由 d 起算第 n 個交易日（n < 0 往前）；d 非交易日時先退到前一個交易日（同 np.busday_offset roll="backward"）。
+        例：offset(end, -(bars - 1)) 為涵蓋 bars 根 bar 的起始日。
+        日曆範圍（FIRST_DAY～LAST_DAY）外不報錯，超出的部分以平日推算
+        """
+        day = _day(d)
+        if not self._inside(day):
+            return np.busday_offset(_as_date(day), int(n), roll="backward")
+        return self._step(int(np.searchsorted(self.days, day, side="right")) - 1 + int(n))
+
+    def sessions(self, start=None, end=None) -> np.ndarray:
+        """[start, end] 內的交易日（datetime64[D]）；範圍外的部分為平日"""
+        lo = 0 if start is None else int(np.searchsorted(self.days, _day(start), side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, _day(end), side="right"))
+        out = self.days[lo:hi].astype("datetime64[D]")
+        parts = []
+        if start is not None and _day(start) < self.first:
+            parts.append(_weekdays(_day(start), min(self.first - 1, _day(end) if end is not None else self.first - 1)))
+        parts.append(out)
+        if end is not None and _day(end) > self.last:
+            parts.append(_weekdays(max(self.last + 1, _day(start) if start is not None else self.last + 1), _day(end)))
+        return np.concatenate(parts) if len(parts) > 1 else out
+
+    def count(self, start, end) -> int:
+        """[start, end] 內的交易日數"""
+        return len(self.sessions(start, end))
+
+    def index_of(self, dates) -> np.ndarray:
+        """日期 → 在 days 中的列索引（向量化）；非交易日 / 超出範圍為 -1"""
+        x = day_numbers(dates)
+        i = np.searchsorted(self.days, x)
+        hit = np.zeros(len(x), dtype=bool)
+        inside = i < len(self.days)
+        hit[inside] = self.days[i[inside]] == x[inside]
+        return np.where(hit, i, -1)
+
+    def align(self, dates) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        多檔對齊：回 (axis, row)，axis 為出現過的日序（排序、不重複），row 為每筆日期在 axis 中的位置。
+        全部落在交易日時以日曆索引標記取代排序去重；含非交易日（資料或休市表有誤）時退回 np.unique
+        """
+        x = day_numbers(dates)
+        if not len(x):
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        idx = self.index_of(x)
+        if (idx < 0).any():
+            axis, row = np.unique(x, return_inverse=True)
+            return axis, row.ravel()
+        lo = int(idx.min())
+        present = np.zeros(int(idx.max()) - lo + 1, dtype=bool)
+        present[idx - lo] = True
+        pos = np.cumsum(present) - 1
+        axis = self.days[lo:lo + len(present)][present].astype(np.int64)
+        return axis, pos[idx - lo]
+
+
+def holidays_path() -> Path:
+    return Path(os.getenv("TRADING_HOLIDAYS_FILE") or HOLIDAYS_FILE)
+
+
+def load_holidays(path=None) -> np.ndarray:
+    """休市日檔 → 日序陣列；檔案不存在時為空（只扣週末）"""
+    path = Path(path) if path else holidays_path()
+    try:
+        df = pd.read_csv(path, comment="#", dtype=str)
+    except FileNotFoundError:
+        return np.array([], dtype=np.int64)
+    return np.unique(day_numbers(df["date"].str.strip()))
+
+
+def get_calendar(path=None) -> TradingCalendar:
+    """共用的交易日曆（每個休市日檔只建一次）"""
+    path = Path(path) if path else holidays_path()
+    key = str(path)
+    with _LOCK:
+        cal = _LOADED.get(key)
+        if cal is None:
+            cal = _LOADED[key] = TradingCalendar(load_holidays(path))
+        return cal
+
+
+def clear() -> None:
+    """休市日檔更新後重新載入"""
+    with _LOCK:
+        _LOADED.clear()
+
+
+__all__ = ["TradingCalendar", "get_calendar", "day_numbers", "load_holidays", "holidays_path", "clear", "HOLIDAYS_FILE"]
@@ -5,25 +5,39 @@ from __future__ import annotations
 import pandas as pd
 import yfinance as yf
 import pytz
-from typing import Iterable, List
+from typing import Dict, Iterable, Optional
+
+from .symbols import NoDataError, as_vendor_candidates
 
 # 台北時區
 TZ_TAIPEI = pytz.timezone("Asia/Taipei")
 
+# yfinance 表示「查無資料」的錯誤類別／訊息；其餘錯誤（連線、限流、HTTP）視為暫時性
+NO_DATA_MARKERS = ("YFPricesMissingError", "YFTzMissingError", "possibly delisted", "no price data",
+                   "No data found", "no timezone found")
+
 
-def as_vendor_candidates(code_or_symbol: str) -> List[str]:
+class YahooDownloadError(ConnectionError):
     """
-    將輸入轉成可能的 Yahoo Finance 代碼列表。
-    - 若已含 .TW/.TWO，直接回傳 [原字串]
-    - 若是純數字，例如 '2330'，回傳 ['2330.TW', '2330.TWO']（先試上市，再試上櫃）
-    - 其他情況一律視為單一候選
+    yfinance 下載失敗（連線、限流等）。yf.download 會吞掉例外、只把錯誤記在 yf.shared._ERRORS 並回空表，
+    這裡把它還原成例外；屬於 ConnectionError → throttle.is_transient 視為可重試
     """
-    s = code_or_symbol.strip()
-    if "." in s:
-        return [s]
-    if s.isdigit():
-        return [f"{s}.TW", f"{s}.TWO"]
-    return [s]
+
+
+def _is_no_data(error) -> bool:
+    text = f"{type(error).__name__}: {error}"
+    return any(m.lower() in text.lower() for m in NO_DATA_MARKERS)
+
+
+def _download_errors(symbols: Iterable[str]) -> Dict[str, str]:
+    """上一次 yf.download 記錄的各 ticker 錯誤（不含查無資料類）"""
+    errors = getattr(getattr(yf, "shared", None), "_ERRORS", None) or {}
+    out = {}
+    for sym in symbols:
+        msg = errors.get(sym, errors.get(sym.upper()))
+        if msg and not _is_no_data(msg):
+            out[sym] = str(msg)
+    return out
 
 
 def _flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -43,35 +57,100 @@ def fetch_daily_ohlcv(code_or_symbol: str, start: str, end: str) -> pd.DataFrame
     index: 轉為 Asia/Taipei 的日期（回傳前 reset_index）
     - code_or_symbol: 可傳 '2330' 或 '2330.TW' / '2330.TWO'
     - start, end: 'YYYY-MM-DD'
+    候選代碼都查無資料 → NoDataError；有候選因連線等錯誤失敗 → YahooDownloadError（交給呼叫端重試）
+    以 Ticker.history(raise_errors=True) 抓取：yf.download 會吞掉錯誤回空表，分不出查無資料與連線失敗
+    實際命中的 vendor 代碼記在回傳的 df.attrs["vendor_symbol"]
     """
     candidates = as_vendor_candidates(code_or_symbol)
     df = None
+    error = None
+    hit = None
 
     for sym in candidates:
         try:
-            data = yf.download(
-                sym,
+            data = yf.Ticker(sym).history(
                 start=start,
                 end=end,
                 interval="1d",
-                progress=False,
                 auto_adjust=False,  # 不自動復權，保留 Close 與 Adj Close
                 actions=False,
-                group_by="column",
+                raise_errors=True,
             )
-            if data is not None and not data.empty:
-                df = data
-                break
         except Exception as e:
-            print(f"[yahoo_ingest] 嘗試 {sym} 失敗: {e}")
+            if not _is_no_data(e):
+                error = e
             continue
+        if data is not None and not data.empty:
+            df, hit = data, sym
+            break
 
     if df is None or df.empty:
-        raise ValueError(f"[yahoo_ingest] 找不到代碼 {code_or_symbol} 的行情資料")
+        if isinstance(error, ConnectionError):
+            raise error
+        if error is not None:
+            raise YahooDownloadError(f"[yahoo_ingest] {code_or_symbol}: {type(error).__name__}: {error}") from error
+        raise NoDataError(f"[yahoo_ingest] 找不到代碼 {code_or_symbol} 的行情資料")
+
+    out = _normalize(_flatten_columns(df))
+    out.attrs["vendor_symbol"] = hit
+    return out
 
-    # 攤平欄位（避免 MultiIndex）
-    df = _flatten_columns(df)
 
+def fetch_daily_ohlcv_many(codes: Iterable[str], start: str, end: str) -> Dict[str, pd.DataFrame]:
+    """
+    多代碼一次下載（yf.download 多 ticker）：回傳 {輸入代碼: DataFrame}，欄位同 fetch_daily_ohlcv。
+    純數字代碼先以 .TW 批次下載，查無資料者再以 .TWO 批次補一次；仍無資料者不列入回傳。
+    已含尾碼的代碼（例如快取中已解析的 6488.TWO）只下載該代碼。命中的代碼記在 attrs["vendor_symbol"]。
+    yf.shared._ERRORS 記錄為連線／限流等錯誤的代碼不視為查無資料（不再試下一個尾碼、不列入回傳，
+    由 ingest 逐檔重試）；整批都是這類錯誤 → YahooDownloadError（整批退避重試）
+    """
+    pending = {str(c): as_vendor_candidates(str(c)) for c in codes}
+    out: Dict[str, pd.DataFrame] = {}
+    rank = 0
+    while pending:
+        batch = {c: cands[rank] for c, cands in pending.items() if rank < len(cands)}
+        if not batch:
+            break
+        data = yf.download(
+            list(batch.values()),
+            start=start,
+            end=end,
+            interval="1d",
+            progress=False,
+            auto_adjust=False,
+            actions=False,
+            group_by="ticker",
+            threads=False,  # 並行由呼叫端（ingest 的執行緒池）控制
+        )
+        failed = _download_errors(batch.values())
+        if failed and len(failed) == len(batch):
+            raise YahooDownloadError(f"[yahoo_ingest] 批次下載失敗：{next(iter(failed.values()))}")
+        for code, sym in batch.items():
+            part = _ticker_frame(data, sym)
+            if part is not None:
+                out[code] = _normalize(part)
+                out[code].attrs["vendor_symbol"] = sym
+        pending = {c: cands for c, cands in pending.items() if c not in out and batch.get(c) not in failed}
+        rank += 1
+    return out
+
+
+def _ticker_frame(data: Optional[pd.DataFrame], sym: str) -> Optional[pd.DataFrame]:
+    """多 ticker 下載結果（欄位 (Ticker, Price)）中取出單一 ticker；全為空值視為查無資料"""
+    if data is None or data.empty:
+        return None
+    if isinstance(data.columns, pd.MultiIndex):
+        if sym not in data.columns.get_level_values(0):
+            return None
+        part = data[sym].copy()
+    else:
+        part = data.copy()
+    part = part.dropna(how="all")
+    return part if not part.empty else None
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """yfinance 欄位 → 標準欄位，日期轉為台北日曆日"""
     # 正規化欄位命名
     df = df.rename(
         columns={
@@ -110,4 +189,4 @@ def fetch_daily_ohlcv(code_or_symbol: str, start: str, end: str) -> pd.DataFrame
     return df.reset_index(drop=True)
 
 
-__all__ = ["fetch_daily_ohlcv", "as_vendor_candidates"]
\ No newline at end of file
+__all__ = ["fetch_daily_ohlcv", "fetch_daily_ohlcv_many", "as_vendor_candidates", "NoDataError", "YahooDownloadError"]
@@ -1,7 +1,8 @@
 # src/app/services/resolve.py
 from __future__ import annotations
+import json
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 # 四碼代號
 CODE_RE = re.compile(r"^\d{4}$")
@@ -56,4 +57,33 @@ def normalize_code_or_name(q: str) -> Tuple[Optional[str], List[Dict[str, str]]]
         return code, []
 
     # 4) 其他：無命中
-    return None, []
\ No newline at end of file
+    return None, []
+
+
+# 入庫時記下的 vendor 代碼／市場（data_pipeline/symbols.py 的對照檔）；檔案更新時重新載入
+_SYMBOLS: Dict[str, Any] = {"mtime": None, "entries": {}}
+
+def _symbol_entry(code: str) -> Optional[Dict[str, Any]]:
+    from app.services.data_pipeline.symbols import cache_path  # 只讀檔，不觸發任何抓取
+
+    path = cache_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _SYMBOLS["mtime"] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            _SYMBOLS["entries"] = json.load(f)
+        _SYMBOLS["mtime"] = mtime
+    e = _SYMBOLS["entries"].get(code)
+    return e if e and e.get("status") == "ok" else None
+
+def vendor_symbol(code: str) -> Optional[str]:
+    """已解析的 vendor 代碼（例如 6488 → '6488.TWO'）；尚未入庫過回 None"""
+    e = _symbol_entry(code)
+    return e["symbol"] if e else None
+
+def market_of(code: str) -> Optional[str]:
+    """'TWSE'（上市）/ 'TPEx'（上櫃）；未知回 None"""
+    e = _symbol_entry(code)
+    return e.get("market") if e else None
@@ -2,16 +2,33 @@
 from __future__ import annotations
 from typing import Dict, Any, List, Optional
 from app.db.conn import get_conn
+from app.domain.strategies.compiler import CompiledStrategy, compiled_for_id
 from app.runners.scan_runner import run_scan
 
+def resolve_timeframe(compiled: Optional[CompiledStrategy], timeframe: Optional[str] = None) -> str:
+    """明確指定者優先；否則用策略的 timeframe（signals 慣用大寫，如 1D）；都沒有為 1D"""
+    if timeframe:
+        return str(timeframe)
+    if compiled is not None and compiled.strategy.timeframe:
+        return str(compiled.strategy.timeframe).upper()
+    return "1D"
+
 class ScanService:
     def __init__(self, signals_repo):
         self.signals = signals_repo
 
-    def submit_job(self, db, payload: Dict[str, Any]) -> Dict[str, str]:
-        # 真正的批次掃描由 scheduler/worker 處理；此處僅回 job_id
+    def submit_job(self, db, payload: Dict[str, Any], *, idempotency_key: Optional[str] = None) -> Dict[str, str]:
+        """
+        建立（同 idempotency_key 則沿用）scan job 並喚醒背景 worker（scheduler/scan_worker.py）；
+        回傳：{"job_id": ..., "status": 目前狀態}
+        """
         import uuid
-        return {"job_id": str(uuid.uuid4()), "status": "pending"}
+        from app.scheduler import scan_worker  # 延遲 import：scan_worker 依賴本模組
+
+        job_id = self.signals.get_or_create_scan_job(db, idempotency_key or uuid.uuid4().hex, payload)
+        scan_worker.notify()
+        rec = self.signals.get_scan_job(db, job_id)
+        return {"job_id": job_id, "status": rec["status"] if rec else "pending"}
 
     def run_now(
         self,
@@ -19,18 +36,23 @@ class ScanService:
         strategy_id: int,
         symbols: List[str],
         ts: str,
-        timeframe: str = "1D",
+        timeframe: Optional[str] = None,
         indicator: str = "ma",
         params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         直接執行掃描（同步）：呼叫 scan_runner → 將結果 upsert 到 signals
+        strategies 表有此 strategy_id 時以其條件評估；否則退回單一指標（indicator + params）
+        timeframe 未指定時取策略的 timeframe（無策略為 1D）
         回傳：{"inserted_signals": n, "status": "ok"}
         """
         if not symbols:
             return {"inserted_signals": 0, "status": "ok"}
 
-        res = run_scan(symbols, indicator=indicator, timeframe=timeframe, params=params or {})
+        compiled = compiled_for_id(strategy_id)
+        timeframe = resolve_timeframe(compiled, timeframe)
+        res = run_scan(symbols, indicator=indicator, timeframe=timeframe, params=params or {},
+                       strategy=compiled)
         conn = get_conn()
         inserted = 0
         for r in res:
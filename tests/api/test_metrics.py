@@ -22,4 +22,24 @@ def test_metrics_basic(client):
     assert "backtest_runs_total" in m
     assert "trades_total" in m
     assert "alerts_failed" in m
-    assert isinstance(m["signals_total"], int)
\ No newline at end of file
+    assert isinstance(m["signals_total"], int)
+
+def test_metrics_indicator_cache(client, tmp_path, monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from app.runners.scan_runner import run_scan
+    from app.services.data_pipeline import dataset, duckdb_io, hotstore
+    monkeypatch.setattr(dataset, "DATASET_DIR", tmp_path / "dataset")
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", tmp_path)
+    monkeypatch.setattr(hotstore, "HOT_DIR", tmp_path / "hot")
+    close = np.linspace(100, 110, 60)
+    pd.DataFrame({"date": pd.bdate_range("2025-01-02", periods=60), "open": close, "high": close + 1,
+                  "low": close - 1, "close": close, "volume": 1000.0}).to_parquet(tmp_path / "2330.parquet", index=False)
+    run_scan(["2330"], indicator="ma", params={"window": 3})
+    run_scan(["2330"], indicator="ma", params={"window": 3})
+
+    m = client.get("/api/v1/metrics").json()
+    ic = m["indicator_cache"]
+    for k in ("entries", "bytes", "max_bytes", "hits", "misses", "evictions"):
+        assert isinstance(ic[k], int)
+    assert ic["hits"] >= 1
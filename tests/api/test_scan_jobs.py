@@ -0,0 +1,80 @@
+# tests/api/test_scan_jobs.py
+import time
+
+from fastapi.testclient import TestClient
+
+from app.db.conn import get_conn
+from app.scheduler import scan_worker
+
+SCAN_URL = "/api/v1/scan"
+BODY = {"strategy_id": 1, "symbols": ["2330", "2317", "2454", "2412", "1301"], "timeframe": "1D",
+        "ts": "2025-09-30 00:00:00"}
+
+def signal_count() -> int:
+    return int(get_conn().execute("SELECT COUNT(*) FROM signals").fetchone()[0])
+
+def test_job_progress_and_resume(client, monkeypatch):
+    monkeypatch.setattr(scan_worker, "BATCH", 2)
+    r = client.post(SCAN_URL, headers={"Idempotency-Key": "job-progress"}, json=BODY)
+    assert r.status_code == 200 and r.json()["status"] == "pending"
+    job_id = r.json()["job_id"]
+    rec = client.get(f"{SCAN_URL}/{job_id}").json()
+    assert (rec["status"], rec["symbols_total"], rec["symbols_done"], rec["started_at"]) == ("pending", 5, 0, None)
+
+    # 跑完第一批後要求停止 → 放回 pending，保留進度
+    calls = []
+    job = scan_worker._repo.claim_scan_job(None)
+    assert scan_worker.run_job(job, should_stop=lambda: calls.append(1) or len(calls) > 1) == "pending"
+    rec = client.get(f"{SCAN_URL}/{job_id}").json()
+    assert (rec["status"], rec["symbols_done"], rec["finished_at"]) == ("pending", 2, None)
+    assert rec["started_at"] is not None and signal_count() == 2
+
+    assert scan_worker.run_pending() == 1
+    rec = client.get(f"{SCAN_URL}/{job_id}").json()
+    assert (rec["status"], rec["symbols_done"], rec["error"]) == ("done", 5, None)
+    assert rec["finished_at"] is not None and signal_count() == 5
+    assert scan_worker.run_pending() == 0
+
+    assert client.post(SCAN_URL, headers={"Idempotency-Key": "bad"}, json={"strategy_id": 1}).status_code == 422
+
+def test_background_worker_runs_submitted_job():
+    from src.app.main import app
+    with TestClient(app) as c:  # lifespan 啟動 worker 執行緒
+        job_id = c.post(SCAN_URL, headers={"Idempotency-Key": "job-bg"}, json=BODY).json()["job_id"]
+        deadline = time.monotonic() + 30
+        rec = c.get(f"{SCAN_URL}/{job_id}").json()
+        while rec["status"] in ("pending", "running") and time.monotonic() < deadline:
+            time.sleep(0.05)
+            rec = c.get(f"{SCAN_URL}/{job_id}").json()
+    assert not scan_worker._WORKER.running
+    assert (rec["status"], rec["symbols_done"]) == ("done", 5)
+    assert signal_count() == 5
+
+def test_failed_job_is_logged_and_marked(client, monkeypatch, caplog):
+    from app.services.scan_service import ScanService
+
+    def boom(self, **kw):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(ScanService, "run_now", boom)
+    job_id = client.post(SCAN_URL, headers={"Idempotency-Key": "job-fail"}, json=BODY).json()["job_id"]
+    with caplog.at_level("ERROR", logger="app.scheduler.scan_worker"):
+        assert scan_worker.run_pending() == 1
+    rec = client.get(f"{SCAN_URL}/{job_id}").json()
+    assert (rec["status"], rec["error"], rec["symbols_done"]) == ("failed", "RuntimeError: boom", 0)
+    assert rec["finished_at"] is not None
+    assert any(job_id in r.getMessage() and r.exc_info for r in caplog.records)
+
+def test_job_timeframe_defaults_to_strategy(client, monkeypatch):
+    from types import SimpleNamespace
+    from app.services import scan_service
+
+    seen = []
+    weekly = SimpleNamespace(strategy=SimpleNamespace(timeframe="1w"))
+    monkeypatch.setattr(scan_service, "compiled_for_id", lambda sid: weekly)
+    monkeypatch.setattr(scan_service, "run_scan", lambda symbols, **kw: seen.append(kw["timeframe"]) or [])
+    body = {k: v for k, v in BODY.items() if k != "timeframe"}
+    client.post(SCAN_URL, headers={"Idempotency-Key": "tf-strategy"}, json=body)
+    client.post(SCAN_URL, headers={"Idempotency-Key": "tf-override"}, json={**body, "timeframe": "1D"})
+    assert scan_worker.run_pending() == 2
+    assert seen == ["1W", "1D"]
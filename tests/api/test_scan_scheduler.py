@@ -1,24 +1,26 @@
 # tests/api/test_scan_scheduler.py
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from app.scheduler.scan_cron import DailyState, next_due, run_if_due
 
+
 def test_next_due_weekday_and_weekend():
     # 週一上午 → 當天 16:30
-    mon = datetime(2025, 9, 29, 10, 0)  # <- 移除 tzinfo
+    mon = datetime(2025, 9, 22, 10, 0)  # <- 移除 tzinfo
     nxt = next_due(mon)
     assert nxt.date() == mon.date()
     assert (nxt.hour, nxt.minute) == (16, 30)
 
     # 週五傍晚 → 下週一 16:30
-    fri = datetime(2025, 9, 26, 17, 0)
+    fri = datetime(2025, 9, 19, 17, 0)
     nxt2 = next_due(fri)
     assert nxt2.weekday() == 0
     assert (nxt2.hour, nxt2.minute) == (16, 30)
 
+
 def test_run_if_due_triggers_once_per_day():
     state = DailyState()
     # 平日 16:31 觸發
-    now1 = datetime(2025, 9, 29, 16, 31)
+    now1 = datetime(2025, 9, 22, 16, 31)
     count = {"n": 0}
 
     def _cb():
@@ -38,5 +40,20 @@ def test_run_if_due_triggers_once_per_day():
     assert count["n"] == 2
 
     # 週六 → 不觸發
-    sat = datetime(2025, 9, 27, 16, 40)
-    assert run_if_due(_cb, state=state, now=sat) is False
\ No newline at end of file
+    sat = datetime(2025, 9, 20, 16, 40)
+    assert run_if_due(_cb, state=state, now=sat) is False
+
+
+def test_schedule_skips_holidays_and_converts_timezone():
+    # 國慶日（週五）休市 → 週四傍晚之後的下一次是週一
+    thu = datetime(2025, 10, 9, 17, 0)
+    assert next_due(thu).date().isoformat() == "2025-10-13"
+    assert run_if_due(lambda: None, state=DailyState(), now=datetime(2025, 10, 10, 16, 40)) is False
+    # UTC 08:31 = 台北 16:31
+    utc = datetime(2025, 9, 22, 8, 31, tzinfo=timezone.utc)
+    assert run_if_due(lambda: None, state=DailyState(), now=utc) is True
+    assert next_due(utc).date().isoformat() == "2025-09-23"
+    # 春節：僅交割日（1/23、1/24）與連假都不排程，下一次是 2/3
+    assert next_due(datetime(2025, 1, 22, 17, 0)).date().isoformat() == "2025-02-03"
+    # 教師節補假（週一）
+    assert next_due(datetime(2025, 9, 26, 17, 0)).date().isoformat() == "2025-09-30"
@@ -0,0 +1,52 @@
+import pandas as pd
+import numpy as np
+
+from app.cache import ByteLRUCache
+from app.indicators import cache as ind_cache
+from app.indicators.registry import calc
+import app.indicators  # side-effect: registers builtins
+
+def mkdf(n=100, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0,1,size=n)) + 100
+    return pd.DataFrame({"open":close,"high":close+1,"low":close-1,"close":close,"volume":np.full(n, 1000.0)})
+
+def test_calc_cached_hits_on_same_key():
+    ind_cache.get_cache().clear(reset_stats=True)
+    df = mkdf()
+    a = ind_cache.calc_cached("2330", "MA", df, {"window": 20}, data_version="v1")
+    b = ind_cache.calc_cached("2330", "ma", df, {"window": 20.0}, data_version="v1")
+    assert a is b
+    pd.testing.assert_series_equal(a, calc("MA", df, {"window": 20}))
+    st = ind_cache.stats()
+    assert (st["hits"], st["misses"], st["entries"]) == (1, 1, 1)
+
+def test_calc_cached_key_parts():
+    ind_cache.get_cache().clear(reset_stats=True)
+    df = mkdf()
+    p = {"fast": 12, "slow": 26, "signal": 9}
+    # default field 與明確指定 "macd" 為同一筆
+    ind_cache.calc_cached("2330", "MACD", df, p, data_version="v1")
+    ind_cache.calc_cached("2330", "MACD", df, p, field="macd", data_version="v1")
+    ind_cache.calc_cached("2330", "MACD", df, p, field="hist", data_version="v1")
+    ind_cache.calc_cached("2330", "MACD", df, p, data_version="v2")
+    ind_cache.calc_cached("2317", "MACD", df, p, data_version="v1")
+    st = ind_cache.stats()
+    assert (st["hits"], st["misses"]) == (1, 4)
+    # 未給版本 → 內容雜湊；資料變動即失效
+    ind_cache.calc_cached(None, "MA", df, {"window": 5})
+    ind_cache.calc_cached(None, "MA", mkdf(seed=1), {"window": 5})
+    assert ind_cache.stats()["misses"] == 6
+
+def test_lru_eviction_by_bytes():
+    c = ByteLRUCache(max_bytes=300)
+    c.put("a", 1, nbytes=100)
+    c.put("b", 2, nbytes=100)
+    c.put("c", 3, nbytes=100)
+    assert c.get("a") == (True, 1)        # a 變成最近使用
+    c.put("d", 4, nbytes=100)             # 淘汰最久未用的 b
+    assert c.get("b") == (False, None)
+    assert c.get("c")[0] and c.get("a")[0] and c.get("d")[0]
+    c.put("huge", 5, nbytes=1000)         # 超過預算的單筆不收
+    st = c.stats()
+    assert st["evictions"] == 1 and st["bytes"] == 300 and st["entries"] == 3
@@ -71,3 +71,19 @@ def test_diff_ok():
     df = mkdf()
     s = calc("DIFF", df, {"left":"close","right":"open"})
     assert len(s)==len(df)
+
+def test_kd_reference():
+    df = mkdf()
+    p = {"k_period": 9, "d_period": 3, "smooth": 3}
+    k = calc("KD", df, p)
+    d = calc("KD", df, p, field="d")
+    assert k.index.equals(df.index)
+    assert k.iloc[:8].isna().all() and not k.iloc[8:].isna().any()
+    # 逐根照台股公式：RSV → K = 2/3*前K + 1/3*RSV → D = 2/3*前D + 1/3*K（初值 50）
+    kk = dd = 50.0
+    for i in range(8, len(df)):
+        hh = df["high"].iloc[i-8:i+1].max(); ll = df["low"].iloc[i-8:i+1].min()
+        rsv = (df["close"].iloc[i] - ll) / (hh - ll) * 100
+        kk = kk * 2/3 + rsv / 3; dd = dd * 2/3 + kk / 3
+        assert k.iloc[i] == pytest.approx(kk) and d.iloc[i] == pytest.approx(dd)
+    assert ((k.dropna() >= 0) & (k.dropna() <= 100)).all()
@@ -0,0 +1,117 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from app.indicators import kernels as K
+from app.indicators import registry
+from app.indicators.registry import calc, calc_panel
+import app.indicators  # side-effect: registers builtins
+
+def mkdf(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0,1,size=n)) + 100
+    high = close + rng.uniform(0,1,size=n)
+    low = close - rng.uniform(0,1,size=n)
+    open_ = close + rng.normal(0,0.5,size=n)
+    volume = rng.integers(1000, 5000, size=n)
+    idx = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.DataFrame({"open":open_,"high":high,"low":low,"close":close,"volume":volume}, index=idx)
+
+CASES = [
+    ("MA", {"window": 20}, None),
+    ("EMA", {"window": 20}, None),
+    ("RSI", {"period": 14}, None),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "macd"),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "signal"),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "hist"),
+    ("BOLL", {"window": 20, "mult": 2.0}, "upper"),
+    ("BOLL", {"window": 20, "mult": 2.0}, "lower"),
+    ("BIAS", {"window": 20}, None),
+    ("VOLUME", {}, None),
+    ("VOLUME", {"window": 10}, None),
+    ("DIFF", {"left": "close", "right": "open"}, None),
+]
+
+def reference(name, df, params, field):
+    """builtin 的 pandas 版 compute（fn）作為參考實作"""
+    entry = registry.get(name)
+    out = entry["fn"](df, params, timeframe="1d", field=field)
+    if hasattr(out, "columns"):
+        out = out[field or entry["meta"]["default_field"]]
+    return out.to_numpy(dtype=float)
+
+@pytest.mark.parametrize("gap", [False, True])
+@pytest.mark.parametrize("name,params,field", CASES)
+def test_calc_matches_pandas_reference(name, params, field, gap):
+    df = mkdf()
+    if gap:
+        # 停牌：中途缺 bar → EMA/RMA 走逐列遞迴，rolling 視窗輸出 NaN
+        df.loc[df.index[150], ["open", "high", "low", "close", "volume"]] = np.nan
+    got = calc(name, df, params, field=field)
+    assert got.index.equals(df.index)
+    np.testing.assert_allclose(got.to_numpy(dtype=float), reference(name, df, params, field),
+                               rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_calc_panel_writes_into_out():
+    df = mkdf()
+    panel = {c: df[c].to_numpy(dtype=float) for c in registry.OHLCV_COLUMNS}
+    buf = np.empty((len(df), 1))
+    res = calc_panel("EMA", panel, {"window": 20}, out=buf)
+    assert res is buf
+    np.testing.assert_allclose(buf[:, 0], calc("EMA", df, {"window": 20}), equal_nan=True)
+    # 多欄指標：選定欄位複製進 out
+    res = calc_panel("BOLL", panel, {"window": 20, "mult": 2.0}, field="upper", out=buf)
+    assert res is buf
+    with pytest.raises(ValueError):
+        calc_panel("MA", panel, {"window": 20}, out=np.empty((3, 1)))
+
+def test_rolling_var_stable_under_drift():
+    # 高價位 + 價位大幅跳動：以全域均值平移的 E[x^2]-E[x]^2 會失真，分段錨點版需貼近兩段式計算
+    rng = np.random.default_rng(1)
+    n, w = 5000, 20
+    x = 1e8 + rng.normal(0, 1, size=n)
+    x[n // 2:] += 1e6
+    ref = np.lib.stride_tricks.sliding_window_view(x, w).var(axis=1)
+    got = K.rolling_var(x[:, None], w)[:, 0]
+    assert np.isnan(got[:w-1]).all()
+    np.testing.assert_allclose(got[w-1:], ref, rtol=1e-6)
+
+def test_ewm_mixed_columns_match_pandas():
+    rng = np.random.default_rng(2)
+    x = np.cumsum(rng.normal(size=(2000, 3)), axis=0) + 50
+    x[:40, 1] = np.nan    # 較晚上市 → 閉式解
+    x[900:903, 2] = np.nan  # 中途停牌 → 逐列遞迴
+    for alpha in (0.3, 2.0 / 21, 1.0 / 300):
+        got = K.ewm_mean(x, alpha)
+        for j in range(x.shape[1]):
+            ref = pd.Series(x[:, j]).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+            np.testing.assert_allclose(got[:, j], ref, rtol=1e-12, equal_nan=True)
+
+def test_ewm_in_place_matches_pandas():
+    rng = np.random.default_rng(3)
+    x = np.cumsum(rng.normal(size=(3000, 2)), axis=0) + 100
+    ref = [pd.Series(x[:, j]).ewm(alpha=1.0 / 50, adjust=False).mean().to_numpy() for j in range(2)]
+    buf = x.copy()
+    got = K.ewm_mean(buf, np.array([1.0 / 50, 1.0]), out=buf)  # out 即 x；第二欄 alpha=1
+    assert got is buf
+    np.testing.assert_allclose(got[:, 0], ref[0], rtol=1e-12)
+    np.testing.assert_array_equal(got[:, 1], x[:, 1])
+    buf = x.copy()
+    np.testing.assert_allclose(K.ewm_mean(buf, 1.0 / 50, out=buf)[:, 1], ref[1], rtol=1e-12)
+
+@pytest.mark.parametrize("form", ["numpy", "arrow"])
+def test_calc_accepts_array_columns(form):
+    pa = pytest.importorskip("pyarrow")
+    df = mkdf()
+    df.loc[df.index[100], "close"] = np.nan
+    data = {c: df[c].to_numpy(dtype=float) for c in registry.OHLCV_COLUMNS}
+    if form == "arrow":
+        data = pa.table({c: pa.array(v, from_pandas=True) for c, v in data.items()})
+    for name, params, field in CASES:
+        got = calc(name, data, params, field=field)
+        assert isinstance(got, np.ndarray) and got.ndim == 1
+        np.testing.assert_array_equal(got, calc(name, df, params, field=field).to_numpy(dtype=float))
+    sweep = registry.calc_sweep("MA", data, [3, 5])
+    np.testing.assert_array_equal(sweep, registry.calc_sweep("MA", df, [3, 5]))
+    with pytest.raises(KeyError):
+        calc("MA", {"close": data["close"]}, {"window": 5})
@@ -0,0 +1,77 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from app.indicators.registry import calc, calc_panel
+import app.indicators  # side-effect: registers builtins
+
+COLS = ["open", "high", "low", "close", "volume"]
+
+def mkpanel(n=120, k=4, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 1, size=(n, k)), axis=0) + 100
+    panel = {
+        "open": close + rng.normal(0, 0.5, size=(n, k)),
+        "high": close + rng.uniform(0, 1, size=(n, k)),
+        "low": close - rng.uniform(0, 1, size=(n, k)),
+        "close": close,
+        "volume": rng.integers(1000, 5000, size=(n, k)).astype(float),
+    }
+    # 最後一檔較晚上市：前 30 筆無資料
+    for c in COLS:
+        panel[c][:30, -1] = np.nan
+    return panel
+
+def column_df(panel, j):
+    df = pd.DataFrame({c: panel[c][:, j] for c in COLS})
+    return df.dropna(how="all").reset_index(drop=True)
+
+CASES = [
+    ("MA", {"window": 20}, None),
+    ("EMA", {"window": 20}, None),
+    ("RSI", {"period": 14}, None),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "macd"),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "signal"),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "hist"),
+    ("BOLL", {"window": 20, "mult": 2.0}, "upper"),
+    ("BOLL", {"window": 20, "mult": 2.0}, "lower"),
+    ("BIAS", {"window": 20}, None),
+    ("VOLUME", {}, None),
+    ("VOLUME", {"window": 10}, None),
+    ("DIFF", {"left": "close", "right": "open"}, None),
+    ("KD", {"k_period": 9, "d_period": 3, "smooth": 3}, "k"),
+    ("KD", {"k_period": 9, "d_period": 3, "smooth": 3}, "d"),
+]
+
+@pytest.mark.parametrize("name,params,field", CASES)
+def test_panel_matches_single(name, params, field):
+    panel = mkpanel()
+    out = calc_panel(name, panel, params, field=field)
+    assert out.shape == panel["close"].shape
+    for j in range(out.shape[1]):
+        df = column_df(panel, j)
+        ref = calc(name, df, params, field=field).to_numpy(dtype=float)
+        got = out[-len(df):, j]
+        np.testing.assert_allclose(got, ref, rtol=1e-9, atol=1e-9, equal_nan=True)
+    # 上市前的列維持 NaN
+    assert np.isnan(out[:30, -1]).all()
+
+def test_panel_guards():
+    panel = mkpanel()
+    with pytest.raises(ValueError):
+        calc_panel("RSI", panel, {"period": 14}, timeframe="1h")
+    with pytest.raises(KeyError):
+        calc_panel("MA", {"close": panel["close"]}, {"window": 20})
+    bad = dict(panel, volume=panel["volume"][:-1])
+    with pytest.raises(ValueError):
+        calc_panel("MA", bad, {"window": 20})
+
+@pytest.mark.parametrize("window", [1, 3, 7, 20, 119, 120, 121])
+def test_rolling_extremes_match_pandas(window):
+    from app.indicators import kernels as K
+    panel = mkpanel()
+    x = panel["high"].copy()
+    x[50, 0] = np.nan  # 中途缺值：含 NaN 的視窗輸出 NaN
+    df = pd.DataFrame(x)
+    np.testing.assert_allclose(K.rolling_max(x, window), df.rolling(window).max().to_numpy(), equal_nan=True)
+    np.testing.assert_allclose(K.rolling_min(x, window), df.rolling(window).min().to_numpy(), equal_nan=True)
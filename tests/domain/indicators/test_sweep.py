@@ -0,0 +1,48 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+from app.indicators.registry import calc, calc_sweep
+import app.indicators  # side-effect: registers builtins
+
+def mkdf(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0,1,size=n)) + 100
+    high = close + rng.uniform(0,1,size=n)
+    low = close - rng.uniform(0,1,size=n)
+    open_ = close + rng.normal(0,0.5,size=n)
+    volume = rng.integers(1000, 5000, size=n)
+    return pd.DataFrame({"open":open_,"high":high,"low":low,"close":close,"volume":volume})
+
+WINDOWS = [2, 3, 5, 20, 60, 240, 400]
+
+CASES = [
+    ("MA", {}, None),
+    ("EMA", {}, None),
+    ("BIAS", {}, None),
+    ("VOLUME", {}, None),
+    ("BOLL", {"mult": 2.0}, "upper"),
+    ("BOLL", {"mult": 2.0}, "lower"),
+    ("RSI", {}, None),  # 無 sweep_fn → 逐一 calc
+]
+
+@pytest.mark.parametrize("gap", [False, True])
+@pytest.mark.parametrize("name,params,field", CASES)
+def test_sweep_rows_match_calc(name, params, field, gap):
+    df = mkdf()
+    if gap:
+        df.loc[300, ["open", "high", "low", "close", "volume"]] = np.nan
+    key = "period" if name == "RSI" else "window"
+    out = calc_sweep(name, df, WINDOWS, params, key=key, field=field)
+    assert out.shape == (len(WINDOWS), len(df))
+    for i, w in enumerate(WINDOWS):
+        ref = calc(name, df, {**params, key: w}, field=field).to_numpy(dtype=float)
+        np.testing.assert_allclose(out[i], ref, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_sweep_guards():
+    df = mkdf()
+    with pytest.raises(ValueError):
+        calc_sweep("MA", df, [0, 5])
+    with pytest.raises(ValueError):
+        calc_sweep("MA", df, [5], timeframe="1h")
+    assert calc_sweep("MA", df, []).shape == (0, len(df))
@@ -0,0 +1,74 @@
+import pandas as pd
+import numpy as np
+
+from app.domain.strategies import compiler
+from app.domain.strategies.compiler import compile_strategy, get_compiled
+from app.indicators.registry import calc
+
+def mkdf(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0,1,size=n)) + 100
+    high = close + rng.uniform(0,1,size=n)
+    low = close - rng.uniform(0,1,size=n)
+    open_ = close + rng.normal(0,0.5,size=n)
+    volume = rng.integers(1000, 5000, size=n).astype(float)
+    return pd.DataFrame({"open":open_,"high":high,"low":low,"close":close,"volume":volume})
+
+def strategy(logic="AND", conditions=None):
+    return {
+        "name": "ma_cross_rsi", "version": "0.1.0", "type": "screen", "timeframe": "1d", "logic": logic,
+        "conditions": conditions or [
+            {"left": {"indicator": "MA", "params": {"window": 5}}, "op": "cross_up",
+             "right": {"indicator": "MA", "params": {"window": 20}}},
+            {"left": {"indicator": "RSI", "params": {"period": 14}}, "op": ">", "right": {"value": 50}},
+        ],
+    }
+
+def test_evaluate_matches_pandas_reference():
+    df = mkdf()
+    fast = calc("MA", df, {"window": 5})
+    slow = calc("MA", df, {"window": 20})
+    rsi = calc("RSI", df, {"period": 14})
+    cross = (fast > slow) & (fast.shift(1) <= slow.shift(1))
+    for logic, expect in (("AND", cross & (rsi > 50)), ("OR", cross | (rsi > 50))):
+        got = compile_strategy(strategy(logic)).evaluate(df)
+        assert got.dtype == bool and len(got) == len(df)
+        np.testing.assert_array_equal(got, expect.to_numpy(dtype=bool))
+
+def test_cross_down_source_and_field():
+    df = mkdf()
+    st = strategy(conditions=[
+        {"left": {"series": "close"}, "op": "cross_down",
+         "right": {"indicator": "BOLL", "params": {"window": 20, "mult": 2.0}, "field": "lower"}},
+        {"left": {"indicator": "EMA", "params": {"window": 10}, "source": "hlc3"}, "op": "<",
+         "right": {"series": "open"}},
+    ])
+    lower = calc("BOLL", df, {"window": 20, "mult": 2.0}, field="lower")
+    hlc3 = df.assign(close=(df["high"] + df["low"] + df["close"]) / 3)
+    ema = calc("EMA", hlc3, {"window": 10})
+    c = df["close"]
+    expect = (c < lower) & (c.shift(1) >= lower.shift(1)) & (ema < df["open"])
+    np.testing.assert_array_equal(compile_strategy(st).evaluate(df), expect.to_numpy(dtype=bool))
+
+def test_evaluate_panel_matches_per_symbol():
+    dfs = [mkdf(seed=s) for s in range(3)]
+    panel = {c: np.column_stack([d[c].to_numpy() for d in dfs]) for c in dfs[0].columns}
+    plan = compile_strategy(strategy("OR"))
+    out = plan.evaluate_panel(panel)
+    assert out.shape == (200, 3)
+    for j, d in enumerate(dfs):
+        np.testing.assert_array_equal(out[:, j], plan.evaluate(d))
+
+def test_evaluate_accepts_numpy_columns():
+    df = mkdf()
+    plan = compile_strategy(strategy("OR"))
+    arrays = {c: df[c].to_numpy() for c in df.columns}
+    np.testing.assert_array_equal(plan.evaluate(arrays), plan.evaluate(df))
+
+def test_compiled_cache_by_id_and_updated_at():
+    compiler.clear_compiled()
+    a = get_compiled(1, "2025-01-01 00:00:00", strategy())
+    b = get_compiled(1, "2025-01-01 00:00:00", strategy("OR"))
+    assert a is b
+    c = get_compiled(1, "2025-01-02 00:00:00", strategy("OR"))
+    assert c is not a and c.logic == "OR"
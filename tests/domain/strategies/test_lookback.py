@@ -0,0 +1,30 @@
+from app.domain.strategies.compiler import compile_strategy
+from app.domain.strategies.lookback import required_bars, required_warmup
+from app.domain.strategies.validation import Strategy
+
+def strategy(conditions):
+    return Strategy.parse_obj({"name": "lookback", "version": "1.0.0", "type": "screen", "timeframe": "1d",
+                               "logic": "AND", "conditions": conditions})
+
+MACD = {"indicator": "MACD", "params": {"fast": 12, "slow": 26, "signal": 9}}
+MA5 = {"indicator": "MA", "params": {"window": 5}}
+MA60 = {"indicator": "MA", "params": {"window": 60}}
+
+def test_macd_warmup_is_slow_plus_signal():
+    st = strategy([{"left": MACD, "op": ">", "right": {"value": 0}}])
+    assert required_warmup(st, settle=1) == 26 + 9
+    assert required_bars(st, settle=1) == 36
+    assert required_bars(st, tail=20, settle=1) == 55
+    # 遞迴型指標預設加乘 settle（SETTLE = 3）
+    assert required_warmup(st) == 3 * 35
+    assert required_bars(st) == compile_strategy(st).required_bars() == 3 * 35 + 1
+
+def test_cross_adds_one_bar_and_max_over_conditions():
+    st = strategy([
+        {"left": MA5, "op": "cross_up", "right": MA60},
+        {"left": {"series": "close"}, "op": ">", "right": MA5},
+    ])
+    assert required_warmup(st) == 61
+    # settle 只作用在遞迴型指標
+    assert required_warmup(st, settle=1) == 61
+    assert compile_strategy(st).required_bars() == 62
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from app.domain.strategies.compiler import compile_strategy, evaluate_many
+from app.domain.strategies.planner import PlanBuilder, plan_strategies
+from app.domain.strategies.validation import Strategy
+from app.indicators.registry import calc_panel
+
+def mkpanel(n=150, k=3, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 1, size=(n, k)), axis=0) + 100
+    p = {
+        "open": close + rng.normal(0, 0.5, size=(n, k)),
+        "high": close + rng.uniform(0, 1, size=(n, k)),
+        "low": close - rng.uniform(0, 1, size=(n, k)),
+        "close": close,
+        "volume": rng.integers(1000, 5000, size=(n, k)).astype(float),
+    }
+    for c in p:
+        p[c][:20, -1] = np.nan
+    return p
+
+CASES = [
+    ("MA", {"window": 20}, None),
+    ("EMA", {"window": 12}, None),
+    ("RSI", {"period": 14}, None),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "macd"),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "signal"),
+    ("MACD", {"fast": 12, "slow": 26, "signal": 9}, "hist"),
+    ("BOLL", {"window": 20, "mult": 2.0}, "upper"),
+    ("BOLL", {"window": 20, "mult": 2.0}, "middle"),
+    ("BIAS", {"window": 20}, None),
+    ("VOLUME", {"window": 5}, None),
+    ("DIFF", {"left": "high", "right": "low"}, None),
+    ("KD", {"k_period": 9, "d_period": 3, "smooth": 3}, "k"),
+    ("KD", {"k_period": 9, "d_period": 3, "smooth": 3}, "d"),
+]
+
+@pytest.mark.parametrize("name,params,field", CASES)
+def test_expanded_nodes_match_calc_panel(name, params, field):
+    panel = mkpanel()
+    b = PlanBuilder()
+    key = b.indicator(name, params, field=field)
+    values = b.build().execute(panel)
+    np.testing.assert_allclose(values[key], calc_panel(name, panel, params, field=field), equal_nan=True)
+
+def strategy(name, conditions):
+    return Strategy.parse_obj({"name": name, "version": "1.0.0", "type": "screen", "timeframe": "1d",
+                               "logic": "AND", "conditions": conditions})
+
+def ind(name, **params):
+    return {"indicator": name, "params": params}
+
+def test_stats_ignore_shared_source_reads():
+    # 只共用 close 欄位、沒有共用計算 → removed = 0
+    st = plan_strategies([strategy("ma_cross", [
+        {"left": ind("MA", window=5), "op": ">", "right": ind("MA", window=20)},
+    ])]).stats
+    assert (st["requested"], st["unique"], st["removed"], st["leaves"]) == (2, 2, 0, 1)
+
+def test_shared_nodes_are_removed():
+    s1 = strategy("boll_bias", [
+        {"left": {"series": "close"}, "op": ">", "right": {**ind("BOLL", window=20, mult=2.0), "field": "upper"}},
+        {"left": ind("BIAS", window=20), "op": "<", "right": {"value": 5}},
+        {"left": ind("MA", window=20), "op": ">", "right": ind("EMA", window=12)},
+    ])
+    s2 = strategy("macd_ema", [
+        {"left": ind("MACD", fast=12, slow=26, signal=9), "op": ">", "right": {"value": 0}},
+        {"left": ind("EMA", window=12), "op": ">", "right": {"series": "close"}},
+    ])
+    plan = plan_strategies([s1, s2])
+    st = plan.stats
+    assert st["removed"] > 0 and st["unique"] + st["removed"] == st["requested"]
+    sma20 = [k for k in plan.nodes if k[0] == "sma"]
+    assert len(sma20) == 1                       # BOLL/BIAS/MA 共用 rolling mean
+    close = ("src", (), ("close",))
+    emas = [k for k in plan.nodes if k[0] == "ema" and k[1] == (close,)]
+    assert len(emas) == 2                        # EMA(12) 與 MACD 的 fast 共用；slow 另一條
+
+def test_evaluate_many_matches_individual():
+    panel = mkpanel()
+    conds = [{"left": ind("MA", window=5), "op": "cross_up", "right": ind("MA", window=20)}]
+    a = compile_strategy(strategy("ma_cross", conds))
+    b = compile_strategy(strategy("rsi_ma", conds + [{"left": ind("RSI", period=14), "op": ">", "right": {"value": 50}}]))
+    ma, mb = evaluate_many([a, b], panel)
+    np.testing.assert_array_equal(ma, a.evaluate_panel(panel))
+    np.testing.assert_array_equal(mb, b.evaluate_panel(panel))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_pipeline import dataset, duckdb_io, hotstore
+
+class BarStore:
+    """
+    寫入舊格式每檔一個 parquet 的日線（預設寫到 PARQUET_DIR）。
+    close 預設 base, base+1, …；open/high/low 為 close/±1；cols 覆寫任意欄位（例如 open=close - 0.5）
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.parquet = root / "parquet"
+
+    def path(self, code, dirpath=None):
+        return (dirpath or self.parquet) / f"{code}.parquet"
+
+    def __call__(self, code, n=60, *, start="2024-01-01", base=100.0, close=None, skip=(), dirpath=None, **cols):
+        close = np.arange(n, dtype=float) + base if close is None else np.asarray(close, dtype=float)
+        df = pd.DataFrame({
+            "date": pd.bdate_range(start, periods=n), "open": close, "high": close + 1, "low": close - 1,
+            "close": close, "adj_close": close, "volume": np.full(n, 1000.0), "source": "test",
+        })
+        for k, v in cols.items():
+            df[k] = v
+        df = df.drop(index=list(skip)).reset_index(drop=True)
+        df.to_parquet(self.path(code, dirpath), index=False)
+        return df
+
+@pytest.fixture
+def bar_store(tmp_path, monkeypatch):
+    """資料集／舊檔／熱快取目錄都指到 tmp_path 底下，回傳舊檔寫入器"""
+    monkeypatch.setattr(dataset, "DATASET_DIR", tmp_path / "dataset")
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", tmp_path / "parquet")
+    monkeypatch.setattr(hotstore, "HOT_DIR", tmp_path / "hot")
+    (tmp_path / "parquet").mkdir()
+    return BarStore(tmp_path)
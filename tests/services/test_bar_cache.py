@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from app.services.data_pipeline import bar_cache, hotstore, ingest
+
+@pytest.fixture
+def store(bar_store, monkeypatch):
+    monkeypatch.setattr(bar_cache, "BAR_CACHE_BARS", 20)
+    bar_cache.clear(reset_stats=True)
+    yield bar_store
+    bar_cache.clear(reset_stats=True)
+
+def test_hits_slices_and_version_bump(store):
+    store("2330")
+    a = bar_cache.get_bars("2330")
+    assert len(a["close"]) == 20 and a["close"][-1] == 159.0
+    assert not a["close"].flags.writeable
+    b = bar_cache.get_bars("2330", last_n=5)
+    assert b["close"].tolist() == a["close"][-5:].tolist()
+    assert len(bar_cache.get_bars("2330", last_n=40)["close"]) == 40  # 超過快取深度：直接讀、不進快取
+    s = bar_cache.stats()
+    assert (s["hits"], s["misses"], s["loads"], s["entries"]) == (1, 1, 1, 1)
+
+    store("2330", base=1100.0)
+    assert bar_cache.get_bars("2330")["close"][-1] == 159.0  # 尚未 bump：仍是快取
+    bar_cache.bump(["2330"])
+    assert bar_cache.get_bars("2330")["close"][-1] == 1159.0
+    with pytest.raises(FileNotFoundError):
+        bar_cache.get_bars("9999")
+
+def test_single_flight_and_byte_budget(store, monkeypatch):
+    store("2330")
+    real = bar_cache._load
+    def slow(*args):
+        time.sleep(0.2)
+        return real(*args)
+    monkeypatch.setattr(bar_cache, "_load", slow)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(bar_cache.get_bars("2330"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(out) == 8 and all(x is out[0] for x in out)
+    s = bar_cache.stats()
+    assert s["loads"] == 1 and s["coalesced"] == 7
+
+    # 預算只容得下一檔：LRU 淘汰
+    for code in ("2317", "2454"):
+        store(code)
+    bar_cache.configure(s["bytes"])
+    try:
+        bar_cache.get_bars("2317")
+        bar_cache.get_bars("2454")
+        s = bar_cache.stats()
+        assert s["entries"] == 1 and s["evictions"] == 2 and s["bytes"] <= s["max_bytes"]
+    finally:
+        bar_cache.configure(bar_cache.DEFAULT_MAX_BYTES)
+
+def test_ingest_invalidates_cached_bars(store):
+    src = store.root / "vendor"
+    src.mkdir()
+    store("2330", 30, dirpath=src)
+    ingest.ingest(["2330"], vendor=ingest.local_vendor(src), end="2024-12-31")
+    hotstore.export(depth=20)
+    v1 = bar_cache.data_version("2330")
+    assert bar_cache.get_bars("2330")["close"][-1] == 129.0
+    store("2330", 40, dirpath=src)
+    ingest.ingest(["2330"], vendor=ingest.local_vendor(src), end="2024-12-31")
+    assert bar_cache.data_version("2330") != v1
+    assert bar_cache.get_bars("2330")["close"][-1] == 139.0  # 熱快取尚未重建：改讀 parquet
+
+def test_deep_read_skips_stale_hot_store(store):
+    src = store.root / "vendor"
+    src.mkdir()
+    store("2330", 10, dirpath=src)
+    ingest.ingest(["2330"], vendor=ingest.local_vendor(src), end="2024-12-31")
+    hotstore.export(depth=50)  # 只有 10 根 < depth：熱快取視為完整涵蓋
+    store("2330", 30, dirpath=src)
+    ingest.ingest(["2330"], vendor=ingest.local_vendor(src), end="2024-12-31")
+    out = bar_cache.get_bars("2330", last_n=25)  # 超過快取深度（20）的直接讀取也要避開過期的熱快取
+    assert len(out["close"]) == 25 and out["close"][-1] == 129.0
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app.services.data_pipeline import dataset, duckdb_io
+
+def bars(code, start="2023-12-01", n=40, base=100.0):
+    dates = pd.bdate_range(start, periods=n)
+    close = np.arange(n, dtype=float) + base
+    return pd.DataFrame({
+        "code": code, "date": dates, "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "adj_close": close, "volume": np.full(n, 1000.0), "source": "test",
+    })
+
+def use(tmp_path, monkeypatch):
+    root = tmp_path / "dataset"
+    monkeypatch.setattr(dataset, "DATASET_DIR", root)
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", tmp_path / "parquet")
+    (tmp_path / "parquet").mkdir()
+    return root
+
+def test_append_then_compact(tmp_path, monkeypatch):
+    root = use(tmp_path, monkeypatch)
+    a, b = bars("2330"), bars("2317", base=50.0)
+    written = dataset.append(pd.concat([a, b]))
+    assert sorted(p.parent.name for p in written) == ["year=2023", "year=2024"]
+    # 後寫的 delta 覆蓋同日資料
+    fix = a.iloc[[35]].assign(close=999.0)
+    dataset.append(fix)
+
+    before = duckdb_io.read_ohlcv("2330")
+    assert len(before) == 40 and before["close"].iloc[35] == 999.0
+
+    done = dataset.compact(row_group_size=2048)
+    assert sum(done.values()) == 80
+    assert not any(dataset.is_delta(p) for p in dataset.partition_files())
+    after = duckdb_io.read_ohlcv("2330")
+    pd.testing.assert_frame_equal(before, after)
+    assert list(after.columns) == ["date", "open", "high", "low", "close", "adj_open", "adj_high", "adj_low", "adj_close", "volume", "source"]
+
+    f = pq.ParquetFile(root / "year=2024" / dataset.BASE_NAME)
+    codes = f.read(columns=["code"]).column("code").to_pylist()
+    assert codes == sorted(codes)
+    stats = f.metadata.row_group(0).column(0).statistics
+    assert stats.has_min_max
+    assert dataset.compact() == {}  # 無 delta → 不重寫
+
+def test_reads_fall_back_to_legacy_files(tmp_path, monkeypatch):
+    use(tmp_path, monkeypatch)
+    dataset.append(bars("2330"))
+    legacy = bars("2317", base=50.0).drop(columns="code")
+    legacy.to_parquet(tmp_path / "parquet" / "2317.parquet", index=False)
+
+    assert duckdb_io.read_ohlcv("2317", last_n=5)["close"].tolist() == legacy["close"].iloc[-5:].tolist()
+    assert len(duckdb_io.read_ohlcv("2330", start="2024-01-01")) == len(bars("2330").query("date >= '2024-01-01'"))
+    # 資料集中有此代碼、區間內無資料 → 空表而非 FileNotFoundError
+    assert duckdb_io.read_ohlcv("2330", start="2030-01-01").empty
+
+    p = duckdb_io.read_ohlcv_many(["2330", "2317", "9999"], start="2023-12-15", layout="panel")
+    assert p.missing == ["9999"]
+    assert not np.isnan(p["close"][:, :2]).any()
+    out = duckdb_io.read_ohlcv_many(["2330", "2317"], last_n=7)
+    assert out.groupby("code").size().to_dict() == {"2317": 7, "2330": 7}
+
+def test_dataset_membership_rule_is_shared(tmp_path, monkeypatch):
+    use(tmp_path, monkeypatch)
+    dataset.append(bars("2330", start="2024-03-01"))
+    bars("2330", base=1.0).drop(columns="code").to_parquet(tmp_path / "parquet" / "2330.parquet", index=False)
+    # 代碼在資料集中：單檔與多檔都只讀資料集，區間內沒有 bar 就是空的（不混入舊檔）
+    assert duckdb_io.read_ohlcv("2330", end="2023-12-31").empty
+    assert len(duckdb_io.read_ohlcv_many(["2330"], end="2023-12-31")) == 0
+    assert duckdb_io.read_ohlcv_many(["2330"])["close"].min() == 100.0
+
+    reads = []
+    read_table = pq.read_table
+    monkeypatch.setattr(pq, "read_table", lambda f, **kw: reads.append(f) or read_table(f, **kw))
+    assert dataset.codes() == {"2330"} and reads == []  # 已快取
+    new = dataset.append(bars("2317", start="2024-03-01"))
+    assert dataset.codes() == {"2330", "2317"} and reads == new  # 只多讀新的 delta
+
+
+def test_import_legacy(tmp_path, monkeypatch):
+    root = use(tmp_path, monkeypatch)
+    for code, base in (("2330", 100.0), ("2317", 50.0)):
+        bars(code, base=base).drop(columns="code").to_parquet(tmp_path / "parquet" / f"{code}.parquet", index=False)
+    done = dataset.import_legacy(tmp_path / "parquet")
+    assert sum(done.values()) == 80
+    assert sorted(p.name for p in dataset.partition_files()) == [dataset.BASE_NAME] * 2
+    (tmp_path / "parquet" / "2330.parquet").unlink()
+    out = duckdb_io.read_ohlcv("2330", end="2023-12-29")
+    assert out["close"].tolist() == bars("2330").query("date <= '2023-12-29'")["close"].tolist()
+
+def test_dataset_numpy_output_and_panel(tmp_path, monkeypatch):
+    use(tmp_path, monkeypatch)
+    dataset.append(pd.concat([bars("2330"), bars("2317", base=50.0)]))
+    dataset.compact()
+    ref = duckdb_io.read_ohlcv("2330", last_n=10)
+    arr = duckdb_io.read_ohlcv("2330", last_n=10, output="numpy")
+    np.testing.assert_array_equal(arr["close"], ref["close"].to_numpy())
+    assert duckdb_io.read_ohlcv("2330", limit=4, output="arrow").num_rows == 4
+    long = duckdb_io.read_ohlcv_many(["2330", "2317"], last_n=5, output="numpy")
+    assert long["code"].tolist() == ["2317"] * 5 + ["2330"] * 5
+    assert duckdb_io.read_ohlcv("2330", start="2030-01-01", output="numpy")["close"].size == 0
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from app.services.data_pipeline import duckdb_io
+
+START = "2023-01-02"
+
+def test_read_ohlcv_last_n(bar_store):
+    full = bar_store("2330", 400, start=START)
+    out = duckdb_io.read_ohlcv("2330", last_n=30)
+    assert len(out) == 30
+    assert out["date"].is_monotonic_increasing
+    assert out["close"].iloc[-1] == full["close"].iloc[-1]
+
+    end = str(full["date"].iloc[199].date())
+    out = duckdb_io.read_ohlcv("2330", end=end, last_n=50)
+    assert len(out) == 50
+    assert out["close"].tolist() == full["close"].iloc[150:200].tolist()
+
+def test_lookback_start_covers_bars():
+    start = duckdb_io.lookback_start("2025-09-30", 100)
+    assert np.busday_count(start, "2025-10-01") >= 100
+
+def test_cursor_reused_per_thread(bar_store):
+    import threading
+    bar_store("2330", n=50, start=START)
+    assert duckdb_io.get_cursor() is duckdb_io.get_cursor()
+    seen, lens = [], []
+    def work():
+        seen.append(duckdb_io.get_cursor())
+        lens.append(len(duckdb_io.read_ohlcv("2330", start="2023-01-09", end="2023-01-13")))
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len({id(c) for c in seen}) == 4
+    assert lens == [5] * 4
+
+def test_configure_threads_and_quoted_path(bar_store, monkeypatch):
+    odd = bar_store.root / "o'dir"
+    odd.mkdir()
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", odd)
+    bar_store("2330", n=20, start=START, dirpath=odd)
+    cur = duckdb_io.get_cursor()
+    default = cur.execute("SELECT current_setting('threads')").fetchone()[0]
+    duckdb_io.configure(threads=2)
+    try:
+        # 既有 cursor 不被關閉／替換，設定即時生效
+        assert duckdb_io.get_cursor() is cur
+        assert cur.execute("SELECT current_setting('threads')").fetchone()[0] == 2
+        out = duckdb_io.read_ohlcv("2330", limit=3)
+        assert out["close"].tolist() == [100.0, 101.0, 102.0]
+    finally:
+        duckdb_io.configure(threads=0)
+    assert cur.execute("SELECT current_setting('threads')").fetchone()[0] == default
+
+def test_read_ohlcv_numpy_and_arrow_outputs(bar_store):
+    full = bar_store("2330", n=100, start=START)
+    ref = duckdb_io.read_ohlcv("2330", last_n=30)
+    arr = duckdb_io.read_ohlcv("2330", last_n=30, output="numpy")
+    assert list(arr) == ["date", "open", "high", "low", "close", "volume"]
+    for c in ("open", "high", "low", "close", "volume"):
+        assert arr[c].dtype == np.float64 and arr[c].flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(arr[c], ref[c].to_numpy(dtype=float))
+    assert (arr["date"].astype("datetime64[ns]") == ref["date"].to_numpy(dtype="datetime64[ns]")).all()
+
+    table = duckdb_io.read_ohlcv("2330", start="2023-01-09", limit=3, output="arrow")
+    assert table.num_rows == 3 and "source" not in table.column_names
+    assert table.column("close").to_pylist() == full["close"].iloc[5:8].tolist()
+    with pytest.raises(ValueError):
+        duckdb_io.read_ohlcv("2330", output="polars")
+
+def test_price_adjustment_switch(bar_store):
+    from app.services.data_pipeline import dataset
+    legacy = bar_store("2330", n=20, start=START).assign(adj_close=lambda d: d["close"] * 0.5)
+    legacy.to_parquet(bar_store.path("2330"), index=False)  # 舊檔只有 adj_close
+    dataset.append(legacy.assign(code="2317", adj_close=legacy["close"] * 0.8))
+
+    for code, f in (("2330", 0.5), ("2317", 0.8)):
+        raw = duckdb_io.read_ohlcv(code, output="numpy")
+        adj = duckdb_io.read_ohlcv(code, output="numpy", price_adjustment="adjusted")
+        for c in ("open", "high", "low", "close"):
+            np.testing.assert_allclose(adj[c], raw[c] * f)
+        np.testing.assert_array_equal(adj["volume"], raw["volume"])
+        df = duckdb_io.read_ohlcv(code, last_n=5, price_adjustment="adjusted")
+        np.testing.assert_allclose(df["open"], raw["open"][-5:] * f)
+    many = duckdb_io.read_ohlcv_many(["2330", "2317"], layout="panel", price_adjustment="adjusted")
+    np.testing.assert_allclose(many["close"][0], [legacy["close"][0] * 0.5, legacy["close"][0] * 0.8])
+    with pytest.raises(ValueError):
+        duckdb_io.read_ohlcv("2330", price_adjustment="backward")
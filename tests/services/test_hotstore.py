@@ -0,0 +1,46 @@
+import numpy as np
+
+from app.services.data_pipeline import duckdb_io, hotstore
+
+def setup(bar_store):
+    bar_store("2330", n=60)
+    bar_store("2317", start="2024-02-01", n=20)  # 少於 depth：整段歷史都在快取
+
+def test_export_and_single_reads_match_parquet(bar_store):
+    setup(bar_store)
+    meta = hotstore.export(depth=30)
+    assert meta["codes"] == ["2317", "2330"] and meta["counts"] == [20, 30]
+    store = hotstore.open_store()
+    assert store.array("close").shape == (2, 30) and isinstance(store.array("close"), np.memmap)
+
+    for kw in ({"last_n": 10}, {"start": "2024-02-20", "end": "2024-03-10"}, {"last_n": 5, "end": "2024-03-01"}):
+        hot = duckdb_io.read_ohlcv_hot("2330", output="numpy", **kw)
+        cold = duckdb_io.read_ohlcv("2330", output="numpy", **kw)
+        assert hot["date"].tolist() == cold["date"].tolist()
+        assert np.array_equal(hot["close"], cold["close"])
+
+    # 超出保存範圍 → 退回 parquet（結果仍完整）
+    assert len(duckdb_io.read_ohlcv_hot("2330")) == 60
+    assert len(duckdb_io.read_ohlcv_hot("2330", last_n=50, output="numpy")["close"]) == 50
+    assert len(duckdb_io.read_ohlcv_hot("2317", output="numpy")["close"]) == 20
+    df = duckdb_io.read_ohlcv_hot("2330", last_n=3)
+    assert list(df.columns) == ["date", "open", "high", "low", "close", "volume", "adj_open", "adj_high", "adj_low", "adj_close"]
+
+def test_many_hot_matches_parquet_and_rebuild_switches_version(bar_store):
+    setup(bar_store)
+    hotstore.export(depth=30)
+    codes = ["2330", "2317", "9999"]
+    hot = duckdb_io.read_ohlcv_many_hot(codes, last_n=25)
+    cold = duckdb_io.read_ohlcv_many(codes, last_n=25)
+    assert hot["code"].tolist() == cold["code"].tolist()
+    assert hot["close"].tolist() == cold["close"].tolist()
+    p = duckdb_io.read_ohlcv_many_hot(codes, last_n=40, layout="panel")  # 2330 超出 depth → 補讀 parquet
+    assert p.missing == ["9999"] and np.isfinite(p["close"][:, 0]).sum() == 40
+
+    first = hotstore.current()
+    bar_store("6505", n=10)
+    hotstore.export(depth=30)
+    assert hotstore.current() != first and first.exists()  # keep=1：保留前一版（已開啟的 memmap 可讀完）
+    hotstore.export(depth=30)
+    assert not first.exists()
+    assert "6505" in hotstore.open_store().codes
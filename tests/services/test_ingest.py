@@ -0,0 +1,236 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_pipeline import dataset, duckdb_io, ingest
+from app.services.data_pipeline.symbols import NoDataError, SymbolCache
+from app.services.data_pipeline.throttle import TokenBucket
+
+def vendor_bars(n=30, start="2024-03-01"):
+    dates = pd.bdate_range(start, periods=n)
+    close = np.arange(n, dtype=float) + 100
+    return pd.DataFrame({
+        "date": dates, "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "adj_close": close, "volume": np.full(n, 1000.0), "source": "fixture",
+    })
+
+def setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "DATASET_DIR", tmp_path / "dataset")
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", tmp_path / "parquet")
+    src = tmp_path / "vendor"
+    src.mkdir()
+    calls = []
+    local = ingest.local_vendor(src)
+    def vendor(code, start, end):
+        calls.append((code, start, end))
+        return local(code, start, end)
+    return src, vendor, calls
+
+def test_incremental_fetch_and_manifest(tmp_path, monkeypatch):
+    src, vendor, calls = setup(tmp_path, monkeypatch)
+    full = vendor_bars()
+    full.iloc[:20].to_parquet(src / "2330.parquet", index=False)
+    end = str(full["date"].iloc[19].date())
+
+    r = ingest.ingest(["2330"], vendor=vendor, end=end, overlap=3)
+    assert r[0]["status"] == "new" and r[0]["rows"] == 20
+    m = ingest.load_manifest()
+    assert m["2330"]["last_date"] == end
+    assert m["2330"]["tail_start"] == str(full["date"].iloc[17].date())
+
+    # 無新資料 → 只抓重疊段、不寫檔
+    files = dataset.partition_files()
+    r = ingest.ingest(["2330"], vendor=vendor, end=end, overlap=3)
+    assert r[0]["status"] == "unchanged"
+    assert calls[-1][1] == m["2330"]["tail_start"]
+    assert dataset.partition_files() == files
+
+    # 新 bar → 只追加 last_date 之後
+    full.to_parquet(src / "2330.parquet", index=False)
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=3)
+    assert r[0]["status"] == "appended" and r[0]["rows"] == 10
+    out = duckdb_io.read_ohlcv("2330")
+    assert out["close"].tolist() == full["close"].tolist()
+
+def test_revision_in_overlap_rewrites_window(tmp_path, monkeypatch):
+    src, vendor, _ = setup(tmp_path, monkeypatch)
+    full = vendor_bars()
+    full.to_parquet(src / "2330.parquet", index=False)
+    ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=5)
+    revised = full.copy()
+    revised.loc[27, ["close", "adj_close"]] = 555.0
+    revised.to_parquet(src / "2330.parquet", index=False)
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=5)
+    assert r[0]["status"] == "revised" and r[0]["rows"] == 5
+    assert duckdb_io.read_ohlcv("2330")["close"].iloc[27] == 555.0
+    dataset.compact()
+    out = duckdb_io.read_ohlcv("2330")
+    assert len(out) == 30 and out["close"].iloc[27] == 555.0
+
+def test_zero_overlap_fetches_only_new_bars(tmp_path, monkeypatch):
+    src, vendor, calls = setup(tmp_path, monkeypatch)
+    full = vendor_bars()
+    full.iloc[:20].to_parquet(src / "2330.parquet", index=False)
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=0)
+    assert r[0]["status"] == "new" and r[0]["rows"] == 20
+    m = ingest.load_manifest()["2330"]
+    assert m["last_date"] == str(full["date"].iloc[19].date()) and m["tail_start"] > m["last_date"]
+
+    full.to_parquet(src / "2330.parquet", index=False)
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=0)
+    assert r[0]["status"] == "appended" and r[0]["rows"] == 10
+    assert calls[-1][1] == m["tail_start"]  # 不重抓已入庫的 bar
+    assert duckdb_io.read_ohlcv("2330")["close"].tolist() == full["close"].tolist()
+
+    # 類 Yahoo 來源：區間內沒有新 bar（週末、休市）時拋 NoDataError → unchanged，已解析的代碼不降級
+    def yahoo_like(code, start, end):
+        df = vendor(code.split(".")[0], start, end)
+        if df.empty:
+            raise NoDataError(f"no data for {code}")
+        df.attrs["vendor_symbol"] = "2330.TW"
+        return df
+    yahoo_like.resolves_symbols = True
+    cache = SymbolCache(tmp_path / "symbols.json")
+    cache.resolve("2330", "2330.TW")
+    r = ingest.ingest(["2330"], vendor=yahoo_like, end="2024-12-31", overlap=0, symbols=cache)
+    assert (r[0]["status"], r[0]["error_class"]) == ("unchanged", None)
+    assert cache.symbol("2330") == "2330.TW" and not cache.get("2330").get("misses")
+
+
+def test_seed_from_store_and_errors(tmp_path, monkeypatch):
+    src, vendor, calls = setup(tmp_path, monkeypatch)
+    full = vendor_bars()
+    (tmp_path / "parquet").mkdir()
+    full.iloc[:25].to_parquet(tmp_path / "parquet" / "2317.parquet", index=False)
+    full.to_parquet(src / "2317.parquet", index=False)
+    r = ingest.ingest(["2317", "9999"], vendor=vendor, end="2024-12-31", overlap=5)
+    assert r[0]["status"] == "appended" and r[0]["rows"] == 5
+    assert dict((c, s) for c, s, _ in calls)["2317"] == str(full["date"].iloc[20].date())  # 由舊檔尾段起算
+    assert r[1]["status"] == "error" and "9999" in r[1]["error"]
+    assert r[1]["error_class"] == "NoDataError" and r[1]["attempts"] == 1  # 查無資料不重試
+    assert set(ingest.load_manifest()) == {"2317"}
+    assert not list((tmp_path / "dataset").glob(".*.tmp"))
+
+class StubVendor:
+    """
+    本機 stub：固定延遲、前 fail 次丟連線錯誤；可選擇支援多代碼下載。
+    gate（threading.Barrier）：前 gate.parties 個請求要同時在途才放行；peak 記錄同時在途的最大請求數
+    """
+
+    def __init__(self, latency=0.0, fail=0, gate=None):
+        self.latency, self.fail, self.gate = latency, fail, gate
+        self.calls, self.batches, self.lock = 0, [], threading.Lock()
+        self.active = self.peak = 0
+
+    def __call__(self, code, start, end):
+        with self.lock:
+            self.calls += 1
+            waiting = self.gate is not None and self.calls <= self.gate.parties
+            failing = self.fail > 0
+            self.fail -= 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if waiting:
+                self.gate.wait()
+            time.sleep(self.latency)
+        finally:
+            with self.lock:
+                self.active -= 1
+        if failing:
+            raise ConnectionError("stub: connection reset")
+        return vendor_bars().assign(close=float(code))
+
+class BatchVendor(StubVendor):
+    def fetch_many(self, codes, start, end):
+        self.batches.append(list(codes))
+        return {c: self(c, start, end) for c in codes if c != "6488"}  # 6488 批次中缺漏
+
+def test_concurrent_ingest_throughput(tmp_path, monkeypatch):
+    setup(tmp_path, monkeypatch)
+    codes = [str(1000 + i) for i in range(20)]
+    # 前 10 個請求須同時在途才放行：循序執行會在 barrier 逾時（BrokenBarrierError → status="error"）
+    stub = StubVendor(gate=threading.Barrier(10, timeout=10))
+    t0 = time.perf_counter()
+    r = ingest.ingest(codes, vendor=stub, end="2024-12-31", workers=10, rate=1000, burst=100, batch=0)
+    elapsed = time.perf_counter() - t0
+    assert [x["code"] for x in r] == codes
+    assert all(x["status"] == "new" and x["attempts"] == 1 for x in r)
+    assert stub.peak == 10 and stub.calls == 20
+    s = ingest.summarize(r, elapsed)
+    assert s["status"] == {"new": 20} and s["rows"] == 20 * 30 and s["symbols_per_s"] > 0
+    assert duckdb_io.read_ohlcv("1007")["close"].iloc[0] == 1007.0
+
+def test_ingest_writes_one_delta_per_partition(tmp_path, monkeypatch):
+    src, vendor, _ = setup(tmp_path, monkeypatch)
+    codes = [str(1000 + i) for i in range(12)]
+    for c in codes:
+        vendor_bars(start="2023-12-15").to_parquet(src / f"{c}.parquet", index=False)  # 跨 2023/2024 兩個分割
+    r = ingest.ingest(codes, vendor=vendor, end="2024-12-31", workers=4)
+    assert all(x["status"] == "new" for x in r)
+    files = dataset.partition_files()
+    assert sorted(p.parent.name for p in files) == ["year=2023", "year=2024"]
+    assert all(dataset.is_delta(p) for p in files)
+    assert sorted(ingest.load_manifest()) == codes
+    assert len(duckdb_io.read_ohlcv_many(codes)) == 12 * 30
+
+    # 超過 flush_rows 即先寫出一批
+    more = [str(2000 + i) for i in range(4)]
+    for c in more:
+        vendor_bars().to_parquet(src / f"{c}.parquet", index=False)
+    ingest.ingest(more, vendor=vendor, end="2024-12-31", workers=1, flush_rows=60)
+    assert len(dataset.partition_files()) == 2 + 2
+
+
+def test_retry_backoff_and_batches(tmp_path, monkeypatch):
+    setup(tmp_path, monkeypatch)
+    monkeypatch.setattr("app.services.data_pipeline.throttle.backoff_delay", lambda *a, **k: 0.0)
+    stub = StubVendor(fail=2)
+    r = ingest.ingest(["2330"], vendor=stub, end="2024-12-31", workers=1, retries=3, batch=0)
+    assert r[0]["status"] == "new" and r[0]["attempts"] == 3 and r[0]["error_class"] is None
+    r = ingest.ingest(["2317"], vendor=StubVendor(fail=9), end="2024-12-31", retries=2, batch=0)
+    assert r[0]["status"] == "error" and r[0]["attempts"] == 3 and r[0]["error_class"] == "ConnectionError"
+
+    batch = BatchVendor()
+    codes = ["2454", "2603", "2609", "6488", "2882"]
+    r = ingest.ingest(codes, vendor=batch, end="2024-12-31", batch=2)
+    assert sorted(map(len, batch.batches)) == [1, 2, 2]
+    assert all(x["status"] == "new" for x in r)
+    assert batch.calls == 5  # 4 檔來自批次、6488 逐檔補抓
+
+def test_token_bucket_limits_rate():
+    now = [0.0]
+    slept = []
+    def sleep(s):
+        slept.append(s)
+        now[0] += s
+    bucket = TokenBucket(rate=10, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(6):
+        bucket.acquire()
+    assert now[0] == pytest.approx(0.4)  # 前 2 個用 burst，其餘每 0.1 秒一個
+
+def test_corporate_action_rescales_history(tmp_path, monkeypatch):
+    src, vendor, _ = setup(tmp_path, monkeypatch)
+    full = vendor_bars(n=40)
+    full.iloc[:30].to_parquet(src / "2330.parquet", index=False)
+    ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=5)
+
+    # 第 32 根除息：之前所有 bar 的 adj_close 乘 0.9（供應商重算整段歷史）
+    div = full.copy()
+    div.loc[:31, "adj_close"] = div.loc[:31, "close"] * 0.9
+    div.to_parquet(src / "2330.parquet", index=False)
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=5)
+    assert r[0]["status"] == "revised" and r[0]["rescaled"] == 25  # 重疊段之前的歷史
+    adj = duckdb_io.read_ohlcv("2330", output="numpy", price_adjustment="adjusted")
+    raw = duckdb_io.read_ohlcv("2330", output="numpy")
+    np.testing.assert_allclose(adj["close"], div["adj_close"].to_numpy())
+    np.testing.assert_allclose(adj["open"][:32], raw["open"][:32] * 0.9)
+    np.testing.assert_allclose(adj["high"][32:], raw["high"][32:])
+    np.testing.assert_array_equal(raw["close"], full["close"].to_numpy())
+
+    # 因子沒變：不重算歷史
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", overlap=5)
+    assert r[0]["status"] == "unchanged" and "rescaled" not in r[0]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from app.services.data_pipeline import duckdb_io
+
+def test_long_table_matches_single_reads(bar_store):
+    bar_store("2330")
+    bar_store("2317", start="2024-01-15", n=40)
+    out = duckdb_io.read_ohlcv_many(["2330", "2317", "9999"], start="2024-01-10", end="2024-02-29")
+    assert list(out.columns) == ["code", "date", "open", "high", "low", "close", "volume"]
+    assert sorted(out["code"].unique()) == ["2317", "2330"]
+    for code in ("2330", "2317"):
+        one = duckdb_io.read_ohlcv(code, start="2024-01-10", end="2024-02-29")
+        got = out[out["code"] == code]
+        assert got["date"].tolist() == one["date"].tolist()
+        assert got["close"].tolist() == one["close"].tolist()
+
+def test_panel_aligns_dates_and_fills_nan(bar_store):
+    a = bar_store("2330", n=30)
+    bar_store("2317", n=30, skip=(5, 6))   # 停牌兩天
+    bar_store("6505", start="2024-01-15", n=20)  # 較晚上市
+    p = duckdb_io.read_ohlcv_many(["2317", "2330", "6505", "9999"], layout="panel")
+    assert p.codes == ["2317", "2330", "6505", "9999"]
+    assert p.missing == ["9999"]
+    assert p.shape == (30, 4)
+    assert p.dates.equals(pd.DatetimeIndex(a["date"]))
+    close = p["close"]
+    assert np.isnan(close[5:7, 0]).all() and not np.isnan(close[7:, 0]).any()
+    assert np.isnan(close[:10, 2]).all() and not np.isnan(close[10:, 2]).any()
+    assert np.isnan(close[:, 3]).all()
+    np.testing.assert_array_equal(close[:, 1], a["close"].to_numpy())
+    assert len(p.frame("6505")) == 20
+
+def test_last_n_per_symbol(bar_store):
+    bar_store("2330", n=200)
+    bar_store("2317", start="2023-01-02", n=200)  # 資料停在較早日期
+    out = duckdb_io.read_ohlcv_many(["2330", "2317"], last_n=15)
+    assert out.groupby("code").size().to_dict() == {"2317": 15, "2330": 15}
+    for code in ("2330", "2317"):
+        one = duckdb_io.read_ohlcv(code, last_n=15)
+        assert out[out["code"] == code]["date"].tolist() == one["date"].tolist()
+
+def test_panel_on_given_dates(bar_store):
+    bar_store("2330", n=10)
+    axis = pd.bdate_range("2023-12-28", periods=8)
+    p = duckdb_io.read_ohlcv_many(["2330"], layout="panel", dates=axis)
+    assert p.dates.equals(axis)
+    assert np.isnan(p["close"][:2, 0]).all()
+    empty = duckdb_io.read_ohlcv_many(["9999"], layout="panel", dates=axis)
+    assert empty.missing == ["9999"] and np.isnan(empty["close"]).all()
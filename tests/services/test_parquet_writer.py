@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app.services.data_pipeline import dataset, duckdb_io, parquet_writer
+
+def make_rows(codes=("2330", "2317"), n=300):
+    dates = pd.bdate_range("2023-01-02", periods=n)
+    parts = []
+    for k, code in enumerate(codes):
+        close = np.arange(n, dtype=float) + 100 * (k + 1)
+        parts.append(pd.DataFrame({"code": code, "date": dates, "open": close, "high": close + 1, "low": close - 1,
+                                   "close": close, "adj_close": close, "volume": 1000.0, "source": "test"}))
+    return pd.concat(parts, ignore_index=True)
+
+def test_writer_sorts_and_declares_layout(tmp_path):
+    rows = make_rows().sample(frac=1.0, random_state=0)
+    path = parquet_writer.write_ohlcv(rows, tmp_path / "x.parquet", row_group_size=100)
+    back = pd.read_parquet(path)
+    assert back[["code", "date"]].equals(back.sort_values(["code", "date"])[["code", "date"]].reset_index(drop=True))
+    assert parquet_writer.sorted_by(path) == ("code", "date")
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_row_groups == 6
+    rg = meta.row_group(0)
+    cols = {rg.column(i).path_in_schema: rg.column(i) for i in range(rg.num_columns)}
+    assert cols["close"].compression == "ZSTD" and cols["code"].compression == "SNAPPY"
+    assert "RLE_DICTIONARY" in cols["source"].encodings and cols["date"].statistics.has_min_max
+    assert [c.column_index for c in rg.sorting_columns] == [0, 1]
+    assert list(tmp_path.iterdir()) == [path]  # 沒有殘留暫存檔
+
+def test_sorted_reads_skip_order_by(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "DATASET_DIR", tmp_path / "dataset")
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", tmp_path / "parquet")
+    rows = make_rows()
+    dataset.append(rows)
+    expect = [duckdb_io.read_ohlcv("2317", last_n=30, output="numpy")["close"].tolist(),
+              duckdb_io.read_ohlcv("2317", last_n=30, limit=5)["close"].tolist()]
+    tails = []
+    real = duckdb_io._tail
+    monkeypatch.setattr(duckdb_io, "_tail", lambda *a: tails.append(a[1]) or real(*a))
+    dataset.compact()  # 無 delta、主檔宣告排序 → 不排序、取回後截尾
+    assert all(parquet_writer.sorted_by(p) == ("code", "date") for p in dataset.partition_files())
+    assert duckdb_io.read_ohlcv("2317", last_n=30, output="numpy")["close"].tolist() == expect[0]
+    assert duckdb_io.read_ohlcv("2317", last_n=30, limit=5)["close"].tolist() == expect[1]
+    assert tails == [30, 30]
+
+    # 舊佈局單檔：writer 寫的檔案同樣省略排序
+    (tmp_path / "parquet").mkdir()
+    one = rows[rows["code"] == "2330"].drop(columns="code")
+    parquet_writer.write_ohlcv(one, tmp_path / "parquet" / "6505.parquet")
+    out = duckdb_io.read_ohlcv("6505", last_n=10, limit=3, output="numpy")
+    assert out["close"].tolist() == one["close"].iloc[-10:-7].tolist()
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.indicators import registry
+from app.services.data_pipeline import bar_cache, duckdb_io, resample
+
+@pytest.fixture
+def store(bar_store):
+    resample.clear(reset_stats=True)
+    yield bar_store
+    resample.clear(reset_stats=True)
+
+def test_resample_matches_pandas(store):
+    df = store("2330", 70).set_index("date")
+    daily = duckdb_io.read_ohlcv("2330", output="numpy")
+    for tf, rule in (("1W", "W-SUN"), ("1m", "ME")):
+        out = resample.resample(daily, tf)
+        ref = df.resample(rule).agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}).dropna()
+        for col in ("open", "high", "low", "close", "volume"):
+            assert out[col].tolist() == ref[col].tolist()
+        assert pd.DatetimeIndex(out["date"]).to_period(rule[0]).tolist() == ref.index.to_period(rule[0]).tolist()
+    assert "1w" in registry.timeframes("ma")
+    weekly = resample.get_resampled("2330", "1w")
+    ma = registry.calc("ma", weekly, {"window": 2}, timeframe="1W")
+    assert ma[-1] == (weekly["close"][-1] + weekly["close"][-2]) / 2
+
+def test_cached_aggregates_append_incrementally(store):
+    store("2330", 28)  # 最後一週只到週三
+    first = resample.get_resampled("2330", "1w")
+    assert resample.get_resampled("2330", "1w") is first
+    store("2330", 33)  # 補完該週並跨入下一週
+    bar_cache.bump(["2330"])
+    after = resample.get_resampled("2330", "1w")
+    full = resample.resample(duckdb_io.read_ohlcv("2330", output="numpy"), "1w")
+    assert all(after[k].tolist() == full[k].tolist() for k in full)
+    s = resample.stats()
+    assert (s["builds"], s["appends"]) == (1, 1)
+
+    # 歷史被改寫（接縫收盤價不同）→ 整段重建
+    df = store("2330", 33)
+    df["close"] += 1.0
+    df.to_parquet(store.path("2330"), index=False)
+    bar_cache.bump(["2330"])
+    assert resample.get_resampled("2330", "1m", last_n=1)["close"][-1] == df["close"].iloc[-1]
+    assert resample.get_resampled("2330", "1w")["close"].tolist()[0] == df["close"].iloc[4]
+    assert resample.stats()["builds"] == 3
+
+def test_calc_resamples_daily_input(store):
+    df = store("2330", 70)
+    daily = duckdb_io.read_ohlcv("2330", output="numpy")
+    weekly = resample.get_resampled("2330", "1w")
+    ref = registry.calc("ema", weekly, {"window": 3}, timeframe="1w")
+    np.testing.assert_array_equal(registry.calc("ema", daily, {"window": 3}, timeframe="1w"), ref)
+    s = registry.calc("ema", df.set_index("date"), {"window": 3}, timeframe="1W")
+    np.testing.assert_array_equal(s.to_numpy(), ref)
+    assert s.index.tolist() == pd.DatetimeIndex(weekly["date"]).tolist()
+    panel = {c: np.column_stack([daily[c], daily[c]]) for c in ("open", "high", "low", "close", "volume")}
+    out = registry.calc_panel("ema", panel, {"window": 3}, timeframe="1w", dates=daily["date"])
+    assert out.shape == (len(ref), 2)
+    np.testing.assert_array_equal(out[:, 1], ref)
+    with pytest.raises(ValueError):
+        registry.calc("ema", {k: v for k, v in daily.items() if k != "date"}, {"window": 3}, timeframe="1w")
+    with pytest.raises(ValueError):
+        registry.calc_panel("ema", panel, {"window": 3}, timeframe="1m")
+
+def test_revised_bar_before_seam_rebuilds(store):
+    store("2330", 28)  # 最後一週只到週三；接縫為前一週週五（第 24 根）
+    resample.get_resampled("2330", "1w")
+    df = store("2330", 33)
+    df.loc[23, ["high", "close"]] = [500.0, 499.0]  # 接縫前的週四被修正（ingest 重疊窗內）
+    df.to_parquet(store.path("2330"), index=False)
+    bar_cache.bump(["2330"])
+    after = resample.get_resampled("2330", "1w")
+    full = resample.resample(duckdb_io.read_ohlcv("2330", output="numpy"), "1w")
+    assert after["high"][-3] == 500.0
+    assert all(after[k].tolist() == full[k].tolist() for k in full)
+    assert (resample.stats()["builds"], resample.stats()["appends"]) == (2, 0)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.runners import scan_runner
+from app.services.data_pipeline import bar_cache
+
+def sawtooth(n=80, step=1.0):
+    i = np.arange(n, dtype=float)
+    return 100 + step * i + 0.8 * (-1) ** i  # 鋸齒：漲跌都有，RSI 不會卡在 50
+
+@pytest.fixture
+def store(bar_store):
+    bar_cache.clear(reset_stats=True)
+    bar_store("2330", 80, close=sawtooth(step=1.0))
+    bar_store("2317", 80, close=sawtooth(step=-0.5))
+    yield bar_store
+    scan_runner.shutdown()
+    bar_cache.clear(reset_stats=True)
+
+def test_indicator_and_strategy_on_real_bars(store):
+    out = scan_runner.run_scan(["2330", "2317", "9999"], indicator="ma", params={"window": 3})
+    assert [r["symbol"] for r in out] == ["2330", "2317", "9999"]
+    assert [r["signal_type"] for r in out] == ["buy", "sell", "noop"]
+    assert out[0]["meta"]["last_date"] == str(pd.bdate_range("2024-01-01", periods=80)[-1].date())
+    assert out[0]["meta"]["bars"] == 4  # window 3 的 warm-up ＋ 最後一根
+    assert out[2]["meta"]["reason"] == "no_data"
+
+    strategy = {
+        "name": "uptrend", "version": "1.0.0", "type": "screen", "timeframe": "1d", "logic": "AND",
+        "conditions": [
+            {"left": {"series": "close"}, "op": ">", "right": {"indicator": "MA", "params": {"window": 20}}},
+            {"left": {"indicator": "RSI", "params": {"period": 14}}, "op": ">", "right": {"value": 50}},
+        ],
+    }
+    out = scan_runner.run_scan(["2330", "2317"], strategy=strategy)
+    assert [(r["signal_type"], r["strength"]) for r in out] == [("buy", 1.0), ("noop", 0.0)]
+    assert out[0]["meta"]["strategy"] == "uptrend"
+
+def test_process_pool_matches_inline(store, monkeypatch):
+    started = []
+    pool_cls = scan_runner.ProcessPoolExecutor
+
+    def spy(*args, **kw):
+        started.append(kw["mp_context"].get_start_method())
+        return pool_cls(*args, **kw)
+
+    monkeypatch.setattr(scan_runner, "ProcessPoolExecutor", spy)
+    for i in range(4):
+        store(f"{1000 + i}", 80, close=sawtooth(step=(-1) ** i))
+    codes = ["2330", "2317", "1000", "1001", "1002", "1003", "9999"]
+    inline = scan_runner.run_scan(codes, indicator="ema", params={"window": 5}, timeframe="1W", workers=1)
+    pooled = scan_runner.run_scan(codes, indicator="ema", params={"window": 5}, timeframe="1W",
+                                  workers=2, chunk_size=2)
+    assert pooled == inline
+    assert started and started[0] in ("forkserver", "spawn")  # 不 fork 呼叫端（API 行程有背景執行緒）
+    # 行程池跨 run_scan 共用（不每批重建）；shutdown 後下次重新建立
+    again = scan_runner.run_scan(codes, indicator="ema", params={"window": 5}, timeframe="1W",
+                                 workers=2, chunk_size=2)
+    assert again == inline and len(started) == 1
+    scan_runner.shutdown()
+    scan_runner.run_scan(codes[:4], indicator="ma", workers=2, chunk_size=2)
+    assert len(started) == 2
+    assert [r["signal_type"] for r in pooled[:6]] == ["buy", "sell", "buy", "sell", "buy", "sell"]
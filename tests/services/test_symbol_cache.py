@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.services import resolve
+from app.services.data_pipeline import dataset, duckdb_io, ingest
+from app.services.data_pipeline.symbols import NoDataError, SymbolCache, as_vendor_candidates
+
+def bars(n=10):
+    close = np.arange(n, dtype=float) + 100
+    return pd.DataFrame({
+        "date": pd.bdate_range("2024-03-01", periods=n), "open": close, "high": close, "low": close,
+        "close": close, "adj_close": close, "volume": np.full(n, 1000.0), "source": "fixture",
+    })
+
+class SuffixVendor:
+    """模擬 Yahoo：純數字代碼依序試 .TW/.TWO，上櫃代碼 .TW 查無資料；記錄每次實際請求的代碼"""
+    resolves_symbols = True
+    OTC = {"6488"}
+    LISTED = {"2330"}
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, code, start, end):
+        for sym in as_vendor_candidates(code):
+            self.requests.append(sym)
+            core, suffix = sym.split(".")
+            if (suffix == "TW" and core in self.LISTED) or (suffix == "TWO" and core in self.OTC):
+                df = bars()
+                df = df[df["date"] >= pd.Timestamp(start)].reset_index(drop=True)
+                df.attrs["vendor_symbol"] = sym
+                return df
+        raise NoDataError(f"no data for {code}")
+
+def test_cache_roundtrip_and_negative_ttl(tmp_path):
+    path = tmp_path / "_vendor_symbols.json"
+    cache = SymbolCache(path)
+    assert cache.candidates("6488") == ["6488.TW", "6488.TWO"]
+    assert not cache.save()  # 無異動不寫檔
+    cache.resolve("6488", "6488.TWO")
+    # 未解析的代碼連續 MISS_THRESHOLD（3）次查無資料才進負快取
+    assert [cache.mark_missing("1101") for _ in range(3)] == [False, False, True]
+    assert cache.save()
+
+    again = SymbolCache(path)
+    assert again.candidates("6488") == ["6488.TWO"]
+    assert again.get("6488")["market"] == "TPEx"
+    assert again.is_missing("1101") and again.symbol("1101") is None
+    later = datetime.now(timezone.utc) + timedelta(days=30)
+    assert not again.is_missing("1101", now=later, ttl_days=7)  # 過期後重新查詢
+    assert again.mark_missing("1101")  # 已達門檻：過期後再查無資料立即重新記入
+    assert again.get("1101")["misses"] == 4
+
+def test_resolved_code_survives_empty_response(tmp_path):
+    cache = SymbolCache(tmp_path / "_vendor_symbols.json")
+    cache.resolve("2330", "2330.TW")
+    for _ in range(5):  # 來源暫時異常（yfinance 吞掉錯誤回空表）→ 只累計 misses，不降級
+        assert not cache.mark_missing("2330")
+    assert not cache.is_missing("2330") and cache.symbol("2330") == "2330.TW"
+    assert cache.get("2330")["misses"] == 5
+    cache.resolve("2330", "2330.TW")
+    assert "misses" not in cache.get("2330")  # 恢復後歸零（重新連續計算）
+
+def test_ingest_uses_resolved_symbol_and_skips_missing(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "DATASET_DIR", tmp_path / "dataset")
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", tmp_path / "parquet")
+    vendor = SuffixVendor()
+    r = ingest.ingest(["2330", "6488", "9999"], vendor=vendor, end="2024-12-31", batch=0)
+    assert [x["status"] for x in r] == ["new", "new", "error"]
+    assert r[2]["error_class"] == "NoDataError"
+    assert sorted(vendor.requests) == ["2330.TW", "6488.TW", "6488.TWO", "9999.TW", "9999.TWO"]
+
+    # 已解析者直接打命中的尾碼；9999 連續查無資料 3 次後進負快取，之後不發請求
+    for status in ("error", "error", "skipped"):
+        vendor.requests.clear()
+        r = ingest.ingest(["2330", "6488", "9999"], vendor=vendor, end="2024-12-31", batch=0)
+        assert [x["status"] for x in r] == ["unchanged", "unchanged", status]
+    assert sorted(vendor.requests) == ["2330.TW", "6488.TWO"]
+
+    # 已解析的代碼一次查無資料（來源暫時異常）→ 仍照常請求，不被略過
+    vendor.LISTED = set()
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", batch=0)
+    vendor.LISTED = {"2330"}
+    r = ingest.ingest(["2330"], vendor=vendor, end="2024-12-31", batch=0)
+    assert r[0]["status"] == "unchanged"
+
+    # resolve.py 讀同一份對照
+    assert resolve.vendor_symbol("6488") == "6488.TWO"
+    assert resolve.market_of("2330") == "TWSE" and resolve.market_of("9999") is None
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from app.services.data_pipeline import trading_calendar
+from app.services.data_pipeline.panel import long_to_panel
+from app.services.data_pipeline.trading_calendar import TradingCalendar
+
+def test_calendar_queries():
+    cal = TradingCalendar(["2025-10-10"])
+    assert cal.days.dtype == np.int32 and np.all(np.diff(cal.days) > 0)
+    assert not cal.is_trading_day("2025-10-10") and not cal.is_trading_day("2025-10-11")
+    assert cal.next_trading_day("2025-10-09") == np.datetime64("2025-10-13")
+    assert cal.next_trading_day("2025-10-09", inclusive=True) == np.datetime64("2025-10-09")
+    assert cal.prev_trading_day("2025-10-13") == np.datetime64("2025-10-09")
+    assert cal.offset("2025-10-12", 0) == np.datetime64("2025-10-09")  # 非交易日先退回
+    assert cal.offset("2025-10-14", -2) == np.datetime64("2025-10-09")
+    assert cal.count("2025-10-06", "2025-10-17") == 9
+    idx = cal.index_of(pd.to_datetime(["2025-10-09", "2025-10-10", "2025-10-13"]))
+    assert idx[1] == -1 and idx[2] == idx[0] + 1
+
+def test_outside_range_falls_back_to_weekdays():
+    cal = TradingCalendar(["2025-10-10"], first="2025-10-01", last="2025-10-31")
+    # 範圍外：同 np.busday_offset，不報錯
+    assert cal.offset("2025-10-14", -20) == np.busday_offset("2025-10-01", -12)
+    assert cal.offset("2025-10-14", -20) == np.datetime64("2025-09-15")  # 10/14 為範圍內第 9 個交易日
+    assert cal.offset("2025-10-30", 3) == np.datetime64("2025-11-04")
+    assert cal.offset("1985-06-09", -5) == np.busday_offset("1985-06-09", -5, roll="backward")
+    assert cal.next_trading_day("2025-11-07") == np.datetime64("2025-11-10")
+    assert cal.next_trading_day("2025-11-08", inclusive=True) == np.datetime64("2025-11-10")
+    assert cal.prev_trading_day("2025-09-29") == np.datetime64("2025-09-26")
+    assert cal.is_trading_day("2025-11-03") and not cal.is_trading_day("2025-11-01")
+    assert cal.count("2025-09-29", "2025-11-04") == 2 + 22 + 2
+    from app.services.data_pipeline import duckdb_io
+    assert duckdb_io.lookback_start("1991-01-02", 100_000) < "1700-01-01"
+
+def test_holiday_file_and_panel_alignment(tmp_path, monkeypatch):
+    path = tmp_path / "holidays.csv"
+    path.write_text("# test\ndate,name\n2025-10-10,國慶日\n", encoding="utf-8")
+    monkeypatch.setenv("TRADING_HOLIDAYS_FILE", str(path))
+    cal = trading_calendar.get_calendar()
+    assert cal is trading_calendar.get_calendar() and not cal.is_trading_day("2025-10-10")
+
+    long = {
+        "code": np.array(["A", "B", "A", "B"]),
+        "date": np.array(["2025-10-14", "2025-10-09", "2025-10-09", "2025-10-15"], dtype="datetime64[ns]"),
+        "close": np.array([1.0, 2.0, 3.0, 4.0]),
+    }
+    p = long_to_panel(long, ["A", "B"], fields=["close"])
+    assert [str(d.date()) for d in p.dates] == ["2025-10-09", "2025-10-14", "2025-10-15"]
+    assert p["close"][:, 0].tolist()[:2] == [3.0, 1.0] and p["close"][:, 1].tolist()[::2] == [2.0, 4.0]
@@ -0,0 +1,93 @@
+import importlib
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_pipeline import dataset, duckdb_io, ingest
+
+class YFRateLimitError(Exception):
+    pass
+
+class YFPricesMissingError(Exception):
+    pass
+
+class FakeYF:
+    """
+    模擬 yfinance：Ticker.history(raise_errors=True) 會拋錯；yf.download 吞掉錯誤、
+    只記在 shared._ERRORS 並回空值（與真實 yfinance 相同）。limited[sym] = 還要限流幾次
+    """
+    LISTED = {"2330.TW", "2317.TW"}
+
+    def __init__(self, limited=None):
+        self.limited = dict(limited or {})
+        self.shared = SimpleNamespace(_ERRORS={})
+        self.requests = []
+
+    def _bars(self, start):
+        dates = pd.bdate_range(start, periods=5, tz="Asia/Taipei")
+        close = np.arange(5, dtype=float) + 100
+        return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Adj Close": close,
+                             "Volume": np.full(5, 1000.0)}, index=dates)
+
+    def _get(self, sym, start):
+        self.requests.append(sym)
+        if self.limited.get(sym, 0) > 0:
+            self.limited[sym] -= 1
+            raise YFRateLimitError("Too Many Requests. Rate limited. Try after a while.")
+        if sym not in self.LISTED:
+            raise YFPricesMissingError(f"${sym}: possibly delisted; no price data found")
+        return self._bars(start)
+
+    def Ticker(self, sym):
+        return SimpleNamespace(history=lambda start, end, raise_errors=False, **kw: self._get(sym, start))
+
+    def download(self, tickers, start, end, **kw):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self.shared._ERRORS = {}
+        frames = {}
+        for sym in tickers:
+            try:
+                frames[sym] = self._get(sym, start)
+            except Exception as e:
+                self.shared._ERRORS[sym] = repr(e)
+                frames[sym] = self._bars(start) * np.nan
+        return pd.concat(frames, axis=1)
+
+def use(tmp_path, monkeypatch, yf):
+    monkeypatch.setattr(dataset, "DATASET_DIR", tmp_path / "dataset")
+    monkeypatch.setattr(duckdb_io, "PARQUET_DIR", tmp_path / "parquet")
+    monkeypatch.setattr("app.services.data_pipeline.throttle.backoff_delay", lambda *a, **k: 0.0)
+    monkeypatch.setitem(sys.modules, "yfinance", yf)
+    # 以本測試的 fake 重新載入（測試結束時移除，不留給其他測試）
+    name = "app.services.data_pipeline.yahoo_ingest"
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    mod = importlib.import_module(name)
+    monkeypatch.setitem(sys.modules, name, mod)
+    return mod
+
+def test_swallowed_rate_limit_is_retried(tmp_path, monkeypatch):
+    yf = FakeYF(limited={"2330.TW": 2})
+    use(tmp_path, monkeypatch, yf)
+    r = ingest.ingest(["2330", "9999"], end="2024-12-31", rate=1000, retries=3, batch=0)
+    assert (r[0]["status"], r[0]["attempts"], r[0]["rows"]) == ("new", 3, 5)
+    # 查無資料：不重試、不與限流混淆
+    assert (r[1]["status"], r[1]["error_class"], r[1]["attempts"]) == ("error", "NoDataError", 1)
+
+def test_batch_download_errors_are_not_missing(tmp_path, monkeypatch):
+    yf = FakeYF(limited={"2317.TW": 1})
+    yahoo = use(tmp_path, monkeypatch, yf)
+    got = yahoo.fetch_daily_ohlcv_many(["2330", "2317"], "2024-03-01", "2024-12-31")
+    assert list(got) == ["2330"]
+    assert "2317.TWO" not in yf.requests  # 限流的代碼不當成上市查無資料去試 .TWO
+
+    yf.limited = {"2330.TW": 1, "2317.TW": 1}
+    with pytest.raises(yahoo.YahooDownloadError):
+        yahoo.fetch_daily_ohlcv_many(["2330", "2317"], "2024-03-01", "2024-12-31")
+
+    # 經由 ingest：整批失敗 → 退避重試；部分失敗 → 該檔逐檔補抓
+    yf.limited = {"2330.TW": 1, "2317.TW": 2}
+    r = ingest.ingest(["2330", "2317"], end="2024-12-31", rate=1000, retries=3, batch=50)
+    assert [x["status"] for x in r] == ["new", "new"]
@@ -0,0 +1,104 @@
+import json, sys, os, argparse, tempfile, time
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import benchlib
+from app.services.data_pipeline import dataset, duckdb_io
+
+def make_rows(symbols: int, years: int, seed: int) -> pd.DataFrame:
+    """決定性合成長表：symbols 檔 × years 年的平日 bar"""
+    dates = pd.bdate_range(f"{2025 - years}-01-01", f"{2024}-12-31")
+    panel = benchlib.synthetic_ohlcv(len(dates), symbols, seed=seed)
+    codes = np.array([f"{1000 + i:04d}" for i in range(symbols)])
+    return pd.DataFrame({
+        "code": np.repeat(codes, len(dates)),
+        "date": np.tile(dates.to_numpy(), symbols),
+        **{c: v.T.ravel() for c, v in panel.items()},
+        "source": "bench",
+    })
+
+def row_groups(root: Path, code: str, year: int):
+    """主檔 row group 數與 code 統計量涵蓋目標代碼者（= 剪枝後需讀取的 row group）"""
+    meta = pq.ParquetFile(root / f"year={year}" / dataset.BASE_NAME).metadata
+    idx = meta.schema.names.index("code")
+    hit = 0
+    for i in range(meta.num_row_groups):
+        st = meta.row_group(i).column(idx).statistics
+        if st is None or not st.has_min_max or st.min <= code <= st.max:
+            hit += 1
+    return meta.num_row_groups, hit
+
+def timed(fn, codes):
+    samples = []
+    for code in codes:
+        t0 = time.perf_counter()
+        fn(code)
+        samples.append(time.perf_counter() - t0)
+    a = np.asarray(samples)
+    return {"reads": len(a), "wall_s": float(a.sum()), "mean_ms": float(a.mean() * 1e3),
+            "p95_ms": float(np.percentile(a, 95) * 1e3)}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="合併資料集：單檔一年查詢的 row group 剪枝效果（vs 舊的每檔一個 parquet）")
+    ap.add_argument("--symbols", type=int, default=1800)
+    ap.add_argument("--years", type=int, default=5)
+    ap.add_argument("--reads", type=int, default=200, help="隨機抽幾檔查詢")
+    ap.add_argument("--row-group-size", type=int, default=dataset.ROW_GROUP_SIZE)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_dataset.json")
+    args = ap.parse_args(argv)
+
+    rows = make_rows(args.symbols, args.years, args.seed)
+    year = 2024
+    rng = np.random.default_rng(args.seed)
+    codes = sorted(rng.choice(rows["code"].unique(), size=min(args.reads, args.symbols), replace=False))
+    query = lambda c: duckdb_io.read_ohlcv(c, start=f"{year}-01-01", end=f"{year}-12-31")
+
+    with tempfile.TemporaryDirectory(prefix="bench_dataset_") as tmp:
+        tmp = Path(tmp)
+        legacy_dir, pruned, unpruned = tmp / "parquet", tmp / "pruned", tmp / "unpruned"
+        legacy_dir.mkdir()
+        for code, part in rows.groupby("code", sort=False):
+            part.drop(columns="code").to_parquet(legacy_dir / f"{code}.parquet", index=False)
+        dataset.append(rows, root=pruned)
+        dataset.compact(root=pruned, row_group_size=args.row_group_size)
+        # 對照組：同資料，每個分割只有一個 row group（統計量涵蓋全部代碼 → 無法剪枝）
+        dataset.append(rows, root=unpruned)
+        dataset.compact(root=unpruned, row_group_size=len(rows))
+
+        duckdb_io.PARQUET_DIR = legacy_dir
+        dataset.DATASET_DIR = tmp / "absent"
+        legacy = timed(query, codes)
+        dataset.DATASET_DIR = unpruned
+        flat = timed(query, codes)
+        dataset.DATASET_DIR = pruned
+        sorted_rg = timed(query, codes)
+        total, hit = row_groups(pruned, codes[0], year)
+
+    report = {
+        "meta": benchlib.report_meta(suite="dataset", symbols=args.symbols, years=args.years,
+                                     rows=len(rows), row_group_size=args.row_group_size),
+        "row_groups": {"year": year, "total": total, "read_for_one_code": hit},
+        "results": [
+            {"key": f"legacy_files|reads={len(codes)}", **legacy},
+            {"key": f"dataset_single_row_group|reads={len(codes)}", **flat},
+            {"key": f"dataset_pruned|reads={len(codes)}", **sorted_rg},
+        ],
+    }
+    benchlib.write_report(report, args.out)
+
+if __name__ == "__main__":
+    main()
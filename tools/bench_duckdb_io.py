@@ -0,0 +1,119 @@
+import json, sys, os, argparse, tempfile, time
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+import benchlib
+import app.indicators  # side-effect: registers builtins
+from app.indicators import registry
+from app.services.data_pipeline import duckdb_io
+
+def legacy_read(path: Path, start=None, end=None, limit=None) -> pd.DataFrame:
+    """改版前的讀法：每次新開 :memory: 連線、f-string 拼 SQL（僅供對照）"""
+    con = duckdb.connect(database=":memory:")
+    query = f"SELECT * FROM read_parquet('{path.as_posix()}')"
+    where = []
+    if start:
+        where.append(f"date >= '{start}'")
+    if end:
+        where.append(f"date <= '{end}'")
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY date"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    return con.execute(query).df()
+
+def make_files(dirpath: Path, symbols: int, bars: int, seed: int):
+    """決定性合成資料：每檔一個 {code}.parquet（與 duckdb_io 的 legacy 佈局相同）"""
+    dates = pd.bdate_range("2015-01-05", periods=bars)
+    codes = [f"{9000 + i:04d}" if i < 1000 else f"{90000 + i}" for i in range(symbols)]
+    for code in codes:
+        panel = benchlib.synthetic_ohlcv(bars, 1, seed=seed + int(code))
+        df = pd.DataFrame({"date": dates, **{c: v[:, 0] for c, v in panel.items()}})
+        df["adj_close"] = df["close"]
+        df["source"] = "bench"
+        df.to_parquet(dirpath / f"{code}.parquet", index=False)
+    return codes
+
+def latency(fn, codes):
+    samples = []
+    for code in codes:
+        t0 = time.perf_counter()
+        fn(code)
+        samples.append(time.perf_counter() - t0)
+    a = np.asarray(samples)
+    return {
+        "reads": len(samples),
+        "total_s": float(a.sum()),
+        "mean_ms": float(a.mean() * 1e3),
+        "p50_ms": float(np.percentile(a, 50) * 1e3),
+        "p95_ms": float(np.percentile(a, 95) * 1e3),
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="duckdb_io 讀取延遲：legacy（每次新連線）vs pooled（共用連線＋參數化）vs read_ohlcv_many（單次多檔）")
+    ap.add_argument("--reads", type=int, default=2000, help="讀取次數（= 合成檔數）")
+    ap.add_argument("--bars", type=int, default=1500, help="每檔 bar 數")
+    ap.add_argument("--last-n", type=int, default=0, help="pooled 讀取改用 last_n（0 = 讀全檔）")
+    ap.add_argument("--dir", help="沿用既有合成資料目錄；省略則建立暫存目錄")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_duckdb_io.json")
+    args = ap.parse_args(argv)
+
+    tmp = None
+    if args.dir:
+        root = Path(args.dir)
+        root.mkdir(parents=True, exist_ok=True)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="bench_duckdb_")
+        root = Path(tmp.name)
+    codes = sorted(p.stem for p in root.glob("*.parquet"))[: args.reads]
+    if len(codes) < args.reads:
+        codes = make_files(root, args.reads, args.bars, args.seed)
+
+    duckdb_io.PARQUET_DIR = root
+    last_n = args.last_n or None
+    legacy = latency(lambda c: legacy_read(root / f"{c}.parquet"), codes)
+    pooled = latency(lambda c: duckdb_io.read_ohlcv(c, last_n=last_n), codes)
+    many = benchlib.measure(lambda: duckdb_io.read_ohlcv_many(codes, last_n=last_n, layout="panel"), repeat=3)
+
+    # 輸出格式：每檔延遲＋單次讀取的記憶體；scan 熱路徑 = 讀取 + 一個指標（RSI 14）
+    outputs = []
+    for output in duckdb_io.OUTPUTS:
+        read = lambda c, o=output: duckdb_io.read_ohlcv(c, last_n=last_n, output=o)
+        lat = latency(read, codes)
+        mem = benchlib.measure(lambda: read(codes[0]), repeat=3)
+        hot = latency(lambda c: registry.calc("rsi", read(c), {"period": 14}), codes)
+        outputs.append({"key": f"output={output}|reads={len(codes)}", "wall_s": lat["total_s"], **lat,
+                        "peak_bytes": mem["peak_bytes"], "alloc_blocks": mem["alloc_blocks"],
+                        "read_calc_mean_ms": hot["mean_ms"]})
+
+    report = {
+        "meta": benchlib.report_meta(suite="duckdb_io", bars=args.bars, threads=duckdb_io.DUCKDB_THREADS, last_n=last_n),
+        "results": [
+            {"key": f"legacy|reads={len(codes)}", "wall_s": legacy["total_s"], **legacy},
+            {"key": f"pooled|reads={len(codes)}", "wall_s": pooled["total_s"], **pooled},
+            {"key": f"many_panel|codes={len(codes)}", **many},
+            *outputs,
+        ],
+        "speedup": round(legacy["total_s"] / pooled["total_s"], 2) if pooled["total_s"] else None,
+    }
+    benchlib.write_report(report, args.out)
+    if tmp is not None:
+        tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json, sys, os, argparse, tempfile
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import benchlib
+from app.services.data_pipeline import dataset, duckdb_io, hotstore
+
+def make_rows(symbols: int, bars: int, seed: int) -> pd.DataFrame:
+    dates = pd.bdate_range(end="2024-12-31", periods=bars)
+    panel = benchlib.synthetic_ohlcv(bars, symbols, seed=seed)
+    codes = np.array([f"{1000 + i:04d}" for i in range(symbols)])
+    return pd.DataFrame({
+        "code": np.repeat(codes, bars),
+        "date": np.tile(dates.to_numpy(), symbols),
+        **{c: v.T.ravel() for c, v in panel.items()},
+        "source": "bench",
+    })
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="掃描熱路徑：最後 N 根 × 全市場，parquet（DuckDB）vs memmap 熱快取")
+    ap.add_argument("--symbols", type=int, default=2000)
+    ap.add_argument("--bars", type=int, default=750, help="每檔歷史長度")
+    ap.add_argument("--last-n", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_hotstore.json")
+    args = ap.parse_args(argv)
+
+    rows = make_rows(args.symbols, args.bars, args.seed)
+    codes = sorted(rows["code"].unique().tolist())
+    with tempfile.TemporaryDirectory(prefix="bench_hotstore_") as tmp:
+        tmp = Path(tmp)
+        dataset.DATASET_DIR = tmp / "dataset"
+        duckdb_io.PARQUET_DIR = tmp / "parquet"
+        hotstore.HOT_DIR = tmp / "hot"
+        dataset.append(rows)
+        dataset.compact()
+        export = benchlib.measure(lambda: hotstore.export(codes, depth=args.last_n), repeat=1)
+
+        results = []
+        for layout in ("long", "panel"):
+            kw = dict(last_n=args.last_n, layout=layout, output="numpy")
+            cold = benchlib.measure(lambda: duckdb_io.read_ohlcv_many(codes, **kw), repeat=args.repeat)
+            hot = benchlib.measure(lambda: duckdb_io.read_ohlcv_many_hot(codes, **kw), repeat=args.repeat)
+            results.append({"key": f"parquet|{layout}|symbols={args.symbols}|last_n={args.last_n}", **cold})
+            results.append({"key": f"hot|{layout}|symbols={args.symbols}|last_n={args.last_n}", **hot,
+                            "speedup": round(cold["wall_s"] / hot["wall_s"], 2)})
+        one = [codes[i] for i in np.random.default_rng(args.seed).choice(len(codes), 200, replace=False)]
+        for name, fn in (("parquet", duckdb_io.read_ohlcv), ("hot", duckdb_io.read_ohlcv_hot)):
+            m = benchlib.measure(lambda: [fn(c, last_n=args.last_n, output="numpy") for c in one], repeat=args.repeat)
+            results.append({"key": f"{name}|single|reads=200|last_n={args.last_n}", **m})
+        size = sum(p.stat().st_size for p in hotstore.current().glob("*.npy"))
+
+    report = {
+        "meta": benchlib.report_meta(suite="hotstore", symbols=args.symbols, bars=args.bars, last_n=args.last_n,
+                                     hot_bytes=int(size), export_s=round(export["wall_s"], 3)),
+        "results": results,
+    }
+    benchlib.write_report(report, args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import json, sys, os, argparse
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+import pandas as pd
+
+import benchlib
+import app.indicators  # side-effect: registers builtins
+from app.indicators import registry
+
+# 各指標的代表性參數（台股常用設定）；未列出的指標以空 params 嘗試
+DEFAULT_PARAMS = {
+    "ma": {"window": 20},
+    "ema": {"window": 20},
+    "rsi": {"period": 14},
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+    "boll": {"window": 20, "mult": 2.0},
+    "bias": {"window": 20},
+    "volume": {"window": 5},
+    "diff": {"left": "high", "right": "low"},
+    "kd": {"k_period": 9, "d_period": 3, "smooth": 3},
+}
+
+DEFAULT_ROWS = "250,5000,1000000"
+DEFAULT_SYMBOLS = "1,100,2000"
+# rows*symbols 上限：超過者略過（1M × 2,000 的 OHLCV 需 80GB）
+DEFAULT_MAX_CELLS = 20_000_000
+
+def _ints(text: str):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+def bench_case(name: str, panel, params: dict, *, repeat: int, min_time: float):
+    """symbols == 1 走單檔 registry.calc（DataFrame）；其餘走 calc_panel"""
+    rows, symbols = panel["close"].shape
+    if symbols == 1:
+        df = pd.DataFrame({c: v[:, 0] for c, v in panel.items()})
+        fn = lambda: registry.calc(name, df, params)
+        path = "calc"
+    else:
+        fn = lambda: registry.calc_panel(name, panel, params)
+        path = "calc_panel"
+    stats = benchlib.measure(fn, repeat=repeat, min_time=min_time)
+    return {
+        "key": f"{name}|rows={rows}|symbols={symbols}",
+        "indicator": name,
+        "rows": rows,
+        "symbols": symbols,
+        "path": path,
+        "params": params,
+        **stats,
+        "ns_per_cell": round(stats["wall_s"] / (rows * symbols) * 1e9, 3),
+    }
+
+def bench_sweep(name: str, panel, params: dict, n_windows: int, *, repeat: int, min_time: float):
+    """registry.calc_sweep：window 2..n_windows+1 一次算完（單檔）"""
+    rows = panel["close"].shape[0]
+    df = pd.DataFrame({c: v[:, 0] for c, v in panel.items()})
+    windows = list(range(2, n_windows + 2))
+    params = {k: v for k, v in params.items() if k != "window"}
+    stats = benchlib.measure(lambda: registry.calc_sweep(name, df, windows, params), repeat=repeat, min_time=min_time)
+    return {
+        "key": f"sweep:{name}|rows={rows}|windows={n_windows}",
+        "indicator": name,
+        "rows": rows,
+        "symbols": 1,
+        "path": "calc_sweep",
+        "params": params,
+        **stats,
+        "ns_per_cell": round(stats["wall_s"] / (rows * n_windows) * 1e9, 3),
+    }
+
+def run(args):
+    names = [n.lower() for n in args.indicators.split(",")] if args.indicators else registry.names()
+    results, skipped = [], []
+    for rows in _ints(args.rows):
+        for symbols in _ints(args.symbols):
+            if rows * symbols > args.max_cells:
+                skipped.append({"rows": rows, "symbols": symbols, "reason": f"rows*symbols > max_cells ({args.max_cells})"})
+                continue
+            panel = benchlib.synthetic_ohlcv(rows, symbols, seed=args.seed)
+            for name in names:
+                params = DEFAULT_PARAMS.get(name, {})
+                try:
+                    results.append(bench_case(name, panel, params, repeat=args.repeat, min_time=args.min_time))
+                except Exception as e:
+                    skipped.append({"indicator": name, "rows": rows, "symbols": symbols, "reason": f"{type(e).__name__}: {e}"})
+                print(f"[bench] {name} rows={rows} symbols={symbols}", file=sys.stderr)
+            if args.sweep and symbols == 1:
+                for name in names:
+                    if registry.get(name).get("sweep_fn") is None:
+                        continue
+                    results.append(bench_sweep(name, panel, DEFAULT_PARAMS.get(name, {}), args.sweep,
+                                               repeat=args.repeat, min_time=args.min_time))
+                    print(f"[bench] sweep:{name} rows={rows} windows={args.sweep}", file=sys.stderr)
+            del panel
+    return {
+        "meta": benchlib.report_meta(suite="indicators", seed=args.seed, repeat=args.repeat, sweep=args.sweep),
+        "results": results,
+        "skipped": skipped,
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="指標 micro-benchmark（wall time / peak memory / allocations）")
+    ap.add_argument("--rows", default=DEFAULT_ROWS, help="序列長度（逗號分隔）")
+    ap.add_argument("--symbols", default=DEFAULT_SYMBOLS, help="universe 大小（逗號分隔）")
+    ap.add_argument("--indicators", default="", help="只跑指定指標（逗號分隔）；預設全部已註冊者")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time", type=float, default=0.0, help="每個 case 至少累計計時秒數")
+    ap.add_argument("--max-cells", type=int, default=DEFAULT_MAX_CELLS)
+    ap.add_argument("--sweep", type=int, default=0, help="另測 calc_sweep（單檔、N 個 window）；0 = 不測")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_report.json", help="報告輸出路徑")
+    ap.add_argument("--baseline", help="對照的 baseline 報告；有退步時 exit 1")
+    ap.add_argument("--threshold", type=float, default=0.2, help="退步門檻（0.2 = 慢 20%% 以上）")
+    ap.add_argument("--compare-only", action="store_true", help="不重跑，直接比較 --out 與 --baseline")
+    args = ap.parse_args(argv)
+
+    if args.compare_only:
+        if not args.baseline:
+            ap.error("--compare-only requires --baseline")
+        report = benchlib.load_report(args.out)
+    else:
+        report = run(args)
+        benchlib.write_report(report, args.out)
+
+    if args.baseline:
+        diff = benchlib.compare(report, benchlib.load_report(args.baseline), threshold=args.threshold)
+        print(json.dumps(diff, ensure_ascii=False, indent=2))
+        if not diff["ok"]:
+            print(f"\n{len(diff['regressions'])} regression(s) above {args.threshold:.0%}. "
+                  "If intentional, refresh the baseline.", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
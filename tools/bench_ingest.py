@@ -0,0 +1,92 @@
+import json, sys, os, argparse, tempfile, threading, time
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+import random
+from pathlib import Path
+
+import pandas as pd
+
+import benchlib
+from app.services.data_pipeline import dataset, duckdb_io, ingest
+
+class StubVendor:
+    """模擬行情來源：每次請求固定延遲＋jitter，依比例丟出暫時性錯誤；可選擇支援多代碼下載"""
+
+    def __init__(self, bars: int, latency: float, jitter: float, fail_rate: float, seed: int):
+        self.bars, self.latency, self.jitter, self.fail_rate = bars, latency, jitter, fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.dates = {}
+
+    def _wait(self):
+        with self.lock:
+            self.requests += 1
+            delay = self.latency + self.rng.uniform(0.0, self.jitter)
+            fail = self.rng.random() < self.fail_rate
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("stub: connection reset")
+
+    def _frame(self, code: str, end: str) -> pd.DataFrame:
+        panel = benchlib.synthetic_ohlcv(self.bars, 1, seed=int(code))
+        if end not in self.dates:
+            self.dates[end] = pd.bdate_range(end=pd.Timestamp(end) - pd.Timedelta(days=1), periods=self.bars)
+        dates = self.dates[end]
+        df = pd.DataFrame({"date": dates, **{c: v[:, 0] for c, v in panel.items()}})
+        df["adj_close"] = df["close"]
+        df["source"] = "stub"
+        return df
+
+    def __call__(self, code, start, end):
+        self._wait()
+        return self._frame(code, end)
+
+    def fetch_many(self, codes, start, end):
+        self._wait()
+        return {c: self._frame(c, end) for c in codes}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="全市場入庫吞吐量（本機 stub vendor，不連網）")
+    ap.add_argument("--symbols", type=int, default=1800)
+    ap.add_argument("--bars", type=int, default=250, help="每檔回傳 bar 數（首次入庫）")
+    ap.add_argument("--latency", type=float, default=0.3, help="每次請求延遲（秒）")
+    ap.add_argument("--jitter", type=float, default=0.2)
+    ap.add_argument("--fail-rate", type=float, default=0.02, help="暫時性錯誤比例")
+    ap.add_argument("--workers", type=int, default=ingest.WORKERS)
+    ap.add_argument("--rate", type=float, default=50.0)
+    ap.add_argument("--batch", type=int, default=0, help="多代碼下載每批上限（0 = 逐檔）")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_ingest.json")
+    args = ap.parse_args(argv)
+
+    codes = [str(1000 + i) for i in range(args.symbols)]
+    vendor = StubVendor(args.bars, args.latency, args.jitter, args.fail_rate, args.seed)
+    if not args.batch:
+        vendor = vendor.__call__  # 不帶 fetch_many → 逐檔
+    with tempfile.TemporaryDirectory(prefix="bench_ingest_") as tmp:
+        root = Path(tmp)
+        dataset.DATASET_DIR = root / "dataset"
+        duckdb_io.PARQUET_DIR = root / "parquet"
+        t0 = time.perf_counter()
+        results = ingest.ingest(codes, vendor=vendor, vendor_name="stub", workers=args.workers,
+                                rate=args.rate, burst=args.workers, batch=args.batch)
+        summary = ingest.summarize(results, time.perf_counter() - t0)
+
+    report = {
+        "meta": benchlib.report_meta(suite="ingest", **{k: v for k, v in vars(args).items() if k != "out"}),
+        "results": [{"key": f"ingest|symbols={args.symbols}|workers={args.workers}|batch={args.batch}",
+                     "wall_s": summary["elapsed_s"], **summary}],
+    }
+    benchlib.write_report(report, args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json, sys, os, argparse, tempfile, time
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import benchlib
+from app.services.data_pipeline import dataset, duckdb_io, parquet_writer
+
+def make_rows(symbols: int, bars: int, seed: int) -> pd.DataFrame:
+    """決定性合成長表，依「日期、代碼」排列（每日入庫時的自然順序）"""
+    dates = pd.bdate_range(end="2024-12-31", periods=bars)
+    panel = benchlib.synthetic_ohlcv(bars, symbols, seed=seed)
+    codes = np.array([f"{1000 + i:04d}" for i in range(symbols)])
+    rows = pd.DataFrame({
+        "code": np.tile(codes, bars),
+        "date": np.repeat(dates.to_numpy(), symbols),
+        **{c: v.ravel() for c, v in panel.items()},
+        "source": "bench",
+    })
+    return dataset.with_adjusted(rows.assign(adj_close=rows["close"]))[dataset.COLUMNS]
+
+def write_default(rows: pd.DataFrame, root: Path) -> None:
+    """對照組：pandas / pyarrow 預設（不排序、預設 row group 與壓縮、footer 無排序宣告）"""
+    for year, part in rows.groupby(rows["date"].dt.year):
+        d = root / f"year={int(year)}"
+        d.mkdir(parents=True)
+        part.to_parquet(d / dataset.BASE_NAME, index=False)
+
+def write_sorted(rows: pd.DataFrame, root: Path, row_group_size: int) -> None:
+    for year, part in rows.groupby(rows["date"].dt.year):
+        d = root / f"year={int(year)}"
+        d.mkdir(parents=True)
+        parquet_writer.write_ohlcv(part, d / dataset.BASE_NAME, row_group_size=row_group_size)
+
+def bytes_read(root: Path, code: str, start: str, cols) -> int:
+    """依 footer 的 min/max 統計量剪枝後，查詢欄位在存活 row group 中的壓縮位元組數"""
+    total = 0
+    lo = pd.Timestamp(start)
+    for path in dataset.partition_files(root, start=start):
+        meta = pq.ParquetFile(path).metadata
+        names = meta.schema.names
+        for i in range(meta.num_row_groups):
+            rg = meta.row_group(i)
+            code_st = rg.column(names.index("code")).statistics
+            date_st = rg.column(names.index("date")).statistics
+            if code_st is not None and code_st.has_min_max and not code_st.min <= code <= code_st.max:
+                continue
+            if date_st is not None and date_st.has_min_max and pd.Timestamp(date_st.max) < lo:
+                continue
+            total += sum(rg.column(names.index(c)).total_compressed_size for c in cols)
+    return total
+
+def timed(fn, codes):
+    samples = []
+    for code in codes:
+        t0 = time.perf_counter()
+        fn(code)
+        samples.append(time.perf_counter() - t0)
+    a = np.asarray(samples)
+    return {"reads": len(a), "wall_s": float(a.sum()), "mean_ms": float(a.mean() * 1e3),
+            "p95_ms": float(np.percentile(a, 95) * 1e3)}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="OHLCV parquet 佈局：最後 N 根查詢的讀取量與延遲（pandas 預設 vs parquet_writer）")
+    ap.add_argument("--symbols", type=int, default=1800)
+    ap.add_argument("--bars", type=int, default=750, help="每檔歷史長度（跨多個年份分割）")
+    ap.add_argument("--last-n", default="20,120,250")
+    ap.add_argument("--reads", type=int, default=200, help="隨機抽幾檔查詢")
+    ap.add_argument("--row-group-size", type=int, default=dataset.ROW_GROUP_SIZE)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_parquet.json")
+    args = ap.parse_args(argv)
+
+    rows = make_rows(args.symbols, args.bars, args.seed)
+    rng = np.random.default_rng(args.seed)
+    codes = sorted(rng.choice(rows["code"].unique(), size=min(args.reads, args.symbols), replace=False))
+    end = str(rows["date"].max().date())
+    cols = ["code", "date", *duckdb_io.FIELDS]
+
+    results, sizes = [], {}
+    with tempfile.TemporaryDirectory(prefix="bench_parquet_") as tmp:
+        tmp = Path(tmp)
+        layouts = {"default": tmp / "default", "sorted": tmp / "sorted"}
+        write_default(rows, layouts["default"])
+        write_sorted(rows, layouts["sorted"], args.row_group_size)
+        duckdb_io.PARQUET_DIR = tmp / "absent"
+        declares = parquet_writer.declares_sorted
+        # sorted_order_by：同一份排序檔，但忽略 footer 宣告（仍下 ORDER BY），單獨量出省略排序的效果
+        for name, root in [*layouts.items(), ("sorted_order_by", layouts["sorted"])]:
+            files = dataset.partition_files(root)
+            parquet_writer.declares_sorted = (lambda f, k: False) if name == "sorted_order_by" else declares
+            sizes[name] = {"bytes": int(sum(p.stat().st_size for p in files)),
+                           "row_groups": int(sum(pq.ParquetFile(p).metadata.num_row_groups for p in files)),
+                           "declares_sorted": parquet_writer.declares_sorted(files, ("code", "date"))}
+            dataset.DATASET_DIR = root
+            for n in [int(x) for x in args.last_n.split(",") if x]:
+                query = lambda c: duckdb_io.read_ohlcv(c, end=end, last_n=n, output="numpy")
+                query(codes[0])  # 暖機（footer / schema 快取）
+                start = duckdb_io.lookback_start(end, n)
+                read = [bytes_read(root, c, start, cols) for c in codes[:20]]
+                results.append({"key": f"{name}|last_n={n}|reads={len(codes)}", **timed(query, codes),
+                                "bytes_read_mean": int(np.mean(read))})
+
+    parquet_writer.declares_sorted = declares
+    base = {r["key"].split("|", 1)[1]: r for r in results if r["key"].startswith("default|")}
+    for r in results:
+        if not r["key"].startswith("default|"):
+            b = base[r["key"].split("|", 1)[1]]
+            r["speedup"] = round(b["mean_ms"] / r["mean_ms"], 2)
+            r["bytes_ratio"] = round(r["bytes_read_mean"] / max(b["bytes_read_mean"], 1), 4)
+
+    report = {
+        "meta": benchlib.report_meta(suite="parquet", symbols=args.symbols, bars=args.bars,
+                                     rows=len(rows), row_group_size=args.row_group_size),
+        "layouts": sizes,
+        "results": results,
+    }
+    benchlib.write_report(report, args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import json, sys, os, argparse, tempfile, time
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+if THIS_DIR not in sys.path:
+    sys.path.insert(0, THIS_DIR)
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import benchlib
+from app.indicators import cache as ind_cache
+from app.runners import scan_runner
+from app.services.data_pipeline import bar_cache, dataset, duckdb_io, hotstore, parquet_writer
+
+STRATEGY = {
+    "name": "bench_scan", "version": "1.0.0", "type": "screen", "timeframe": "1d", "logic": "AND",
+    "conditions": [
+        {"left": {"indicator": "MA", "params": {"window": 5}}, "op": "cross_up",
+         "right": {"indicator": "MA", "params": {"window": 20}}},
+        {"left": {"indicator": "RSI", "params": {"period": 14}}, "op": ">", "right": {"value": 50}},
+    ],
+}
+
+def write_dataset(root: Path, symbols: int, bars: int, seed: int):
+    """決定性合成資料集（依年份分割、code/date 排序），回傳代碼清單"""
+    dates = pd.bdate_range(end="2024-12-31", periods=bars)
+    panel = benchlib.synthetic_ohlcv(bars, symbols, seed=seed)
+    codes = [f"{1000 + i:04d}" for i in range(symbols)]
+    rows = pd.DataFrame({
+        "code": np.repeat(codes, bars),
+        "date": np.tile(dates.to_numpy(), symbols),
+        **{c: v.T.ravel() for c, v in panel.items()},
+        "source": "bench",
+    })
+    rows = dataset.with_adjusted(rows.assign(adj_close=rows["close"]))[dataset.COLUMNS]
+    for year, part in rows.groupby(rows["date"].dt.year):
+        d = root / f"year={int(year)}"
+        d.mkdir(parents=True)
+        parquet_writer.write_ohlcv(part, d / dataset.BASE_NAME)
+    return codes
+
+def timed(fn, repeat: int):
+    """每次量測前清掉本行程的 bar / 指標快取並關閉共用行程池（冷啟動：含建池成本、子行程快取為空）"""
+    times = []
+    for _ in range(max(repeat, 1)):
+        bar_cache.clear()
+        ind_cache._CACHE.clear()
+        scan_runner.shutdown()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="全市場掃描：symbols/sec 對 worker 數（ProcessPoolExecutor 分 chunk）")
+    ap.add_argument("--symbols", type=int, default=1800)
+    ap.add_argument("--bars", type=int, default=500)
+    ap.add_argument("--workers", default="", help="逗號分隔；預設 1,2,4,… 到 CPU 數")
+    ap.add_argument("--chunk-size", type=int, default=scan_runner.CHUNK_SIZE)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_scan.json")
+    args = ap.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    workers = [int(x) for x in args.workers.split(",") if x]
+    if not workers:
+        workers = sorted({1, cores, *[2 ** i for i in range(1, 8) if 2 ** i < cores]})
+
+    modes = {
+        "indicator": dict(indicator="ema", params={"window": 20}),
+        "strategy": dict(strategy=STRATEGY),
+    }
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_scan_") as tmp:
+        tmp = Path(tmp)
+        codes = write_dataset(tmp / "dataset", args.symbols, args.bars, args.seed)
+        dataset.DATASET_DIR = tmp / "dataset"
+        duckdb_io.PARQUET_DIR = tmp / "absent"
+        hotstore.HOT_DIR = tmp / "hot"
+        for mode, kw in modes.items():
+            scan_runner.run_scan(codes[:1], **kw)  # 暖機（import / 策略編譯）
+            for n in workers:
+                wall = timed(lambda: scan_runner.run_scan(codes, workers=n, chunk_size=args.chunk_size, **kw),
+                             args.repeat)
+                results.append({"key": f"{mode}|workers={n}|symbols={len(codes)}", "wall_s": wall,
+                                "symbols_per_s": round(len(codes) / wall, 1)})
+        scan_runner.shutdown()
+
+    for r in results:
+        base = next(b for b in results if b["key"].split("|")[0] == r["key"].split("|")[0])
+        r["speedup"] = round(r["symbols_per_s"] / base["symbols_per_s"], 2)
+
+    report = {
+        "meta": benchlib.report_meta(suite="scan", cpu_count=cores, symbols=args.symbols, bars=args.bars,
+                                     chunk_size=args.chunk_size),
+        "results": results,
+    }
+    benchlib.write_report(report, args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark 共用工具（tools/bench_*.py 使用）：
+- measure(fn)：wall time（多次取 best/median，不開 tracemalloc）＋ 一次 tracemalloc 量測
+  peak_bytes（呼叫期間相對起點的記憶體高峰）與 alloc_blocks（呼叫結束後新增的區塊數，含回傳值）
+- synthetic_ohlcv(rows, symbols, seed)：決定性的合成 OHLCV（同參數 → 同資料）
+- compare(current, baseline, threshold)：對照既有 baseline，找出超過門檻的退步
+報告格式：{"meta": {...}, "results": [{"key": ..., "wall_s": ..., ...}], "skipped": [...]}
+"""
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# compare 預設檢查的指標（越小越好）
+COMPARE_METRICS = ("wall_s", "peak_bytes")
+
+
+def synthetic_ohlcv(rows: int, symbols: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """隨機漫步收盤價 + 合理的 OHLC 關係；回傳 panel（rows × symbols 的 float64 陣列）"""
+    rng = np.random.default_rng([int(seed), int(rows), int(symbols)])
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, size=(rows, symbols)), axis=0)
+    close = np.maximum(close, 1.0)
+    spread = rng.uniform(0.0, 1.0, size=(rows, symbols))
+    return {
+        "open": close + rng.normal(0.0, 0.5, size=(rows, symbols)),
+        "high": close + spread,
+        "low": np.maximum(close - spread, 0.5),
+        "close": close,
+        "volume": rng.integers(1_000, 50_000, size=(rows, symbols)).astype(np.float64),
+    }
+
+
+def measure(fn: Callable[[], Any], *, repeat: int = 5, min_time: float = 0.0) -> Dict[str, Any]:
+    """
+    量測單一呼叫：
+    - 先暖機一次，再跑 repeat 次（或累計超過 min_time 秒）計時
+    - 另開 tracemalloc 跑一次，取 peak_bytes / alloc_blocks
+    """
+    fn()
+    times: List[float] = []
+    started = time.perf_counter()
+    while len(times) < max(int(repeat), 1) or (time.perf_counter() - started) < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        blocks = sum(max(d.count_diff, 0) for d in after.compare_to(before, "filename"))
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": len(times),
+        "wall_s": min(times),
+        "wall_median_s": statistics.median(times),
+        "peak_bytes": int(peak - base),
+        "alloc_blocks": int(blocks),
+    }
+
+
+def report_meta(**extra: Any) -> Dict[str, Any]:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        **extra,
+    }
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]) -> None:
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    threshold: float = 0.2,
+    metrics=COMPARE_METRICS,
+) -> Dict[str, Any]:
+    """
+    以 result["key"] 對齊兩份報告；current > baseline * (1 + threshold) 視為退步。
+    只存在於一邊的 key 列在 missing / added，不算退步。
+    """
+    base = {r["key"]: r for r in baseline.get("results", [])}
+    cur = {r["key"]: r for r in current.get("results", [])}
+    regressions, rows = [], []
+    for key, r in cur.items():
+        b = base.get(key)
+        if b is None:
+            continue
+        for m in metrics:
+            if m not in r or m not in b or not b[m]:
+                continue
+            ratio = r[m] / b[m]
+            row = {"key": key, "metric": m, "baseline": b[m], "current": r[m], "ratio": round(ratio, 4)}
+            rows.append(row)
+            if ratio > 1.0 + threshold:
+                regressions.append(row)
+    return {
+        "threshold": threshold,
+        "compared": len(rows),
+        "regressions": regressions,
+        "missing": sorted(k for k in base if k not in cur),
+        "added": sorted(k for k in cur if k not in base),
+        "ok": not regressions,
+    }
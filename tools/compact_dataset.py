@@ -0,0 +1,29 @@
+import json, sys, os, argparse
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from app.services.data_pipeline import dataset, duckdb_io
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="合併資料集壓實：delta 併入各年度主檔（依 code, date 排序）")
+    ap.add_argument("--root", help="資料集目錄；預設 data/dataset/ohlcv")
+    ap.add_argument("--years", default="", help="只處理指定年份（逗號分隔）")
+    ap.add_argument("--row-group-size", type=int, default=dataset.ROW_GROUP_SIZE)
+    ap.add_argument("--force", action="store_true", help="沒有 delta 的分割也重寫")
+    ap.add_argument("--import-legacy", action="store_true", help="先匯入 data/parquet/{code}.parquet 舊檔")
+    args = ap.parse_args(argv)
+
+    years = [int(y) for y in args.years.split(",") if y.strip()] or None
+    imported = {}
+    if args.import_legacy:
+        imported = dataset.import_legacy(duckdb_io.PARQUET_DIR, root=args.root, row_group_size=args.row_group_size)
+    done = dataset.compact(root=args.root, years=years, row_group_size=args.row_group_size, force=args.force)
+    print(json.dumps({"imported": imported, "compacted": done}, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import json, sys, os, argparse
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from app.services.data_pipeline import hotstore
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="由 parquet 重建 memmap 熱快取（每檔最後 depth 根 bar）")
+    ap.add_argument("codes", nargs="*", help="只匯出指定代碼；預設資料集＋舊檔全部")
+    ap.add_argument("--root", help="熱快取目錄；預設 data/hot")
+    ap.add_argument("--depth", type=int, default=hotstore.HOT_DEPTH)
+    ap.add_argument("--dtype", default="float64", choices=["float64", "float32"])
+    args = ap.parse_args(argv)
+
+    meta = hotstore.export(args.codes or None, root=args.root, depth=args.depth, dtype=args.dtype)
+    print(json.dumps({k: v for k, v in meta.items() if k not in ("codes", "counts")} | {"symbols": len(meta["codes"])},
+                     ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
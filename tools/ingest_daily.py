@@ -0,0 +1,63 @@
+import json, sys, os, argparse, time
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from app.services.data_pipeline import dataset, hotstore, ingest
+
+def load_codes(args):
+    codes = list(args.codes)
+    if args.codes_file:
+        with open(args.codes_file, "r", encoding="utf-8") as f:
+            codes += [line.split("#")[0].strip() for line in f]
+    return [c for c in dict.fromkeys(codes) if c]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="增量日線入庫（manifest 記錄每檔最後日期，只抓新 bar＋重疊段）")
+    ap.add_argument("codes", nargs="*", help="股票代碼")
+    ap.add_argument("--codes-file", help="每行一個代碼（# 之後為註解）")
+    ap.add_argument("--vendor", default="yahoo", choices=sorted(ingest.VENDORS) + ["local"])
+    ap.add_argument("--local-dir", help="--vendor local 的資料目錄（{code}.parquet / {code}.csv）")
+    ap.add_argument("--end", help="抓到哪一天（含，YYYY-MM-DD）；預設今天")
+    ap.add_argument("--overlap", type=int, default=ingest.OVERLAP_BARS, help="往前重疊的 bar 數")
+    ap.add_argument("--workers", type=int, default=ingest.WORKERS, help="並行執行緒數")
+    ap.add_argument("--rate", type=float, default=ingest.RATE, help="每秒最多請求數（token bucket）")
+    ap.add_argument("--burst", type=int, default=ingest.BURST)
+    ap.add_argument("--retries", type=int, default=ingest.RETRIES, help="暫時性錯誤重試次數")
+    ap.add_argument("--batch", type=int, default=ingest.BATCH, help="多代碼下載每批上限（0 = 逐檔）")
+    ap.add_argument("--compact", action="store_true", help="入庫後壓實資料集")
+    ap.add_argument("--hot", action="store_true", help="入庫後重建 memmap 熱快取（已建置過者預設會重建）")
+    ap.add_argument("--no-hot", action="store_true", help="不重建熱快取")
+    args = ap.parse_args(argv)
+
+    codes = load_codes(args)
+    if not codes:
+        ap.error("no codes given")
+    if args.vendor == "local":
+        if not args.local_dir:
+            ap.error("--vendor local requires --local-dir")
+        vendor = ingest.local_vendor(args.local_dir)
+    else:
+        vendor = ingest.VENDORS[args.vendor]
+
+    t0 = time.perf_counter()
+    results = ingest.ingest(codes, vendor=vendor, vendor_name=args.vendor, end=args.end, overlap=args.overlap,
+                            workers=args.workers, rate=args.rate, burst=args.burst, retries=args.retries,
+                            batch=args.batch)
+    summary = ingest.summarize(results, time.perf_counter() - t0)
+    report = {"summary": summary, "results": results}
+    if args.compact:
+        report["compacted"] = dataset.compact()
+    if not args.no_hot and (args.hot or hotstore.current() is not None):
+        meta = hotstore.export()
+        report["hot"] = {"symbols": len(meta["codes"]), "depth": meta["depth"], "last_date": meta["last_date"]}
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if summary["status"].get("error"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
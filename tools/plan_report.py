@@ -0,0 +1,51 @@
+import json, sys, os, argparse
+
+# ----- ensure src on sys.path -----
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(THIS_DIR, os.pardir))      # project root
+SRC_DIR  = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from app.domain.strategies.validation import Strategy
+from app.domain.strategies.planner import plan_strategies
+
+def load_from_file(path: str):
+    """支援 [strategy, ...] 或 test_samples.json 格式（取 success_samples）"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("success_samples", [])
+    return data
+
+def load_from_db():
+    from app.db.conn import get_conn
+    rows = get_conn().execute(
+        "SELECT payload FROM strategies WHERE deleted_at IS NULL AND payload IS NOT NULL"
+    ).fetchall()
+    return [json.loads(r["payload"]) for r in rows]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="指標 DAG 去重報告（requested / unique / removed）")
+    ap.add_argument("path", nargs="?", help="策略 JSON 檔；省略則讀 data/app.db 的 strategies")
+    args = ap.parse_args(argv)
+
+    payloads = load_from_file(args.path) if args.path else load_from_db()
+    strategies, skipped = [], []
+    for p in payloads:
+        try:
+            strategies.append(Strategy.parse_obj(p))
+        except Exception as e:
+            skipped.append({"name": p.get("name"), "error": str(e)})
+
+    per_strategy = [{"name": s.name, **plan_strategies([s]).stats} for s in strategies]
+    report = {
+        "strategies": len(strategies),
+        "combined": plan_strategies(strategies).stats,
+        "per_strategy": per_strategy,
+        "skipped": skipped,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()